@@ -0,0 +1,126 @@
+"""
+Ограничение одновременных запросов (admission control) отдельно для записи и чтения.
+
+Запрос, для которого нет свободного места в бюджете, ждёт в очереди не дольше max_wait секунд;
+при переполненной очереди или по истечении ожидания он сразу получает 503 с Retry-After, не занимая
+соединение из пула. Так всплеск бронирований не растягивает очередь к пулу для всех остальных:
+чтения ограничены своим бюджетом, а /health и /metrics не ограничены вовсе.
+
+Бюджеты действуют в пределах одного воркера uvicorn.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from app.config import Settings
+from app.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS, ADMISSION_WAIT
+
+
+class AdmissionRejected(Exception):
+    """Запрос не допущен: очередь бюджета заполнена или ожидание истекло."""
+
+    def __init__(self, budget: str, reason: str) -> None:
+        """
+        Создаёт исключение.
+
+        :param budget: Название бюджета (write / read).
+        :param reason: queue_full или timeout.
+        """
+        super().__init__(f"Бюджет {budget}: {reason}")
+        self.budget = budget
+        self.reason = reason
+
+
+class AdmissionLimiter:
+    """
+    Бюджет одновременных запросов с ограниченной очередью.
+
+    Атрибуты:
+        name (str): Название бюджета для метрик.
+        limit (int): Сколько запросов выполняются одновременно.
+        max_queue (int): Сколько запросов могут ждать места.
+        max_wait (float): Сколько секунд запрос может ждать места.
+        waiting (int): Запросов в очереди сейчас.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float) -> None:
+        """
+        Создаёт бюджет.
+
+        :param name: Название бюджета.
+        :param limit: Сколько запросов выполняются одновременно.
+        :param max_queue: Сколько запросов могут ждать места.
+        :param max_wait: Сколько секунд запрос может ждать места.
+        """
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        ADMISSION_REJECTIONS.labels(self.name, reason).inc()
+        return AdmissionRejected(self.name, reason)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Место в бюджете на время выполнения запроса.
+
+        :raises AdmissionRejected: Очередь заполнена или место не освободилось за max_wait.
+        """
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise self._reject("queue_full")
+            self.waiting += 1
+            ADMISSION_QUEUE_DEPTH.labels(self.name).inc()
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.max_wait)
+            except asyncio.TimeoutError:
+                raise self._reject("timeout")
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUE_DEPTH.labels(self.name).dec()
+                ADMISSION_WAIT.labels(self.name).observe(time.perf_counter() - started)
+        else:
+            await self._semaphore.acquire()
+        ADMISSION_IN_FLIGHT.labels(self.name).inc()
+        try:
+            yield
+        finally:
+            ADMISSION_IN_FLIGHT.labels(self.name).dec()
+            self._semaphore.release()
+
+
+def build_limiter(name: str, limit: int, max_queue: int, max_wait: float) -> Optional[AdmissionLimiter]:
+    """
+    Бюджет по настройкам; limit = 0 отключает ограничение.
+
+    :param name: Название бюджета.
+    :param limit: Сколько запросов выполняются одновременно.
+    :param max_queue: Сколько запросов могут ждать места.
+    :param max_wait: Сколько секунд запрос может ждать места.
+    :return: Бюджет или None.
+    """
+    return AdmissionLimiter(name, limit, max_queue, max_wait) if limit > 0 else None
+
+
+def build_limiters(settings: Settings) -> tuple[Optional[AdmissionLimiter], Optional[AdmissionLimiter]]:
+    """
+    Бюджеты записи и чтения по настройкам ADMISSION_*.
+
+    :param settings: Настройки приложения.
+    :return: (бюджет записи, бюджет чтения).
+    """
+    return (
+        build_limiter(
+            "write", settings.ADMISSION_WRITE_LIMIT, settings.ADMISSION_WRITE_QUEUE, settings.ADMISSION_WRITE_WAIT
+        ),
+        build_limiter(
+            "read", settings.ADMISSION_READ_LIMIT, settings.ADMISSION_READ_QUEUE, settings.ADMISSION_READ_WAIT
+        ),
+    )
@@ -0,0 +1,181 @@
+"""
+Последовательное бронирование к одному врачу (BOOKING_SERIALIZATION).
+
+Конкурентные записи к популярному врачу выполняются параллельно и упираются в ограничения
+no_doctor_overlap и unique_doctor_patient: проигравшие транзакции ждут друг друга на exclusion-индексе
+и откатываются. Сериализация выстраивает записи к одному врачу в очередь до вставки, а записи
+к разным врачам не ждут друг друга:
+
+- advisory — транзакционная блокировка pg_advisory_xact_lock(BOOKING_LOCK_NAMESPACE, doctor_id),
+  общая для всех воркеров; снимается при commit или rollback. Блокировка у каждого врача своя, поэтому
+  пачка берёт их не больше BOOKING_BATCH_LOCK_LIMIT за транзакцию (lock_chunks);
+- sharded — asyncio.Lock из BOOKING_LOCK_SHARDS штук по ключу doctor_id % BOOKING_LOCK_SHARDS, только
+  в пределах воркера и без обращения к БД; врачи с одинаковым ключом делят очередь;
+- none — без сериализации.
+
+Двойную запись в любом режиме исключают ограничения БД, сериализация лишь убирает гонку за слот.
+Ограничения действуют в пределах помесячной секции, поэтому приёмы ближе часа к границе месяца
+(crosses_month_edge) проверяются на пересечение с соседним месяцем отдельно и при любом режиме
+под advisory-блокировкой врача.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.partitions import add_months, month_start
+from app.config import settings
+from app.metrics import BOOKING_LOCK_WAIT
+
+OVERLAP = timedelta(hours=1)  # Минимальный промежуток между приёмами одного врача (no_doctor_overlap)
+
+# Первый ключ двухключевой pg_advisory_xact_lock: не пересекается с STARTUP_LOCK_KEY и другими блокировками
+BOOKING_LOCK_NAMESPACE = 25_031
+
+# Блокировки берутся по возрастанию doctor_id, поэтому пачки с общими врачами не блокируют друг друга взаимно
+ADVISORY_LOCK_SQL = text(
+    "SELECT pg_advisory_xact_lock(:namespace, lock_key) "
+    "FROM unnest(CAST(:lock_keys AS integer[])) WITH ORDINALITY AS t(lock_key, n) ORDER BY n"
+)
+
+
+class ShardedLocks:
+    """
+    Фиксированный набор asyncio.Lock, выбираемых по ключу.
+
+    Атрибуты:
+        shards (int): Количество блокировок.
+    """
+
+    def __init__(self, shards: int) -> None:
+        """
+        Создаёт блокировки.
+
+        :param shards: Количество блокировок (не меньше 1).
+        """
+        self.shards = max(1, shards)
+        self._locks = [asyncio.Lock() for _ in range(self.shards)]
+
+    def shard(self, key: int) -> int:
+        """
+        Номер блокировки для ключа.
+
+        :param key: Ключ (doctor_id).
+        :return: Номер от 0 до shards - 1.
+        """
+        return key % self.shards
+
+    @asynccontextmanager
+    async def hold(self, keys: Iterable[int]) -> AsyncIterator[None]:
+        """
+        Держит блокировки всех ключей; берутся по возрастанию номера, чтобы не было взаимной блокировки.
+
+        :param keys: Ключи (doctor_id).
+        """
+        acquired: List[asyncio.Lock] = []
+        try:
+            for index in sorted({self.shard(key) for key in keys}):
+                lock = self._locks[index]
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+
+_sharded_locks: Optional[ShardedLocks] = None
+
+
+def sharded_locks() -> ShardedLocks:
+    """
+    Блокировки режима sharded для текущего воркера; создаются при первом обращении.
+
+    :return: Набор из BOOKING_LOCK_SHARDS блокировок.
+    """
+    global _sharded_locks
+    if _sharded_locks is None or _sharded_locks.shards != max(1, settings.BOOKING_LOCK_SHARDS):
+        _sharded_locks = ShardedLocks(settings.BOOKING_LOCK_SHARDS)
+    return _sharded_locks
+
+
+def crosses_month_edge(start_time: datetime) -> bool:
+    """
+    Может ли приём пересечься с приёмом из соседнего месяца (другой секции appointments).
+
+    Ограничение no_doctor_overlap действует в пределах секции, поэтому приёмы ближе часа
+    к границе месяца проверяются отдельным запросом под блокировкой врача.
+
+    :param start_time: Время начала приёма.
+    :return: True, если интервал ±1 час вокруг start_time заходит в другой месяц.
+    """
+    month = datetime.combine(month_start(start_time.date()), datetime.min.time())
+    next_month = datetime.combine(add_months(month.date(), 1), datetime.min.time())
+    return start_time - OVERLAP < month or start_time + OVERLAP > next_month
+
+
+def lock_chunks(doctor_ids: Sequence[int], limit: int) -> List[slice]:
+    """
+    Разбить пачку на идущие подряд части, в каждой из которых не больше limit разных врачей.
+
+    Advisory-блокировки держатся до конца транзакции и занимают общую таблицу блокировок
+    (max_locks_per_transaction), поэтому пачка с тысячами врачей выполняется по частям.
+
+    :param doctor_ids: ID врачей элементов пачки в исходном порядке.
+    :param limit: Максимум разных врачей в одной части (не меньше 1).
+    :return: Срезы пачки по порядку.
+    """
+    chunks: List[slice] = []
+    start = 0
+    seen: Set[int] = set()
+    for index, doctor_id in enumerate(doctor_ids):
+        if doctor_id not in seen and len(seen) >= max(1, limit):
+            chunks.append(slice(start, index))
+            start, seen = index, set()
+        seen.add(doctor_id)
+    if start < len(doctor_ids):
+        chunks.append(slice(start, len(doctor_ids)))
+    return chunks
+
+
+async def _advisory_lock(async_session: AsyncSession, doctor_ids: List[int]) -> None:
+    await async_session.execute(ADVISORY_LOCK_SQL, {"namespace": BOOKING_LOCK_NAMESPACE, "lock_keys": doctor_ids})
+
+
+@asynccontextmanager
+async def serialize_doctors(
+    async_session: AsyncSession, doctor_ids: Iterable[int], cross_worker: bool = False
+) -> AsyncIterator[None]:
+    """
+    Выполнить бронирование к врачам doctor_ids по очереди с другими бронированиями к ним же.
+
+    Advisory-блокировки берутся в текущей транзакции сессии и держатся до её завершения,
+    поэтому вставка и commit должны выполняться внутри контекста.
+
+    :param async_session: Сессия, в транзакции которой выполняется вставка.
+    :param doctor_ids: ID врачей.
+    :param cross_worker: Взять advisory-блокировку при любом BOOKING_SERIALIZATION — для проверок,
+        которые не покрыты ограничениями БД (приём у границы месяца).
+    """
+    mode = settings.BOOKING_SERIALIZATION
+    if mode == "none" and not cross_worker:
+        yield
+        return
+
+    ordered = sorted(set(doctor_ids))
+    started = time.perf_counter()
+    if mode == "sharded":
+        async with sharded_locks().hold(ordered):
+            if cross_worker:
+                await _advisory_lock(async_session, ordered)
+            BOOKING_LOCK_WAIT.labels(mode).observe(time.perf_counter() - started)
+            yield
+    else:
+        await _advisory_lock(async_session, ordered)
+        BOOKING_LOCK_WAIT.labels("advisory").observe(time.perf_counter() - started)
+        yield
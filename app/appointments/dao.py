@@ -1,12 +1,51 @@
-from datetime import datetime, timedelta
-from typing import Type
+from datetime import datetime, time, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, NoReturn, Optional, Sequence, Tuple, Type
 
-from sqlalchemy import and_, or_, select
-from sqlalchemy.exc import SQLAlchemyError
+import orjson
+from sqlalchemy import (
+    Boolean,
+    ColumnElement,
+    DateTime,
+    Insert,
+    Integer,
+    Interval,
+    Row,
+    Update,
+    and_,
+    case,
+    delete as sqlalchemy_delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update as sqlalchemy_update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
 
-from app.appointments.models import Appointment, Doctor, Patient
+from app.appointments.booking_locks import OVERLAP, crosses_month_edge, lock_chunks, serialize_doctors
+from app.appointments.models import Appointment, Doctor, IdempotencyKey, Patient
+from app.appointments.partitions import add_months, month_start
+from app.appointments.rb import appointment_row_dict
+from app.cache import CacheBackend, build_cache
+from app.config import settings
 from app.dao.base import BaseDAO
+from app.exceptions.exceptions_classes import AppointmentConflictError, DoctorNotFoundError, PatientNotFoundError
+
+# Окончания имён ограничений, нарушение которых означает занятое время. Ограничения созданы
+# в каждой секции appointments и называются <секция>_no_doctor_overlap / <секция>_unique_doctor_patient
+CONFLICT_CONSTRAINTS = ("no_doctor_overlap", "unique_doctor_patient")
+
+# deadlock_detected и serialization_failure: конкурентная запись к тем же врачам откатила транзакцию,
+# для клиента это такой же конфликт за слот, как нарушение ограничения
+CONFLICT_SQLSTATES = ("40P01", "40001")
+
+# Выражение, которое выполняется в транзакции записи перед commit (например, сохранение ответа по Idempotency-Key)
+OnCreated = Callable[[Appointment], Executable]
 
 
 class PatientDAO(BaseDAO[Patient]):
@@ -18,6 +57,23 @@ class PatientDAO(BaseDAO[Patient]):
 
     model: Type[Patient] = Patient
 
+    @classmethod
+    async def _on_delete(cls, ids: Sequence[int], delete_all: bool) -> None:
+        """Записи пациента удаляются каскадно, поэтому кэш записей сбрасывается целиком."""
+        await super()._on_delete(ids, delete_all)
+        if ids and AppointmentDAO.cache is not None:
+            await AppointmentDAO.cache.clear()
+
+    @classmethod
+    def _add_many_statement(cls) -> Insert:
+        """
+        INSERT для add_many: пациенты с уже существующим email пропускаются.
+
+        Пропущенные строки не попадают в RETURNING, поэтому id не сопоставляются входным строкам
+        по позиции: порядок возвращённых id не гарантируется.
+        """
+        return pg_insert(cls.model).on_conflict_do_nothing(index_elements=["email"]).returning(cls.model.id)
+
 
 class DoctorDAO(BaseDAO[Doctor]):
     """
@@ -28,6 +84,100 @@ class DoctorDAO(BaseDAO[Doctor]):
 
     model: Type[Doctor] = Doctor
 
+    @classmethod
+    async def _on_delete(cls, ids: Sequence[int], delete_all: bool) -> None:
+        """Записи врача удаляются каскадно, поэтому кэш записей сбрасывается целиком."""
+        await super()._on_delete(ids, delete_all)
+        if ids and AppointmentDAO.cache is not None:
+            await AppointmentDAO.cache.clear()
+
+    @classmethod
+    async def find_busy_times(
+        cls,
+        async_session: AsyncSession,
+        start_from: datetime,
+        start_to: datetime,
+        **filter_by,
+    ) -> Dict[int, List[datetime]]:
+        """
+        Индекс занятости врачей: время начала приёмов, отсортированное по возрастанию, для каждого врача.
+
+        Врачи и их приёмы выбираются одним запросом (LEFT JOIN), поэтому врачи без приёмов
+        в окне тоже попадают в результат — с пустым списком. Берутся и приёмы, начавшиеся
+        за час до окна: они занимают его начало.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param start_from: Начало окна.
+        :param start_to: Конец окна (не включается).
+        :param filter_by: Фильтры по врачам (например, id или specialization).
+        :return: Словарь ID врача -> список времени начала его приёмов.
+        """
+        query = (
+            select(cls.model.id, Appointment.start_time)
+            .outerjoin(
+                Appointment,
+                and_(
+                    Appointment.doctor_id == cls.model.id,
+                    Appointment.start_time > start_from - timedelta(hours=1),
+                    Appointment.start_time < start_to,
+                ),
+            )
+            # filter_by после join применялся бы к Appointment, поэтому условия на врача явные
+            .where(*[getattr(cls.model, key) == value for key, value in filter_by.items()])
+            .order_by(cls.model.id, Appointment.start_time)
+        )
+        result = await async_session.execute(query)
+        busy: Dict[int, List[datetime]] = {}
+        for doctor_id, start_time in result.tuples():
+            times = busy.setdefault(doctor_id, [])
+            if start_time is not None:
+                times.append(start_time)
+        return busy
+
+    @classmethod
+    async def find_calendar(
+        cls, async_session: AsyncSession, doctor_id: int, start_from: datetime, start_to: datetime
+    ) -> List[Row[Any]] | None:
+        """
+        Приёмы врача в окне вместе с именами пациентов — одним запросом.
+
+        Врач, его приёмы и пациенты соединяются в одном SELECT (LEFT JOIN), поэтому
+        число запросов не зависит от количества приёмов, а ленивые связи Doctor.appointments
+        и Appointment.patient не загружаются. Как и в find_busy_times, берутся приёмы,
+        начавшиеся за час до окна.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param doctor_id: ID врача.
+        :param start_from: Начало окна.
+        :param start_to: Конец окна (не включается).
+        :return: Строки (id, patient_id, patient_name, start_time) по возрастанию start_time
+            или None, если врача нет.
+        """
+        query = (
+            select(
+                cls.model.id.label("doctor_id"),
+                Appointment.id,
+                Appointment.patient_id,
+                Patient.name.label("patient_name"),
+                Appointment.start_time,
+            )
+            .outerjoin(
+                Appointment,
+                and_(
+                    Appointment.doctor_id == cls.model.id,
+                    Appointment.start_time > start_from - timedelta(hours=1),
+                    Appointment.start_time < start_to,
+                ),
+            )
+            .outerjoin(Patient, Patient.id == Appointment.patient_id)
+            .where(cls.model.id == doctor_id)
+            .order_by(Appointment.start_time, Appointment.id)
+        )
+        rows = (await async_session.execute(query)).all()
+        if not rows:
+            return None
+        return [row for row in rows if row.id is not None]
+
 
 class AppointmentDAO(BaseDAO[Appointment]):
     """
@@ -37,65 +187,731 @@ class AppointmentDAO(BaseDAO[Appointment]):
     """
 
     model: Type[Appointment] = Appointment
+    page_key: Tuple[str, ...] = ("start_time", "id")
+    cache: CacheBackend | None = build_cache(settings, prefix="girumed:")
+
+    @classmethod
+    def _read_columns(cls) -> Tuple[Any, ...]:
+        """Колонки RBAppointmentRead: выборка строк для сериализации без ORM-объектов."""
+        return cls.model.id, cls.model.patient_id, cls.model.doctor_id, cls.model.start_time
 
     @classmethod
-    async def add(cls, async_session: AsyncSession, **values) -> Appointment:
+    async def find_one_payload_by_id(cls, async_session: AsyncSession, data_id: int) -> bytes | None:
         """
-        Добавить запись на приём с проверкой, что у врача нет другой записи в интервале ±1 час.
+        Получение записи по id в виде готового JSON RBAppointmentRead.
+
+        Сначала проверяется кэш; при промахе из БД читаются только колонки ответа,
+        строка сериализуется orjson и кладётся в кэш.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param data_id: ID записи.
+        :return: JSON записи или None, если записи нет.
+        """
+        key = cls._cache_key(data_id)
+        if cls.cache is not None:
+            payload = await cls.cache.get(key)
+            if payload is not None:
+                return payload
+
+        query = select(*cls._read_columns()).where(cls.model.id == data_id)
+        row = (await async_session.execute(query)).one_or_none()
+        if row is None:
+            return None
+        payload = orjson.dumps(appointment_row_dict(row))
+        if cls.cache is not None:
+            await cls.cache.set(key, payload)
+        return payload
+
+    @classmethod
+    async def find_many_payload_by_ids(cls, async_session: AsyncSession, ids: Sequence[int]) -> bytes:
+        """
+        Записи по списку id (как find_many_by_ids) в виде готового JSON RBAppointmentsByIds.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param ids: Список id.
+        :return: JSON с найденными записями в порядке ids и списком ненайденных id.
+        """
+        rows, missing = await cls._find_many_by_ids(async_session, ids, columns=cls._read_columns())
+        return orjson.dumps({"items": [appointment_row_dict(row) for row in rows], "missing": missing})
+
+    @classmethod
+    async def find_page(
+        cls,
+        async_session: AsyncSession,
+        cursor: str | None = None,
+        limit: int = 50,
+        start_from: datetime | None = None,
+        start_to: datetime | None = None,
+        **filter_by,
+    ) -> Tuple[Sequence[Appointment], str | None]:
+        """
+        Получение страницы записей, отсортированных по (start_time, id).
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param cursor: Курсор из предыдущей страницы (None — первая страница).
+        :param limit: Размер страницы.
+        :param start_from: Начало окна по start_time (включительно).
+        :param start_to: Конец окна по start_time (не включительно).
+        :param filter_by: Фильтры для выборки (doctor_id, patient_id).
+        :raises ValueError: Если курсор некорректный.
+        :return: Записи страницы и курсор следующей страницы.
+        """
+        return await cls._find_page(async_session, cursor, limit, cls._time_window(start_from, start_to), filter_by)
+
+    @classmethod
+    async def find_page_payload(
+        cls,
+        async_session: AsyncSession,
+        cursor: str | None = None,
+        limit: int = 50,
+        start_from: datetime | None = None,
+        start_to: datetime | None = None,
+        **filter_by,
+    ) -> bytes:
+        """
+        Страница записей (как find_page) в виде готового JSON RBPage[RBAppointmentRead].
+
+        Выбираются только колонки ответа, ORM-объекты и модели Pydantic не создаются.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param cursor: Курсор из предыдущей страницы (None — первая страница).
+        :param limit: Размер страницы.
+        :param start_from: Начало окна по start_time (включительно).
+        :param start_to: Конец окна по start_time (не включительно).
+        :param filter_by: Фильтры для выборки (doctor_id, patient_id).
+        :raises ValueError: Если курсор некорректный.
+        :return: JSON страницы.
+        """
+        rows, next_cursor = await cls._find_page(
+            async_session,
+            cursor,
+            limit,
+            cls._time_window(start_from, start_to),
+            filter_by,
+            columns=cls._read_columns(),
+        )
+        return orjson.dumps({"items": [appointment_row_dict(row) for row in rows], "next_cursor": next_cursor})
+
+    @classmethod
+    async def find_patient_history(
+        cls, async_session: AsyncSession, patient_id: int, cursor: str | None = None, limit: int = 50
+    ) -> Tuple[List[Row[Any]], str | None] | None:
+        """
+        Страница записей пациента (по start_time, id) с именем и специализацией врача — одним запросом.
+
+        Пациент, его записи и врачи соединяются в одном SELECT (LEFT JOIN), keyset-условие курсора
+        стоит в условии соединения: пациент без записей (или на последней странице) даёт одну строку
+        с пустыми колонками записи, а отсутствующий пациент — ни одной. Ленивые связи не загружаются.
 
         :param async_session: Асинхронная сессия базы данных.
-        :param doctor_id: ID доктора.
         :param patient_id: ID пациента.
-        :param start_time: Время начала приёма.
-        :raises HTTPException: Если время занято.
-        :return: Экземпляр записи Appointment.
+        :param cursor: Курсор из предыдущей страницы (None — первая страница).
+        :param limit: Размер страницы.
+        :raises ValueError: Если курсор некорректный.
+        :return: Строки (id, doctor_id, doctor_name, doctor_specialization, start_time) и курсор
+            следующей страницы или None, если пациента нет.
         """
-        # Если start_time пришёл строкой, преобразуем в datetime
-        start_time = values.get("start_time")
-        if isinstance(start_time, str):
+        key = [getattr(cls.model, name) for name in cls.page_key]
+        join_on = [cls.model.patient_id == Patient.id]
+        if cursor is not None:
+            join_on.append(tuple_(*key) > tuple_(*cls._decode_cursor(cursor)))
+        query = (
+            select(
+                Patient.id.label("patient_id"),
+                cls.model.id,
+                cls.model.doctor_id,
+                Doctor.name.label("doctor_name"),
+                Doctor.specialization.label("doctor_specialization"),
+                cls.model.start_time,
+            )
+            .outerjoin(cls.model, and_(*join_on))
+            .outerjoin(Doctor, Doctor.id == cls.model.doctor_id)
+            .where(Patient.id == patient_id)
+            .order_by(*key)
+            .limit(limit + 1)
+        )
+        rows = (await async_session.execute(query)).all()
+        if not rows:
+            return None
+        rows = [row for row in rows if row.id is not None]
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], cls._encode_cursor(rows[limit - 1])
+
+    @classmethod
+    def _add_many_statement(cls) -> Insert:
+        """INSERT для add_many: записи, нарушающие no_doctor_overlap или unique_doctor_patient, пропускаются."""
+        return pg_insert(cls.model).on_conflict_do_nothing().returning(cls.model.id)
+
+    @classmethod
+    def _time_window(cls, start_from: datetime | None, start_to: datetime | None) -> List[ColumnElement[bool]]:
+        """Условия на окно start_time: [start_from, start_to)."""
+        where = []
+        if start_from is not None:
+            where.append(cls.model.start_time >= start_from)
+        if start_to is not None:
+            where.append(cls.model.start_time < start_to)
+        return where
+
+    @classmethod
+    async def stream_rows(
+        cls,
+        async_session: AsyncSession,
+        start_from: datetime | None = None,
+        start_to: datetime | None = None,
+        batch_size: int = 5000,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """
+        Потоково читать записи за период через серверный курсор.
+
+        Выбираются только колонки (без ORM-объектов и identity map), строки приходят пачками
+        по batch_size, поэтому память не зависит от размера выборки.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param start_from: Начало окна по start_time (включительно).
+        :param start_to: Конец окна по start_time (не включительно).
+        :param batch_size: Сколько строк читать из курсора за раз.
+        :return: Асинхронный итератор пачек строк (id, patient_id, doctor_id, start_time).
+        """
+        query = (
+            select(*cls._read_columns())
+            .where(*cls._time_window(start_from, start_to))
+            .order_by(cls.model.start_time, cls.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await async_session.stream(query)
+        async for partition in result.partitions():
+            yield partition
+
+    @staticmethod
+    def _parse_start_time(start_time: datetime | str) -> datetime:
+        """
+        Привести start_time к datetime.
+
+        :param start_time: Время начала приёма в виде datetime или строки.
+        :raises ValueError: Если строка имеет неизвестный формат.
+        :return: Время начала приёма.
+        """
+        if not isinstance(start_time, str):
+            return start_time
+        try:
+            # fromisoformat понимает и 'YYYY-MM-DD HH:MM', и ISO, и заметно быстрее strptime
+            return datetime.fromisoformat(start_time)
+        except ValueError:
+            # Если формат другой, попробуй datetime.strptime или кинь исключение
             try:
-                # Парсим строку формата 'YYYY-MM-DD HH:MM' (или ISO)
-                values["start_time"] = datetime.strptime(start_time, "%Y-%m-%d %H:%M")
+                return datetime.strptime(start_time, "%Y-%m-%d %H:%M")
             except ValueError:
-                # Если формат другой, попробуй datetime.fromisoformat или кинь исключение
-                try:
-                    values["start_time"] = datetime.fromisoformat(start_time)
-                except ValueError:
-                    raise ValueError("Неверный формат даты start_time")
-        new_instance = cls.model(**values)
-        new_start = new_instance.start_time
-        new_end = new_start + timedelta(hours=1)
-
-        # Проверяем две вещи:
-        # 1) Есть ли перекрывающая запись по времени у врача
-        # 2) Есть ли уже запись с таким же сочетанием doctor_id и patient_id
-        query = select(cls.model).where(
-            cls.model.doctor_id == new_instance.doctor_id,
+                raise ValueError("Неверный формат даты start_time")
+
+    @classmethod
+    def _conflict_clause(cls, doctor_id: int, patient_id: int, start_time: datetime) -> ColumnElement[bool]:
+        """
+        Условие, при котором новая запись конфликтует с существующей.
+
+        Проверяем две вещи:
+        1) Есть ли перекрывающая запись по времени у врача
+        2) Есть ли уже запись с таким же сочетанием doctor_id и patient_id в том же месяце
+
+        Совпадает с ограничениями no_doctor_overlap и unique_doctor_patient помесячных секций.
+        """
+        month = datetime.combine(month_start(start_time.date()), time.min)
+        next_month = datetime.combine(add_months(month.date(), 1), time.min)
+        return and_(
+            cls.model.doctor_id == doctor_id,
             or_(
                 # Перекрытие по времени
                 and_(
-                    cls.model.start_time < new_end,
-                    cls.model.start_time >= new_start - timedelta(hours=1),
+                    cls.model.start_time < start_time + timedelta(hours=1),
+                    cls.model.start_time > start_time - timedelta(hours=1),
+                ),
+                # Или уже есть запись для этого пациента с этим врачом в этом месяце
+                and_(
+                    cls.model.patient_id == patient_id,
+                    cls.model.start_time >= month,
+                    cls.model.start_time < next_month,
                 ),
-                # Или уже есть запись для этого пациента с этим врачом
-                cls.model.patient_id == new_instance.patient_id,
             ),
         )
-        result = await async_session.execute(query)
-        existing_appointment = result.scalars().first()
 
-        if existing_appointment:
-            raise ValueError(
-                "Время занято, или есть пересечение пациент + " "доктор или пересечение по приему с другим пациентом"
+    @staticmethod
+    def _raise_booking_error(error: DBAPIError, doctor_id: int, patient_id: int) -> NoReturn:
+        """
+        Перевести ошибку БД при бронировании в доменное исключение.
+
+        :param error: Исключение SQLAlchemy.
+        :param doctor_id: ID доктора.
+        :param patient_id: ID пациента.
+        :raises AppointmentConflictError: Нарушены no_doctor_overlap или unique_doctor_patient,
+            либо транзакцию откатила взаимная блокировка или сбой сериализации.
+        :raises DoctorNotFoundError: Нарушен внешний ключ на doctors.
+        :raises PatientNotFoundError: Нарушен внешний ключ на patients.
+        """
+        if getattr(error.orig, "sqlstate", None) in CONFLICT_SQLSTATES:
+            raise AppointmentConflictError() from error
+        constraint = getattr(getattr(error.orig, "__cause__", None), "constraint_name", None) or ""
+        if constraint.endswith(CONFLICT_CONSTRAINTS):
+            raise AppointmentConflictError() from error
+        if constraint.endswith("doctor_id_fkey"):
+            raise DoctorNotFoundError(doctor_id) from error
+        if constraint.endswith("patient_id_fkey"):
+            raise PatientNotFoundError(patient_id) from error
+        raise error
+
+    @classmethod
+    async def _check_month_edge(cls, async_session: AsyncSession, doctor_id: int, start_time: datetime) -> None:
+        """
+        Проверить, что приём у границы месяца не пересекается с приёмом врача в соседнем месяце.
+
+        no_doctor_overlap действует в пределах секции, поэтому такие приёмы проверяются запросом;
+        вызывается под serialize_doctors(..., cross_worker=True), чтобы проверку и вставку не разделила
+        параллельная запись.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param doctor_id: ID доктора.
+        :param start_time: Время начала приёма.
+        :raises AppointmentConflictError: Если время занято.
+        """
+        query = (
+            select(cls.model.id)
+            .where(
+                cls.model.doctor_id == doctor_id,
+                cls.model.start_time > start_time - OVERLAP,
+                cls.model.start_time < start_time + OVERLAP,
+            )
+            .limit(1)
+        )
+        if (await async_session.execute(query)).first() is not None:
+            raise AppointmentConflictError()
+
+    @classmethod
+    async def add(cls, async_session: AsyncSession, on_created: Optional[OnCreated] = None, **values) -> Appointment:
+        """
+        Добавить запись на приём с проверкой, что у врача нет другой записи в интервале ±1 час.
+
+        Пересечения не ищутся отдельным SELECT: их отсекают ограничения no_doctor_overlap
+        и unique_doctor_patient, а нарушение ограничения переводится в AppointmentConflictError.
+        Ограничения действуют в пределах месяца, поэтому приём ближе часа к границе месяца
+        дополнительно проверяется по соседнему месяцу под advisory-блокировкой врача.
+        При BOOKING_SERIALIZATION вставка выполняется в очереди записей к этому врачу.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param doctor_id: ID доктора.
+        :param patient_id: ID пациента.
+        :param start_time: Время начала приёма.
+        :param on_created: Выражение, выполняемое в той же транзакции после вставки.
+        :raises AppointmentConflictError: Если время занято.
+        :raises DoctorNotFoundError: Если доктор не найден.
+        :raises PatientNotFoundError: Если пациент не найден.
+        :return: Экземпляр записи Appointment.
+        """
+        values["start_time"] = cls._parse_start_time(values["start_time"])
+        new_instance = cls.model(**values)
+
+        edge = crosses_month_edge(new_instance.start_time)
+        try:
+            async with serialize_doctors(async_session, [new_instance.doctor_id], cross_worker=edge):
+                if edge:
+                    await cls._check_month_edge(async_session, new_instance.doctor_id, new_instance.start_time)
+                async_session.add(new_instance)
+                if on_created is not None:
+                    await async_session.flush()
+                    await async_session.execute(on_created(new_instance))
+                await async_session.commit()
+            await async_session.refresh(new_instance)
+        except DBAPIError as e:
+            await async_session.rollback()
+            cls._raise_booking_error(e, new_instance.doctor_id, new_instance.patient_id)
+        except (AppointmentConflictError, SQLAlchemyError):
+            await async_session.rollback()
+            raise
+        await cls._invalidate([new_instance.id])
+        return new_instance
+
+    @classmethod
+    async def book(
+        cls,
+        async_session: AsyncSession,
+        doctor_id: int,
+        patient_id: int,
+        start_time: datetime | str,
+        on_created: Optional[OnCreated] = None,
+    ) -> Appointment:
+        """
+        Добавить запись на приём одним запросом к БД.
+
+        Проверка существования врача и пациента, поиск пересечений и вставка
+        выполняются одним SQL-выражением (INSERT ... SELECT в CTE), поэтому
+        запись обходится в один round trip вместо пяти у связки
+        find_one_or_none_by_id + add.
+        Пересечения ищутся по всей таблице, а приём ближе часа к границе месяца вставляется
+        под advisory-блокировкой врача: ограничение соседней секции параллельную запись не остановит.
+        При BOOKING_SERIALIZATION выражение выполняется в очереди записей к этому врачу.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param doctor_id: ID доктора.
+        :param patient_id: ID пациента.
+        :param start_time: Время начала приёма.
+        :param on_created: Выражение, выполняемое в той же транзакции, если запись создана.
+        :raises DoctorNotFoundError: Если доктор не найден.
+        :raises PatientNotFoundError: Если пациент не найден.
+        :raises AppointmentConflictError: Если время занято.
+        :return: Экземпляр записи Appointment (не привязан к сессии).
+        """
+        start_time = cls._parse_start_time(start_time)
+
+        doctor_found = select(Doctor.id).where(Doctor.id == doctor_id).exists()
+        patient_found = select(Patient.id).where(Patient.id == patient_id).exists()
+        conflict = select(cls.model.id).where(cls._conflict_clause(doctor_id, patient_id, start_time)).exists()
+
+        inserted = (
+            insert(cls.model)
+            .from_select(
+                ["doctor_id", "patient_id", "start_time"],
+                select(
+                    literal(doctor_id, Integer),
+                    literal(patient_id, Integer),
+                    literal(start_time, DateTime),
+                ).where(doctor_found, patient_found, ~conflict),
+            )
+            .returning(cls.model.id)
+            .cte("inserted")
+        )
+        query = select(
+            doctor_found.label("doctor_found"),
+            patient_found.label("patient_found"),
+            select(inserted.c.id).scalar_subquery().label("id"),
+        )
+
+        try:
+            async with serialize_doctors(async_session, [doctor_id], cross_worker=crosses_month_edge(start_time)):
+                row = (await async_session.execute(query)).one()
+                if row.id is not None and on_created is not None:
+                    created = cls.model(id=row.id, doctor_id=doctor_id, patient_id=patient_id, start_time=start_time)
+                    await async_session.execute(on_created(created))
+                await async_session.commit()
+        except DBAPIError as e:
+            # Параллельная запись успела занять слот между проверкой и вставкой
+            await async_session.rollback()
+            cls._raise_booking_error(e, doctor_id, patient_id)
+        except SQLAlchemyError:
+            await async_session.rollback()
+            raise
+
+        if not row.doctor_found:
+            raise DoctorNotFoundError(doctor_id)
+        if not row.patient_found:
+            raise PatientNotFoundError(patient_id)
+        if row.id is None:
+            raise AppointmentConflictError()
+        await cls._invalidate([row.id])
+        return cls.model(id=row.id, doctor_id=doctor_id, patient_id=patient_id, start_time=start_time)
+
+    @staticmethod
+    def _batch_month_edge_conflicts(
+        items: Sequence[Mapping[str, Any]], start_times: Sequence[datetime], edges: Sequence[bool]
+    ) -> List[bool]:
+        """
+        Элементы пачки, пересекающиеся с более ранним элементом того же врача из соседнего месяца.
+
+        Такие пары ограничения секций не отсекают, поэтому более поздний элемент считается конфликтом
+        заранее — даже если ранний в итоге не вставится (отказ консервативный, двойной записи не будет).
+
+        :param items: Элементы пачки.
+        :param start_times: Время начала приёмов.
+        :param edges: Признаки crosses_month_edge для каждого элемента.
+        :return: Для каждого элемента — нужно ли его пропустить.
+        """
+        blocked = [False] * len(items)
+        earlier: Dict[int, List[datetime]] = {}
+        for index, (item, start_time, edge) in enumerate(zip(items, start_times, edges)):
+            if not edge:
+                continue
+            others = earlier.setdefault(item["doctor_id"], [])
+            blocked[index] = any(
+                abs(start_time - other) < OVERLAP and month_start(start_time.date()) != month_start(other.date())
+                for other in others
+            )
+            others.append(start_time)
+        return blocked
+
+    @classmethod
+    async def _insert_batch(
+        cls,
+        async_session: AsyncSession,
+        items: Sequence[Mapping[str, Any]],
+        doctor_ids: List[int],
+        start_times: List[datetime],
+        edges: List[bool],
+        blocked: List[bool],
+    ) -> Sequence[Row[Any]]:
+        """
+        Вставить часть пачки одним запросом в отдельной транзакции.
+
+        Если транзакцию откатила взаимная блокировка или сбой сериализации, запрос выполняется ещё раз.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param items: Элементы части пачки.
+        :param doctor_ids: ID врачей элементов.
+        :param start_times: Время начала приёмов.
+        :param edges: Признаки crosses_month_edge для каждого элемента.
+        :param blocked: Элементы, заранее отсечённые _batch_month_edge_conflicts.
+        :return: Строки со статусом и id созданной записи в порядке элементов.
+        """
+        source = select(
+            func.unnest(
+                literal(doctor_ids, ARRAY(Integer)),
+                literal([item["patient_id"] for item in items], ARRAY(Integer)),
+                literal(start_times, ARRAY(DateTime)),
+                literal(edges, ARRAY(Boolean)),
+                literal(blocked, ARRAY(Boolean)),
+            )
+            .table_valued("doctor_id", "patient_id", "start_time", "edge", "blocked", with_ordinality="idx")
+            .render_derived()
+        ).cte("source")
+        # Пересечение с записью врача в соседнем месяце: ограничение другой секции его не видит
+        edge_overlap = (
+            select(cls.model.id)
+            .where(
+                cls.model.doctor_id == source.c.doctor_id,
+                cls.model.start_time > source.c.start_time - literal(OVERLAP, Interval),
+                cls.model.start_time < source.c.start_time + literal(OVERLAP, Interval),
+            )
+            .exists()
+        )
+
+        inserted = (
+            pg_insert(cls.model)
+            .from_select(
+                ["doctor_id", "patient_id", "start_time"],
+                select(source.c.doctor_id, source.c.patient_id, source.c.start_time)
+                .join(Doctor, Doctor.id == source.c.doctor_id)
+                .join(Patient, Patient.id == source.c.patient_id)
+                .where(~source.c.blocked, ~and_(source.c.edge, edge_overlap))
+                .order_by(source.c.idx),
+            )
+            .on_conflict_do_nothing()
+            .returning(cls.model.id, cls.model.doctor_id, cls.model.patient_id, cls.model.start_time)
+            .cte("inserted")
+        )
+        # Одинаковые элементы пачки сопоставляются вставленной строке только один раз — первый по порядку
+        winners = (
+            select(inserted.c.id, source.c.idx)
+            .join(
+                source,
+                and_(
+                    source.c.doctor_id == inserted.c.doctor_id,
+                    source.c.patient_id == inserted.c.patient_id,
+                    source.c.start_time == inserted.c.start_time,
+                ),
+            )
+            .distinct(inserted.c.id)
+            .order_by(inserted.c.id, source.c.idx)
+            .cte("winners")
+        )
+        status = case(
+            (Doctor.id.is_(None), "doctor_not_found"),
+            (Patient.id.is_(None), "patient_not_found"),
+            (winners.c.id.is_(None), "conflict"),
+            else_="created",
+        )
+        query = (
+            select(status.label("status"), winners.c.id)
+            .select_from(source)
+            .outerjoin(Doctor, Doctor.id == source.c.doctor_id)
+            .outerjoin(Patient, Patient.id == source.c.patient_id)
+            .outerjoin(winners, winners.c.idx == source.c.idx)
+            .order_by(source.c.idx)
+        )
+
+        for attempt in (1, 2):
+            try:
+                async with serialize_doctors(async_session, doctor_ids, cross_worker=any(edges)):
+                    rows = (await async_session.execute(query)).all()
+                    await async_session.commit()
+                break
+            except SQLAlchemyError as e:
+                await async_session.rollback()
+                # Взаимная блокировка откатывает пачку целиком, а не отдельные элементы — повторяем один раз
+                if attempt == 2 or getattr(getattr(e, "orig", None), "sqlstate", None) not in CONFLICT_SQLSTATES:
+                    raise
+
+        return rows
+
+    @classmethod
+    async def book_batch(
+        cls, async_session: AsyncSession, items: Sequence[Mapping[str, Any]]
+    ) -> List[Tuple[str, Appointment | None]]:
+        """
+        Добавить пачку записей на приём.
+
+        Входные записи передаются массивами через unnest, существование врачей и пациентов
+        проверяется соединением, а пересечения — как с уже существующими записями, так и внутри
+        пачки — отсекаются ограничениями no_doctor_overlap и unique_doctor_patient через
+        INSERT ... ON CONFLICT DO NOTHING. Строки вставляются в порядке следования в пачке,
+        поэтому из двух конфликтующих элементов выигрывает первый.
+        Элементы ближе часа к границе месяца дополнительно проверяются по соседнему месяцу —
+        и по записям в БД (под advisory-блокировкой врачей), и по более ранним элементам пачки.
+        При BOOKING_SERIALIZATION пачка ждёт очереди ко всем своим врачам. Если транзакция берёт
+        advisory-блокировки, пачка с числом врачей больше BOOKING_BATCH_LOCK_LIMIT выполняется
+        по частям, каждая в своей транзакции.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param items: Значения doctor_id, patient_id и start_time для каждой записи.
+        :return: Для каждого элемента (в исходном порядке) статус created, conflict,
+            doctor_not_found или patient_not_found и созданная запись, если она есть.
+        """
+        doctor_ids = [item["doctor_id"] for item in items]
+        start_times = [cls._parse_start_time(item["start_time"]) for item in items]
+        edges = [crosses_month_edge(start_time) for start_time in start_times]
+        blocked = cls._batch_month_edge_conflicts(items, start_times, edges)
+        chunks = [slice(0, len(items))]
+        if settings.BOOKING_SERIALIZATION == "advisory" or any(edges):
+            chunks = lock_chunks(doctor_ids, settings.BOOKING_BATCH_LOCK_LIMIT)
+
+        rows: List[Row[Any]] = []
+        for chunk in chunks:
+            rows.extend(
+                await cls._insert_batch(
+                    async_session, items[chunk], doctor_ids[chunk], start_times[chunk], edges[chunk], blocked[chunk]
+                )
+            )
+
+        return [
+            (
+                row.status,
+                (
+                    cls.model(id=row.id, doctor_id=item["doctor_id"], patient_id=item["patient_id"], start_time=start)
+                    if row.id is not None
+                    else None
+                ),
             )
+            for row, item, start in zip(rows, items, start_times)
+        ]
 
-        # Создаём новую запись
 
-        async_session.add(new_instance)
+class IdempotencyKeyDAO(BaseDAO[IdempotencyKey]):
+    """
+    Класс для доступа к данным в БД.
+
+    Работает с таблицей IdempotencyKey. Время берётся из БД (LOCALTIMESTAMP), а не из воркера,
+    поэтому срок действия ключа одинаков для всех процессов.
+    """
+
+    model: Type[IdempotencyKey] = IdempotencyKey
+
+    @classmethod
+    async def claim(
+        cls,
+        async_session: AsyncSession,
+        key: str,
+        request_hash: str,
+        ttl_seconds: float,
+        lock_seconds: float,
+    ) -> IdempotencyKey | None:
+        """
+        Занять ключ под выполнение запроса или получить уже сохранённый ответ.
+
+        INSERT ... ON CONFLICT атомарен, поэтому из одновременных запросов с одним ключом (в том числе
+        в разных воркерах) ключ занимает ровно один. Занятая строка фиксируется сразу, чтобы её видели
+        остальные. Истёкший ключ и ключ, зависший в выполнении дольше lock_seconds (воркер упал
+        до сохранения ответа), занимаются заново.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param key: Значение заголовка Idempotency-Key.
+        :param request_hash: Хэш тела запроса.
+        :param ttl_seconds: Сколько секунд хранить ответ.
+        :param lock_seconds: Через сколько секунд выполнение без ответа считается брошенным.
+        :return: None, если ключ занят этим запросом; иначе строка ключа другого запроса.
+        """
+        now = func.localtimestamp()
+        insert_key = pg_insert(cls.model).values(
+            key=key, request_hash=request_hash, expires_at=now + timedelta(seconds=ttl_seconds)
+        )
+        statement = insert_key.on_conflict_do_update(
+            index_elements=[cls.model.key],
+            set_={
+                "request_hash": insert_key.excluded.request_hash,
+                "status_code": None,
+                "response": None,
+                "expires_at": insert_key.excluded.expires_at,
+                "created_at": now,
+            },
+            where=or_(
+                cls.model.expires_at <= now,
+                and_(cls.model.status_code.is_(None), cls.model.created_at <= now - timedelta(seconds=lock_seconds)),
+            ),
+        ).returning(cls.model.key)
+        query = select(cls.model).where(cls.model.key == key).execution_options(populate_existing=True)
         try:
+            # Строку могут удалить между INSERT и SELECT (истекла и вычищена) — тогда пробуем занять снова
+            for _ in range(2):
+                claimed = (await async_session.execute(statement)).scalar_one_or_none()
+                existing = None if claimed is not None else (await async_session.execute(query)).scalar_one_or_none()
+                await async_session.commit()
+                if claimed is not None or existing is not None:
+                    return existing
+        except SQLAlchemyError:
+            await async_session.rollback()
+            raise
+        raise RuntimeError(f"Не удалось занять Idempotency-Key {key!r}")
+
+    @classmethod
+    def save_response_statement(cls, key: str, status_code: int, response: bytes) -> Update:
+        """
+        UPDATE, сохраняющий ответ занятого ключа; можно выполнить в транзакции самого бронирования.
+
+        :param key: Значение заголовка Idempotency-Key.
+        :param status_code: Код ответа.
+        :param response: Тело ответа.
+        :return: Выражение UPDATE.
+        """
+        return (
+            sqlalchemy_update(cls.model).where(cls.model.key == key).values(status_code=status_code, response=response)
+        )
+
+    @classmethod
+    async def save_response(cls, async_session: AsyncSession, key: str, status_code: int, response: bytes) -> None:
+        """
+        Сохранить ответ занятого ключа отдельной транзакцией.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param key: Значение заголовка Idempotency-Key.
+        :param status_code: Код ответа.
+        :param response: Тело ответа.
+        """
+        await cls._execute_and_commit(async_session, cls.save_response_statement(key, status_code, response))
+
+    @classmethod
+    async def release(cls, async_session: AsyncSession, key: str) -> None:
+        """
+        Освободить занятый ключ без ответа (запрос упал): повтор выполнит бронирование заново.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param key: Значение заголовка Idempotency-Key.
+        """
+        await cls._execute_and_commit(
+            async_session, sqlalchemy_delete(cls.model).where(cls.model.key == key, cls.model.status_code.is_(None))
+        )
+
+    @classmethod
+    async def purge_expired(cls, async_session: AsyncSession) -> int:
+        """
+        Удалить истёкшие ключи.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :return: Количество удалённых ключей.
+        """
+        return await cls._execute_and_commit(
+            async_session, sqlalchemy_delete(cls.model).where(cls.model.expires_at <= func.localtimestamp())
+        )
+
+    @staticmethod
+    async def _execute_and_commit(async_session: AsyncSession, statement: Any) -> int:
+        try:
+            result = await async_session.execute(statement)
             await async_session.commit()
-            await async_session.refresh(new_instance)
         except SQLAlchemyError:
             await async_session.rollback()
             raise
-        return new_instance
+        return result.rowcount
@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Literal, Sequence
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.appointments.dao import AppointmentDAO
+from app.appointments.rb import format_start_time
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+CSV_HEADER = b"id,patient_id,doctor_id,start_time\n"
+
+
+def ndjson_chunk(rows: Sequence[Row[Any]]) -> bytes:
+    """
+    Пачка строк в формате NDJSON (по объекту RBAppointmentRead на строку).
+
+    Все поля — целые числа и время фиксированного формата, поэтому экранирование не нужно
+    и строка собирается без json.dumps.
+    """
+    return "".join(
+        f'{{"id":{r.id},"patient_id":{r.patient_id},"doctor_id":{r.doctor_id},'
+        f'"start_time":"{format_start_time(r.start_time)}"}}\n'
+        for r in rows
+    ).encode()
+
+
+def csv_chunk(rows: Sequence[Row[Any]]) -> bytes:
+    """Пачка строк в формате CSV (без заголовка)."""
+    return "".join(f"{r.id},{r.patient_id},{r.doctor_id},{format_start_time(r.start_time)}\n" for r in rows).encode()
+
+
+async def stream_export(
+    session_maker: async_sessionmaker[AsyncSession],
+    export_format: ExportFormat,
+    start_from: datetime | None = None,
+    start_to: datetime | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Тело потоковой выгрузки записей на приём.
+
+    Открывает собственную сессию (она живёт, пока отдаётся ответ) и отдаёт данные
+    по одной пачке серверного курсора за раз.
+
+    :param session_maker: Фабрика асинхронных сессий.
+    :param export_format: ndjson или csv.
+    :param start_from: Начало окна по start_time (включительно).
+    :param start_to: Конец окна по start_time (не включительно).
+    :return: Асинхронный итератор кусков тела ответа.
+    """
+    serialize = csv_chunk if export_format == "csv" else ndjson_chunk
+    if export_format == "csv":
+        yield CSV_HEADER
+    async with session_maker() as session:
+        async for rows in AppointmentDAO.stream_rows(session, start_from, start_to):
+            yield serialize(rows)
@@ -0,0 +1,109 @@
+"""
+Повторы POST /api/appointments по заголовку Idempotency-Key.
+
+Первый запрос с ключом занимает строку в таблице idempotency_keys и сохраняет туда свой ответ
+(успешный или 4xx). Повтор с тем же ключом и телом в течение IDEMPOTENCY_TTL_SECONDS получает
+сохранённый ответ с заголовком Idempotent-Replayed, не выполняя бронирование и запросы проверки.
+Таблица общая для всех воркеров, поэтому повтор, попавший в другой процесс, ведёт себя так же.
+"""
+
+import asyncio
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import Response
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette import status
+
+from app.appointments.dao import IdempotencyKeyDAO
+from app.appointments.models import IdempotencyKey
+from app.config import logger
+from app.metrics import APPOINTMENT_BOOKINGS
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+PURGE_INTERVAL = 600  # Как часто удалять истёкшие ключи, в секундах
+
+
+def request_fingerprint(payload: Any) -> str:
+    """
+    Хэш тела запроса: один ключ нельзя использовать с разными телами.
+
+    :param payload: Тело запроса после валидации (model_dump(mode="json")).
+    :return: SHA-256 в hex.
+    """
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def replay_response(stored: IdempotencyKey, request_hash: str) -> Response:
+    """
+    Ответ на повтор запроса с уже занятым ключом.
+
+    :param stored: Строка ключа.
+    :param request_hash: Хэш тела повторного запроса.
+    :raises HTTPException: 422, если ключ использован с другим телом; 409, если первый запрос ещё выполняется.
+    :return: Сохранённый ответ.
+    """
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key уже использован с другим телом запроса.",
+        )
+    if stored.status_code is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Запрос с этим Idempotency-Key ещё выполняется, повторите позже.",
+            headers={"Retry-After": "1"},
+        )
+    APPOINTMENT_BOOKINGS.labels("replayed").inc()
+    return Response(
+        content=stored.response,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+async def release_key(session: AsyncSession, key: str) -> None:
+    """
+    Освободить ключ после сбоя или отмены запроса (обрыв соединения клиента, остановка воркера).
+
+    Выполняется под asyncio.shield, чтобы повторная отмена не оставила ключ занятым до
+    IDEMPOTENCY_LOCK_SECONDS. Ключ с уже сохранённым ответом не удаляется. Ошибка БД только
+    пишется в лог: исходное исключение важнее.
+
+    :param session: Сессия запроса.
+    :param key: Значение заголовка Idempotency-Key.
+    """
+
+    async def release() -> None:
+        await session.rollback()
+        await IdempotencyKeyDAO.release(session, key)
+
+    try:
+        await asyncio.shield(release())
+    except (SQLAlchemyError, OSError, asyncio.CancelledError) as e:
+        logger.warning(f"Не удалось освободить Idempotency-Key {key!r}: {e!r}")
+
+
+async def purge_expired_keys(session_maker: async_sessionmaker[AsyncSession], interval: float = PURGE_INTERVAL) -> None:
+    """
+    Фоновая задача воркера: раз в interval секунд удаляет истёкшие ключи.
+
+    Истёкший ключ и без этого занимается заново, задача только не даёт таблице расти.
+    Ошибка БД не останавливает задачу: следующая попытка будет через interval.
+
+    :param session_maker: Фабрика сессий основной БД.
+    :param interval: Период в секундах.
+    """
+    while True:
+        try:
+            async with session_maker() as session:
+                purged = await IdempotencyKeyDAO.purge_expired(session)
+            if purged:
+                logger.info(f"🧹 Удалено истёкших Idempotency-Key: {purged}")
+        except SQLAlchemyError as e:
+            logger.warning(f"Не удалось удалить истёкшие Idempotency-Key: {e}")
+        await asyncio.sleep(interval)
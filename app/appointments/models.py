@@ -1,11 +1,15 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
-from sqlalchemy import ForeignKey, Integer, String, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DDL, DateTime, ForeignKey, Index, Integer, LargeBinary, SmallInteger, String, event
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
 
+from app.appointments.partitions import default_partition_ddl
 from app.database import Base
 
+# Расширение нужно для ограничений no_doctor_overlap секций (сравнение doctor_id через "=" в GiST)
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
 
 class Patient(Base):
     """
@@ -50,6 +54,9 @@ class Doctor(Base):
 
     appointments: Mapped[list["Appointment"]] = relationship(back_populates="doctor")
 
+    # Фильтр по специализации в списке врачей и поиске свободных слотов, порядок — по id
+    __table_args__ = (Index("ix_doctors_specialization_id", "specialization", "id"),)
+
     def __repr__(self) -> str:
         """Строковое представление врача."""
         return (
@@ -62,6 +69,13 @@ class Appointment(Base):
     """
     Модель записи на приём.
 
+    Таблица секционирована по месяцам start_time (см. app/appointments/partitions.py), поэтому
+    первичный ключ в БД — (id, start_time), а ограничения unique_doctor_patient и no_doctor_overlap
+    создаются в каждой секции. Для ORM первичным ключом остаётся id.
+
+    Правило записи: пациент записывается к одному врачу не больше раза в календарный месяц
+    (до секционирования — не больше раза вообще); приёмы врача не пересекаются и через границу месяца.
+
     Атрибуты:
         id (int): Уникальный идентификатор записи.
         doctor_id (int): ID врача, к которому записываются.
@@ -71,15 +85,40 @@ class Appointment(Base):
         patient (Patient): Связанный объект пациента.
     """
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    # В составном первичном ключе автоинкремент нужно указать явно
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     doctor_id: Mapped[int] = mapped_column(ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False)
     patient_id: Mapped[int] = mapped_column(ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
-    start_time: Mapped[datetime] = mapped_column(nullable=False)
+    start_time: Mapped[datetime] = mapped_column(primary_key=True, nullable=False)
 
     doctor: Mapped["Doctor"] = relationship(back_populates="appointments")
     patient: Mapped["Patient"] = relationship(back_populates="appointments")
 
-    __table_args__ = (UniqueConstraint("doctor_id", "patient_id", name="unique_doctor_slot"),)
+    __table_args__ = (
+        # Ключи keyset-пагинации: общий список и списки по врачу / пациенту.
+        # INCLUDE добавляет остальные колонки, чтобы чтения шли через Index Only Scan
+        Index("ix_appointments_start_time_id", "start_time", "id", postgresql_include=["doctor_id", "patient_id"]),
+        Index(
+            "ix_appointments_doctor_id_start_time_id",
+            "doctor_id",
+            "start_time",
+            "id",
+            postgresql_include=["patient_id"],
+        ),
+        Index(
+            "ix_appointments_patient_id_start_time_id",
+            "patient_id",
+            "start_time",
+            "id",
+            postgresql_include=["doctor_id"],
+        ),
+        {"postgresql_partition_by": "RANGE (start_time)"},
+    )
+
+    @declared_attr.directive
+    def __mapper_args__(cls) -> Dict[str, Any]:
+        """Первичный ключ для ORM — только id."""
+        return {"primary_key": [cls.__table__.c.id]}
 
     def __repr__(self) -> str:
         """Строковое представление записи на приём."""
@@ -88,3 +127,37 @@ class Appointment(Base):
             f"<Appointment(id={self.id}, doctor_id={self.doctor_id}, patient_id={self.patient_id}, "
             f"start_time='{start_str}')>"
         )
+
+
+class IdempotencyKey(Base):
+    """
+    Сохранённый ответ на POST /api/appointments с заголовком Idempotency-Key.
+
+    Пока запрос выполняется, status_code и response пусты: повтор с тем же ключом в любом воркере
+    видит строку и не запускает бронирование второй раз. После expires_at ключ можно занять заново.
+
+    Атрибуты:
+        key (str): Значение заголовка Idempotency-Key.
+        request_hash (str): SHA-256 тела запроса: ключ нельзя повторно использовать с другим телом.
+        status_code (Optional[int]): Код сохранённого ответа (None — запрос ещё выполняется).
+        response (Optional[bytes]): Тело сохранённого ответа (JSON).
+        expires_at (datetime): Когда ключ перестаёт действовать.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[Optional[int]] = mapped_column(SmallInteger, nullable=True)
+    response: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        """Строковое представление ключа идемпотентности."""
+        return f"<IdempotencyKey(key='{self.key}', status_code={self.status_code}, expires_at='{self.expires_at}')>"
+
+
+# Без секций в секционированную таблицу нельзя вставить ни одной строки: при create_all
+# создаётся секция по умолчанию, помесячные секции добавляет app.appointments.partitions
+for _ddl in default_partition_ddl():
+    event.listen(Appointment.__table__, "after_create", DDL(_ddl))
@@ -0,0 +1,210 @@
+"""
+Обслуживание помесячных секций таблицы appointments.
+
+Таблица appointments секционирована по диапазонам start_time: секция appointments_YYYY_MM на каждый месяц
+и appointments_default для записей вне созданных месяцев. Ограничения unique_doctor_patient
+и no_doctor_overlap создаются в каждой секции (PostgreSQL не поддерживает их на секционированной таблице
+без ключа секционирования), поэтому действуют в пределах месяца: пара врач-пациент уникальна в пределах
+месяца, а пересечения приёмов у границы месяца дополнительно проверяет AppointmentDAO (crosses_month_edge).
+
+Запуск:
+    ENV=local python -m app.appointments.partitions --ahead 3 --retain 12
+    ENV=local python -m app.appointments.partitions --retain 24 --drop
+"""
+
+import argparse
+import asyncio
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import logger
+from app.database import engine as app_engine
+
+TABLE = "appointments"
+DEFAULT_PARTITION = f"{TABLE}_default"
+ARCHIVE_SCHEMA = "archive"
+
+
+def month_start(day: date) -> date:
+    """Первое число месяца указанной даты."""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца через months месяцев (months может быть отрицательным)."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Имя секции месяца: appointments_YYYY_MM."""
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+def partition_constraints_ddl(name: str) -> List[str]:
+    """
+    Ограничения одной секции: пара врач-пациент уникальна, приёмы врача не пересекаются.
+
+    Имена ограничений оканчиваются на unique_doctor_patient и no_doctor_overlap — по этим окончаниям
+    AppointmentDAO отличает конфликт времени от других ошибок.
+
+    :param name: Имя секции.
+    :return: DDL-выражения.
+    """
+    return [
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_unique_doctor_patient UNIQUE (doctor_id, patient_id)",
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_no_doctor_overlap EXCLUDE USING gist "
+        f"(doctor_id WITH =, tsrange(start_time, start_time + interval '1 hour') WITH &&)",
+    ]
+
+
+def default_partition_ddl() -> List[str]:
+    """DDL секции по умолчанию вместе с её ограничениями."""
+    return [f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"] + partition_constraints_ddl(
+        DEFAULT_PARTITION
+    )
+
+
+async def list_partitions(connection: AsyncConnection) -> List[str]:
+    """
+    Имена помесячных секций appointments, прикреплённых сейчас, по возрастанию месяца.
+
+    :param connection: Соединение с БД.
+    :return: Имена секций (без секции по умолчанию).
+    """
+    result = await connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND c.relname <> :default ORDER BY c.relname"
+        ),
+        {"table": TABLE, "default": DEFAULT_PARTITION},
+    )
+    return list(result.scalars().all())
+
+
+async def create_partition(connection: AsyncConnection, month: date) -> None:
+    """
+    Создаёт секцию месяца и прикрепляет её к appointments.
+
+    Записи этого месяца, попавшие ранее в секцию по умолчанию, переносятся в новую секцию
+    в той же транзакции — иначе PostgreSQL не даст прикрепить секцию.
+
+    :param connection: Соединение с БД (транзакцию фиксирует вызывающий).
+    :param month: Первое число месяца.
+    """
+    name = partition_name(month)
+    bounds = {"lo": month, "hi": add_months(month, 1)}
+    await connection.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)"))
+    for ddl in partition_constraints_ddl(name):
+        await connection.execute(text(ddl))
+    moved = await connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE start_time >= :lo AND start_time < :hi RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    await connection.execute(
+        text(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{bounds['lo']}') TO ('{bounds['hi']}')")
+    )
+    logger.info(f"Создана секция {name}, перенесено из {DEFAULT_PARTITION}: {moved.rowcount}")
+
+
+async def create_partitions(connection: AsyncConnection, start: date, end: date) -> List[str]:
+    """
+    Создаёт недостающие секции для месяцев в диапазоне [start, end).
+
+    :param connection: Соединение с БД (транзакцию фиксирует вызывающий).
+    :param start: Любая дата первого месяца.
+    :param end: Любая дата месяца, следующего за последним.
+    :return: Имена созданных секций.
+    """
+    existing = set(await list_partitions(connection))
+    created = []
+    month = month_start(start)
+    while month < month_start(end):
+        if partition_name(month) not in existing:
+            await create_partition(connection, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+async def detach_partition(connection: AsyncConnection, name: str, drop: bool = False) -> None:
+    """
+    Открепляет секцию от appointments и переносит её в схему archive (или удаляет).
+
+    Записи открепленной секции пропадают из API, но в схеме archive остаются доступны для выгрузки.
+
+    :param connection: Соединение с БД (транзакцию фиксирует вызывающий).
+    :param name: Имя секции.
+    :param drop: Удалить секцию вместо архивации.
+    """
+    await connection.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+    if drop:
+        await connection.execute(text(f"DROP TABLE {name}"))
+        logger.info(f"Секция {name} удалена")
+    else:
+        await connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        await connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        logger.info(f"Секция {name} перенесена в схему {ARCHIVE_SCHEMA}")
+
+
+async def detach_partitions(connection: AsyncConnection, before: date, drop: bool = False) -> List[str]:
+    """
+    Открепляет секции месяцев раньше before (см. detach_partition).
+
+    :param connection: Соединение с БД (транзакцию фиксирует вызывающий).
+    :param before: Секции месяцев строго раньше месяца этой даты открепляются.
+    :param drop: Удалить секции вместо архивации.
+    :return: Имена открепленных секций.
+    """
+    cutoff = partition_name(month_start(before))
+    detached = [name for name in await list_partitions(connection) if name < cutoff]
+    for name in detached:
+        await detach_partition(connection, name, drop=drop)
+    return detached
+
+
+async def maintain_partitions(
+    engine: AsyncEngine,
+    months_ahead: int = 3,
+    retain_months: Optional[int] = None,
+    drop: bool = False,
+    today: Optional[date] = None,
+) -> None:
+    """
+    Создаёт секции на months_ahead месяцев вперёд и (если задан retain_months) убирает старые.
+
+    :param engine: Движок БД.
+    :param months_ahead: Сколько будущих месяцев подготовить, не считая текущего.
+    :param retain_months: Сколько прошедших месяцев оставить в таблице (None — ничего не убирать).
+    :param drop: Удалять старые секции вместо архивации.
+    :param today: Текущая дата (подменяется в тестах).
+    """
+    current = month_start(today or date.today())
+    async with engine.begin() as connection:
+        await create_partitions(connection, current, add_months(current, months_ahead + 1))
+        if retain_months is not None:
+            await detach_partitions(connection, add_months(current, -retain_months), drop=drop)
+
+
+async def main() -> None:
+    """Точка входа команды обслуживания секций."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ahead", type=int, default=3, help="Сколько будущих месяцев подготовить")
+    parser.add_argument("--retain", type=int, default=None, help="Сколько прошедших месяцев оставить")
+    parser.add_argument("--drop", action="store_true", help="Удалять старые секции вместо переноса в archive")
+    args = parser.parse_args()
+
+    await maintain_partitions(app_engine, months_ahead=args.ahead, retain_months=args.retain, drop=args.drop)
+    await app_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,14 +1,193 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import Annotated, List, Optional, Union
+
+import orjson
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql import Executable
 from starlette import status
 
-from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
-from app.appointments.rb import RBAppointmentRead
+from app.appointments.dao import AppointmentDAO, DoctorDAO, IdempotencyKeyDAO, OnCreated, PatientDAO
+from app.appointments.export import MEDIA_TYPES, ExportFormat, stream_export
+from app.appointments.idempotency import release_key, replay_response, request_fingerprint
+from app.appointments.models import Appointment
+from app.appointments.rb import (
+    RBAppointmentBatchItem,
+    RBAppointmentBatchResult,
+    RBAppointmentRead,
+    RBAppointmentsByIds,
+    RBCalendarDay,
+    RBCalendarItem,
+    RBDoctorCalendar,
+    RBDoctorRead,
+    RBFreeSlot,
+    RBPage,
+    RBPatientAppointmentRead,
+    RBPatientRead,
+)
+from app.appointments.schedule import APPOINTMENT_DURATION, free_gaps, free_slots, merge_free_slots
 from app.appointments.schemas import SAppointmentCreate
-from app.config import logger
-from app.dependencies import get_session
+from app.config import logger, settings
+from app.dependencies import get_read_session, get_read_session_maker, get_session
+from app.exceptions.exceptions_classes import DoctorNotFoundError, PatientNotFoundError
+from app.exceptions.exceptions_methods import http_exception_content
+from app.metrics import APPOINTMENT_BOOKINGS
+from app.request_log import hot_logger
 
 router = APIRouter(prefix="/api", tags=["Appointments"])
+doctors_router = APIRouter(prefix="/api", tags=["Doctors"])
+patients_router = APIRouter(prefix="/api", tags=["Patients"])
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+MAX_GET_IDS = 200  # ID в параметре ids запроса GET /appointments; больше — через POST /appointments/by-ids
+MAX_LOOKUP_IDS = 10_000
+
+DEFAULT_FREE_SLOTS_WINDOW = timedelta(days=14)
+MAX_FREE_SLOTS_WINDOW = timedelta(days=31)
+DEFAULT_FREE_SLOTS_LIMIT = 100
+DEFAULT_CALENDAR_WINDOW = timedelta(days=7)
+MAX_FREE_SLOTS_LIMIT = 2000
+
+PageCursor = Annotated[Optional[str], Query(description="Курсор next_cursor из предыдущей страницы")]
+PageLimit = Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE, description="Размер страницы")]
+
+
+SlotsFrom = Annotated[Optional[datetime], Query(alias="from", description="Начало окна (по умолчанию — сейчас)")]
+SlotsTo = Annotated[Optional[datetime], Query(alias="to", description="Конец окна (по умолчанию — через 14 дней)")]
+CalendarFrom = Annotated[
+    Optional[datetime], Query(alias="from", description="Начало окна (по умолчанию — начало сегодняшнего дня)")
+]
+CalendarTo = Annotated[Optional[datetime], Query(alias="to", description="Конец окна (по умолчанию — через 7 дней)")]
+SlotsLimit = Annotated[int, Query(ge=1, le=MAX_FREE_SLOTS_LIMIT, description="Максимум слотов в ответе")]
+IdempotencyKeyHeader = Annotated[
+    Optional[str],
+    Header(
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Ключ повтора: запрос с тем же ключом и телом вернёт сохранённый ответ без повторного бронирования",
+    ),
+]
+
+
+def _bad_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор")
+
+
+def _slots_window(
+    start_from: datetime | None, start_to: datetime | None, default_length: timedelta = DEFAULT_FREE_SLOTS_WINDOW
+) -> tuple[datetime, datetime]:
+    """Окно поиска свободных слотов (или календаря) с умолчаниями и ограничением длины."""
+    start_from = start_from or datetime.now()
+    start_to = start_to or start_from + default_length
+    if not start_from < start_to <= start_from + MAX_FREE_SLOTS_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Окно поиска должно быть непустым и не длиннее {MAX_FREE_SLOTS_WINDOW.days} дней",
+        )
+    return start_from, start_to
+
+
+@router.get(
+    "/appointments",
+    response_model=Union[RBPage[RBAppointmentRead], RBAppointmentsByIds],
+    summary="Список записей на приём",
+)
+async def list_appointments(
+    doctor_id: Optional[int] = None,
+    patient_id: Optional[int] = None,
+    start_from: Annotated[Optional[datetime], Query(alias="from", description="Начало окна по start_time")] = None,
+    start_to: Annotated[Optional[datetime], Query(alias="to", description="Конец окна по start_time")] = None,
+    cursor: PageCursor = None,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    ids: Annotated[
+        Optional[str],
+        Query(pattern=r"^\d+(,\d+)*$", description=f"ID записей через запятую (не больше {MAX_GET_IDS})"),
+    ] = None,
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """
+    Получить страницу записей на приём, отсортированных по (start_time, id).
+
+    Пагинация курсорная: чтобы получить следующую страницу, передайте next_cursor в cursor.
+    Глубина страницы не влияет на время ответа — OFFSET не используется.
+    JSON собирается прямо из строк выборки, минуя ORM-объекты и модели Pydantic.
+
+    С параметром ids возвращаются записи с этими ID (RBAppointmentsByIds) одним запросом к БД —
+    вместо отдельного GET /appointments/{id} на каждую. Остальные параметры вместе с ids не допускаются.
+    """
+    if ids is not None:
+        if any(value is not None for value in (doctor_id, patient_id, start_from, start_to, cursor)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Параметр ids не сочетается с фильтрами и курсором"
+            )
+        id_list = [int(value) for value in ids.split(",")]
+        if len(id_list) > MAX_GET_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Не больше {MAX_GET_IDS} ID в запросе, для большего списка используйте POST /api/appointments/by-ids",
+            )
+        payload = await AppointmentDAO.find_many_payload_by_ids(session, id_list)
+        return Response(content=payload, media_type="application/json")
+
+    filter_by = {
+        key: value for key, value in {"doctor_id": doctor_id, "patient_id": patient_id}.items() if value is not None
+    }
+    try:
+        payload = await AppointmentDAO.find_page_payload(
+            session, cursor=cursor, limit=limit, start_from=start_from, start_to=start_to, **filter_by
+        )
+    except ValueError:
+        raise _bad_cursor()
+    return Response(content=payload, media_type="application/json")
+
+
+@router.post(
+    "/appointments/by-ids",
+    response_model=RBAppointmentsByIds,
+    summary="Получить записи на приём по списку ID",
+)
+async def get_appointments_by_ids(
+    ids: Annotated[List[int], Body(min_length=1, max_length=MAX_LOOKUP_IDS)],
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """
+    Получить записи на приём по списку ID (JSON-массив в теле запроса) одним запросом к БД.
+
+    Вариант GET /appointments?ids=... для больших списков. Записи возвращаются в порядке ID
+    из запроса (повторы — один раз), ID без записи перечисляются в missing.
+    """
+    payload = await AppointmentDAO.find_many_payload_by_ids(session, ids)
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get(
+    "/appointments/export",
+    response_class=StreamingResponse,
+    summary="Выгрузка записей на приём за период",
+)
+async def export_appointments(
+    export_format: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+    start_from: Annotated[Optional[datetime], Query(alias="from", description="Начало окна по start_time")] = None,
+    start_to: Annotated[Optional[datetime], Query(alias="to", description="Конец окна по start_time")] = None,
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_read_session_maker),
+) -> StreamingResponse:
+    """
+    Выгрузить записи на приём в формате NDJSON или CSV.
+
+    Строки читаются серверным курсором и сразу отправляются клиенту,
+    поэтому потребление памяти не зависит от размера периода.
+    """
+    hot_logger().info("📤 Выгрузка записей: format={}, from={}, to={}", export_format, start_from, start_to)
+    return StreamingResponse(
+        stream_export(session_maker, export_format, start_from, start_to),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="appointments.{export_format}"'},
+    )
 
 
 @router.get(
@@ -18,33 +197,33 @@ router = APIRouter(prefix="/api", tags=["Appointments"])
 )
 async def get_appointment_by_id(
     appointment_id: int,
-    session: AsyncSession = Depends(get_session),
-) -> RBAppointmentRead:
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
     """
     Получить запись на приём по ID.
 
+    Ответ берётся из кэша AppointmentDAO.cache уже сериализованным; при промахе читается из БД.
+
     Args:
         appointment_id (int): Уникальный идентификатор записи.
         session (AsyncSession): Асинхронная сессия базы данных.
 
     Returns:
-        AppointmentRead: Данные о записи на приём.
+        Response: JSON с данными о записи на приём (RBAppointmentRead).
 
     Raises:
         HTTPException: 404, если запись не найдена.
     """
-    logger.info(f"🔍 Запрос на получение записи с ID={appointment_id}")
+    hot_logger().info("🔍 Запрос на получение записи с ID={}", appointment_id)
 
-    appointment = await AppointmentDAO.find_one_or_none_by_id(session, appointment_id)
-    if appointment is None:
+    payload = await AppointmentDAO.find_one_payload_by_id(session, appointment_id)
+    if payload is None:
         logger.warning(f"❌ Запись с ID={appointment_id} не найдена")
         raise HTTPException(status_code=404, detail="Запись не найдена")
 
-    logger.success(
-        f"✅ Найдена запись: ID={appointment.id}, " f"start_time={appointment.start_time.strftime('%Y-%m-%d %H:%M')}"
-    )
+    hot_logger().success("✅ Найдена запись: ID={}", appointment_id)
 
-    return RBAppointmentRead.model_validate(appointment)
+    return Response(content=payload, media_type="application/json")
 
 
 @router.post(
@@ -56,32 +235,298 @@ async def get_appointment_by_id(
 async def create_appointment(
     data: SAppointmentCreate,
     session: AsyncSession = Depends(get_session),
-) -> RBAppointmentRead:
+    idempotency_key: IdempotencyKeyHeader = None,
+) -> Union[RBAppointmentRead, Response]:
     """
     Создать новую запись на приём.
 
     Проверяет, что у врача нет другой записи в это время и в течение часа после,
     а так же записи с этим пациентом.
+    При BOOKING_MODE=single_statement все проверки и вставка выполняются одним запросом.
+
+    С заголовком Idempotency-Key ответ (201 или 4xx) сохраняется на IDEMPOTENCY_TTL_SECONDS:
+    повтор с тем же ключом и телом получает его с заголовком Idempotent-Replayed: true,
+    не выполняя бронирование. Пока первый запрос выполняется, повтор получает 409 с Retry-After,
+    тот же ключ с другим телом — 422. Ответ 201 сохраняется в той же транзакции, что и запись,
+    а при сбое или отмене запроса до неё ключ освобождается.
     """
-    # Проверка, что доктор существует
-    doctor = await DoctorDAO.find_one_or_none_by_id(session, data.doctor_id)
-    if not doctor:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Доктор с ID {data.doctor_id} не найден.")
-
-    # Проверка, что пациент существует
-    patient = await PatientDAO.find_one_or_none_by_id(session, data.patient_id)
-    if not patient:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Пациент с ID {data.patient_id} не найден.")
-    logger.info(
-        f"📝 Попытка создать запись: доктор={data.doctor_id}, пациент={data.patient_id}, время={data.start_time}"
+    if idempotency_key is None:
+        return await _book_appointment(data, session)
+
+    request_hash = request_fingerprint(data.model_dump(mode="json"))
+    stored = await IdempotencyKeyDAO.claim(
+        session,
+        idempotency_key,
+        request_hash,
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+    )
+    if stored is not None:
+        return replay_response(stored, request_hash)
+
+    def save_created(created: Appointment) -> Executable:
+        # Ответ 201 сохраняется в транзакции бронирования: запись без сохранённого ответа не фиксируется
+        content = orjson.dumps(RBAppointmentRead.model_validate(created).model_dump(mode="json"))
+        return IdempotencyKeyDAO.save_response_statement(idempotency_key, status.HTTP_201_CREATED, content)
+
+    try:
+        appointment = await _book_appointment(data, session, on_created=save_created)
+    except HTTPException as e:
+        await IdempotencyKeyDAO.save_response(
+            session, idempotency_key, e.status_code, orjson.dumps(http_exception_content(e))
+        )
+        raise
+    except BaseException:
+        await release_key(session, idempotency_key)
+        raise
+    content = orjson.dumps(appointment.model_dump(mode="json"))
+    return Response(content=content, status_code=status.HTTP_201_CREATED, media_type="application/json")
+
+
+async def _book_appointment(
+    data: SAppointmentCreate, session: AsyncSession, on_created: Optional[OnCreated] = None
+) -> RBAppointmentRead:
+    """Бронирование для POST /appointments: проверки, вставка и счётчики результата."""
+    if settings.BOOKING_MODE == "classic":
+        # Проверка, что доктор существует
+        doctor = await DoctorDAO.find_one_or_none_by_id(session, data.doctor_id)
+        if not doctor:
+            APPOINTMENT_BOOKINGS.labels("not_found").inc()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"Доктор с ID {data.doctor_id} не найден."
+            )
+
+        # Проверка, что пациент существует
+        patient = await PatientDAO.find_one_or_none_by_id(session, data.patient_id)
+        if not patient:
+            APPOINTMENT_BOOKINGS.labels("not_found").inc()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"Пациент с ID {data.patient_id} не найден."
+            )
+    hot_logger().info(
+        "📝 Попытка создать запись: доктор={}, пациент={}, время={}", data.doctor_id, data.patient_id, data.start_time
     )
     try:
-        new_appointment = await AppointmentDAO.add(async_session=session, **data.model_dump())
+        if settings.BOOKING_MODE == "single_statement":
+            new_appointment = await AppointmentDAO.book(
+                async_session=session, on_created=on_created, **data.model_dump()
+            )
+        else:
+            new_appointment = await AppointmentDAO.add(
+                async_session=session, on_created=on_created, **data.model_dump()
+            )
+    except (DoctorNotFoundError, PatientNotFoundError) as e:
+        APPOINTMENT_BOOKINGS.labels("not_found").inc()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ValueError as e:
-        logger.warning(f"Не удалось создать запись в lifespan: {e}")
+        APPOINTMENT_BOOKINGS.labels("conflict").inc()
+        logger.warning(f"Не удалось создать запись: {e}")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Время приёма занято или перекрывается с другим приёмом."
         )
 
-    logger.success(f"✅ Запись создана: ID={new_appointment.id}")
+    APPOINTMENT_BOOKINGS.labels("created").inc()
+    hot_logger().success("✅ Запись создана: ID={}", new_appointment.id)
     return RBAppointmentRead.model_validate(new_appointment)
+
+
+@router.post(
+    "/appointments/batch",
+    response_model=RBAppointmentBatchResult,
+    summary="Создать пачку записей на приём",
+)
+async def create_appointments_batch(
+    data: Annotated[
+        List[SAppointmentCreate],
+        Body(min_length=1, max_length=settings.BOOKING_BATCH_MAX_ITEMS),
+    ],
+    session: AsyncSession = Depends(get_session),
+) -> RBAppointmentBatchResult:
+    """
+    Создать записи на приём пачкой (например, импорт недельного расписания клиники).
+
+    Все элементы проверяются и вставляются одним SQL-запросом по тем же правилам, что и
+    одиночная запись: ±1 час у врача и не более одной записи пациента к врачу — как с уже
+    существующими записями, так и внутри пачки (выигрывает элемент, стоящий раньше).
+    Ошибка в одном элементе не отменяет остальные: результат возвращается по каждому элементу.
+    """
+    hot_logger().info("📝 Пакетное создание записей: {} шт.", len(data))
+    results = await AppointmentDAO.book_batch(session, [item.model_dump() for item in data])
+
+    items = [
+        RBAppointmentBatchItem(
+            index=index,
+            status=item_status,  # type: ignore[arg-type]
+            appointment=RBAppointmentRead.model_validate(appointment) if appointment is not None else None,
+        )
+        for index, (item_status, appointment) in enumerate(results)
+    ]
+    created = sum(1 for item in items if item.status == "created")
+    hot_logger().success("✅ Пакет обработан: создано {}, отклонено {}", created, len(items) - created)
+    return RBAppointmentBatchResult(created=created, rejected=len(items) - created, items=items)
+
+
+@doctors_router.get(
+    "/doctors",
+    response_model=RBPage[RBDoctorRead],
+    summary="Список врачей",
+)
+async def list_doctors(
+    specialization: Optional[str] = None,
+    cursor: PageCursor = None,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    session: AsyncSession = Depends(get_read_session),
+) -> RBPage[RBDoctorRead]:
+    """Получить страницу врачей, отсортированных по id, с необязательным фильтром по специализации."""
+    filter_by = {"specialization": specialization} if specialization else {}
+    try:
+        doctors, next_cursor = await DoctorDAO.find_page(session, cursor=cursor, limit=limit, **filter_by)
+    except ValueError:
+        raise _bad_cursor()
+    return RBPage[RBDoctorRead](items=[RBDoctorRead.model_validate(d) for d in doctors], next_cursor=next_cursor)
+
+
+@doctors_router.get(
+    "/doctors/{doctor_id}/free-slots",
+    response_model=List[RBFreeSlot],
+    summary="Свободные слоты врача",
+)
+async def get_doctor_free_slots(
+    doctor_id: int,
+    start_from: SlotsFrom = None,
+    start_to: SlotsTo = None,
+    limit: SlotsLimit = DEFAULT_FREE_SLOTS_LIMIT,
+    session: AsyncSession = Depends(get_read_session),
+) -> List[RBFreeSlot]:
+    """
+    Получить свободные часовые слоты врача в окне, по возрастанию времени.
+
+    Слоты начинаются в 8:00–18:00 с шагом 15 минут и не пересекаются с приёмами врача.
+    """
+    start_from, start_to = _slots_window(start_from, start_to)
+    busy = await DoctorDAO.find_busy_times(session, start_from, start_to, id=doctor_id)
+    if not busy:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(DoctorNotFoundError(doctor_id)))
+    slots = islice(free_slots(busy[doctor_id], start_from, start_to), limit)
+    return [RBFreeSlot(doctor_id=doctor_id, start_time=start_time) for start_time in slots]
+
+
+@doctors_router.get(
+    "/doctors/{doctor_id}/calendar",
+    response_model=RBDoctorCalendar,
+    summary="Календарь врача по дням",
+)
+async def get_doctor_calendar(
+    doctor_id: int,
+    start_from: CalendarFrom = None,
+    start_to: CalendarTo = None,
+    session: AsyncSession = Depends(get_read_session),
+) -> RBDoctorCalendar:
+    """
+    Получить приёмы врача в окне, сгруппированные по дням, с именами пациентов.
+
+    Между приёмами отмечены свободные промежутки рабочего времени (8:00–18:00).
+    Данные читаются одним запросом к БД независимо от количества приёмов.
+    """
+    start_from, start_to = _slots_window(
+        start_from or datetime.combine(date.today(), time.min), start_to, DEFAULT_CALENDAR_WINDOW
+    )
+    rows = await DoctorDAO.find_calendar(session, doctor_id, start_from, start_to)
+    if rows is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(DoctorNotFoundError(doctor_id)))
+
+    items = [
+        RBCalendarItem(
+            kind="appointment",
+            start_time=row.start_time,
+            end_time=row.start_time + APPOINTMENT_DURATION,
+            appointment_id=row.id,
+            patient_id=row.patient_id,
+            patient_name=row.patient_name,
+        )
+        for row in rows
+    ]
+    items += [
+        RBCalendarItem(kind="free", start_time=gap_start, end_time=gap_end)
+        for gap_start, gap_end in free_gaps([row.start_time for row in rows], start_from, start_to)
+    ]
+    by_day: dict[date, List[RBCalendarItem]] = {}
+    for item in sorted(items, key=lambda item: item.start_time):
+        by_day.setdefault(item.start_time.date(), []).append(item)
+
+    last_day = (start_to - timedelta(microseconds=1)).date()
+    days = [start_from.date() + timedelta(days=n) for n in range((last_day - start_from.date()).days + 1)]
+    return RBDoctorCalendar(
+        doctor_id=doctor_id, days=[RBCalendarDay(day=day, items=by_day.get(day, [])) for day in days]
+    )
+
+
+@doctors_router.get(
+    "/free-slots",
+    response_model=List[RBFreeSlot],
+    summary="Ближайшие свободные слоты среди врачей",
+)
+async def find_free_slots(
+    specialization: Optional[str] = None,
+    start_from: SlotsFrom = None,
+    start_to: SlotsTo = None,
+    limit: SlotsLimit = DEFAULT_FREE_SLOTS_LIMIT,
+    session: AsyncSession = Depends(get_read_session),
+) -> List[RBFreeSlot]:
+    """
+    Получить ближайшие свободные слоты у любых врачей (с фильтром по специализации).
+
+    Занятость всех подходящих врачей читается одним запросом, слоты врачей сливаются по времени,
+    при равном времени первым идёт врач с меньшим ID.
+    """
+    start_from, start_to = _slots_window(start_from, start_to)
+    filter_by = {"specialization": specialization} if specialization else {}
+    busy = await DoctorDAO.find_busy_times(session, start_from, start_to, **filter_by)
+    slots = merge_free_slots(busy, start_from, start_to, limit)
+    return [RBFreeSlot(doctor_id=doctor_id, start_time=start_time) for start_time, doctor_id in slots]
+
+
+@patients_router.get(
+    "/patients",
+    response_model=RBPage[RBPatientRead],
+    summary="Список пациентов",
+)
+async def list_patients(
+    cursor: PageCursor = None,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    session: AsyncSession = Depends(get_read_session),
+) -> RBPage[RBPatientRead]:
+    """Получить страницу пациентов, отсортированных по id."""
+    try:
+        patients, next_cursor = await PatientDAO.find_page(session, cursor=cursor, limit=limit)
+    except ValueError:
+        raise _bad_cursor()
+    return RBPage[RBPatientRead](items=[RBPatientRead.model_validate(p) for p in patients], next_cursor=next_cursor)
+
+
+@patients_router.get(
+    "/patients/{patient_id}/appointments",
+    response_model=RBPage[RBPatientAppointmentRead],
+    summary="История записей пациента",
+)
+async def list_patient_appointments(
+    patient_id: int,
+    cursor: PageCursor = None,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    session: AsyncSession = Depends(get_read_session),
+) -> RBPage[RBPatientAppointmentRead]:
+    """
+    Получить страницу записей пациента, отсортированных по (start_time, id), с именем и специализацией врача.
+
+    Пагинация курсорная, как в GET /appointments. Страница читается одним запросом к БД.
+    """
+    try:
+        page = await AppointmentDAO.find_patient_history(session, patient_id, cursor=cursor, limit=limit)
+    except ValueError:
+        raise _bad_cursor()
+    if page is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(PatientNotFoundError(patient_id)))
+    rows, next_cursor = page
+    return RBPage[RBPatientAppointmentRead](
+        items=[RBPatientAppointmentRead.model_validate(row) for row in rows], next_cursor=next_cursor
+    )
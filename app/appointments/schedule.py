@@ -0,0 +1,104 @@
+import heapq
+from datetime import datetime, time, timedelta
+from itertools import islice
+from typing import Iterator, List, Mapping, Sequence, Tuple
+
+DAY_START = time(8, 0)  # Первый слот дня
+DAY_END = time(18, 0)  # Слоты начинаются строго раньше этого времени
+SLOT_STEP = timedelta(minutes=15)  # Шаг сетки слотов
+APPOINTMENT_DURATION = timedelta(hours=1)  # Длительность приёма
+
+
+def slot_grid(start: datetime, end: datetime) -> Iterator[datetime]:
+    """
+    Перебирает слоты сетки (8:00–18:00 с шагом 15 минут) в окне [start, end).
+
+    :param start: Начало окна.
+    :param end: Конец окна (не включается).
+    :return: Итератор начала слотов по возрастанию.
+    """
+    day = start.date()
+    while day <= end.date():
+        slot = datetime.combine(day, DAY_START)
+        day_end = datetime.combine(day, DAY_END)
+        if slot < start:
+            # Округляем вверх до ближайшего слота сетки
+            steps = -(-(start - slot) // SLOT_STEP)
+            slot += steps * SLOT_STEP
+        while slot < day_end and slot < end:
+            yield slot
+            slot += SLOT_STEP
+        day += timedelta(days=1)
+
+
+def free_slots(busy: Sequence[datetime], start: datetime, end: datetime) -> Iterator[datetime]:
+    """
+    Свободные слоты врача в окне [start, end).
+
+    Слот свободен, если ни один приём врача не пересекается с часом, начинающимся в этот слот.
+    Занятость и сетка проходятся одним проходом, поэтому сложность O(слоты + приёмы).
+
+    :param busy: Время начала приёмов врача, отсортированное по возрастанию.
+    :param start: Начало окна.
+    :param end: Конец окна (не включается).
+    :return: Итератор свободных слотов по возрастанию.
+    """
+    i = 0
+    for slot in slot_grid(start, end):
+        # Пропускаем приёмы, которые закончились к началу слота
+        while i < len(busy) and busy[i] + APPOINTMENT_DURATION <= slot:
+            i += 1
+        if i < len(busy) and busy[i] < slot + APPOINTMENT_DURATION:
+            continue
+        yield slot
+
+
+def free_gaps(busy: Sequence[datetime], start: datetime, end: datetime) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Свободные промежутки рабочего времени (8:00–18:00) врача в окне [start, end).
+
+    :param busy: Время начала приёмов врача, отсортированное по возрастанию.
+    :param start: Начало окна.
+    :param end: Конец окна (не включается).
+    :return: Итератор пар (начало, конец) промежутков по возрастанию.
+    """
+    i = 0
+    day = start.date()
+    while day <= end.date():
+        cursor = max(datetime.combine(day, DAY_START), start)
+        day_end = min(datetime.combine(day, DAY_END), end)
+        while i < len(busy) and busy[i] < day_end:
+            if busy[i] > cursor:
+                yield cursor, busy[i]
+            cursor = max(cursor, busy[i] + APPOINTMENT_DURATION)
+            i += 1
+        if cursor < day_end:
+            yield cursor, day_end
+        day += timedelta(days=1)
+
+
+def merge_free_slots(
+    busy_by_doctor: Mapping[int, Sequence[datetime]],
+    start: datetime,
+    end: datetime,
+    limit: int,
+) -> List[Tuple[datetime, int]]:
+    """
+    Ближайшие свободные слоты среди нескольких врачей.
+
+    Слоты каждого врача генерируются лениво и сливаются по времени,
+    поэтому вычисляется только то, что попадёт в ответ.
+
+    :param busy_by_doctor: Отсортированная занятость по ID врача (врачи без приёмов — с пустым списком).
+    :param start: Начало окна.
+    :param end: Конец окна (не включается).
+    :param limit: Максимальное количество слотов.
+    :return: Пары (время слота, ID врача) по возрастанию времени, при равенстве — по ID врача.
+    """
+    streams = [_tagged(doctor_id, free_slots(busy, start, end)) for doctor_id, busy in busy_by_doctor.items()]
+    return list(islice(heapq.merge(*streams), limit))
+
+
+def _tagged(doctor_id: int, slots: Iterator[datetime]) -> Iterator[Tuple[datetime, int]]:
+    for slot in slots:
+        yield slot, doctor_id
@@ -0,0 +1,181 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from app.config import Settings
+from app.metrics import CACHE_REQUESTS
+
+
+class CacheBackend(ABC):
+    """
+    Базовый класс кэша для DAO.
+
+    Хранит готовые байты (например, сериализованный ответ) и считает попадания и промахи —
+    в атрибутах для /health/cache и в метрике cache_requests_total для /metrics.
+
+    Атрибуты:
+        name (str): Название бэкенда для мониторинга.
+        hits (int): Количество попаданий.
+        misses (int): Количество промахов.
+    """
+
+    name: str = "base"
+
+    def __init__(self) -> None:
+        """Обнуляет счётчики."""
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Получить значение по ключу с учётом счётчиков попаданий и промахов."""
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels(self.name, "miss").inc()
+        else:
+            self.hits += 1
+            CACHE_REQUESTS.labels(self.name, "hit").inc()
+        return value
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[bytes]:
+        """Получить значение по ключу из хранилища."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        """Сохранить значение."""
+
+    @abstractmethod
+    async def delete(self, keys: Iterable[str]) -> None:
+        """Удалить значения по ключам."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Удалить все значения этого кэша."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Счётчики для мониторинга."""
+        return {"backend": self.name, "hits": self.hits, "misses": self.misses}
+
+
+class MemoryCache(CacheBackend):
+    """
+    LRU-кэш в памяти процесса с TTL.
+
+    Каждый воркер uvicorn держит свою копию, а изменение записи сбрасывает кэш только своего воркера,
+    поэтому при нескольких воркерах остальные отдают устаревшее значение до ttl секунд.
+    Если это недопустимо, используйте RedisCache.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 60, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Создаёт пустой кэш.
+
+        :param max_size: Максимальное количество ключей.
+        :param ttl: Время жизни значения в секундах.
+        :param clock: Источник времени (подменяется в тестах).
+        """
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._data: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= self.clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        """Сохранить значение, вытеснив самое давно использованное при переполнении."""
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        """Удалить значения по ключам."""
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        """Удалить все значения."""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Счётчики для мониторинга и текущий размер."""
+        return {**super().stats(), "size": len(self._data)}
+
+
+class RedisCache(CacheBackend):
+    """
+    Кэш в Redis (или совместимом хранилище), общий для всех воркеров.
+
+    Клиент должен поддерживать асинхронные get, set(ex=...), delete и scan_iter(match=...),
+    как redis.asyncio.Redis.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, ttl: float = 60, prefix: str = "girumed:") -> None:
+        """
+        Создаёт кэш поверх клиента.
+
+        :param client: Асинхронный клиент Redis.
+        :param ttl: Время жизни значения в секундах.
+        :param prefix: Префикс ключей, чтобы clear не задевал чужие данные.
+        """
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        """Сохранить значение с TTL."""
+        await self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl)))
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        """Удалить значения по ключам."""
+        prefixed = [self.prefix + key for key in keys]
+        if prefixed:
+            await self.client.delete(*prefixed)
+
+    async def clear(self) -> None:
+        """Удалить все ключи с префиксом этого кэша."""
+        keys = [key async for key in self.client.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+def build_cache(settings: Settings, prefix: str) -> Optional[CacheBackend]:
+    """
+    Создаёт кэш по настройкам CACHE_BACKEND.
+
+    :param settings: Настройки приложения.
+    :param prefix: Префикс ключей (для Redis).
+    :raises RuntimeError: Если выбран redis, но пакет redis не установлен или не задан REDIS_URL.
+    :return: Кэш или None, если кэширование выключено.
+    """
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCache(max_size=settings.CACHE_MAX_SIZE, ttl=settings.CACHE_TTL_SECONDS)
+    if settings.CACHE_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("Для CACHE_BACKEND=redis нужно задать REDIS_URL")
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise RuntimeError("Для CACHE_BACKEND=redis установите пакет redis") from e
+        return RedisCache(Redis.from_url(settings.REDIS_URL), ttl=settings.CACHE_TTL_SECONDS, prefix=prefix)
+    return None
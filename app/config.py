@@ -1,7 +1,7 @@
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Dict, Literal, Mapping, Optional
 
 from loguru import logger
 from pydantic import Field, SecretStr, ValidationError
@@ -23,6 +23,54 @@ class Settings(BaseSettings):
         DB_NAME (str): Имя основной базы данных.
         DB_TEST (str): Имя тестовой базы данных.
         PYTHONPATH (str): Путь к Python.
+        BOOKING_MODE (str): Способ создания записи: classic (проверки и вставка отдельными запросами)
+            или single_statement (всё одним SQL-выражением).
+        BOOKING_SERIALIZATION (str): Очередь записей к одному врачу: none, advisory (pg_advisory_xact_lock
+            по doctor_id, общая для всех воркеров) или sharded (asyncio.Lock по doctor_id в пределах воркера).
+        BOOKING_LOCK_SHARDS (int): На сколько asyncio.Lock режима sharded отображаются doctor_id
+            (doctor_id % BOOKING_LOCK_SHARDS).
+        BOOKING_BATCH_LOCK_LIMIT (int): Сколько advisory-блокировок врачей берёт одна транзакция
+            POST /api/appointments/batch; пачка с большим числом врачей выполняется по частям.
+        BOOKING_BATCH_MAX_ITEMS (int): Максимальный размер пачки в POST /api/appointments/batch.
+        IDEMPOTENCY_TTL_SECONDS (int): Сколько хранить ответ POST /api/appointments по заголовку Idempotency-Key.
+        IDEMPOTENCY_LOCK_SECONDS (int): Через сколько секунд запрос с ключом, не сохранивший ответ,
+            считается брошенным, и ключ можно занять заново.
+        ADMISSION_WRITE_LIMIT (int): Сколько запросов записи в /api выполняются одновременно в воркере (0 — без ограничения).
+        ADMISSION_WRITE_QUEUE (int): Сколько запросов записи могут ждать места; остальные сразу получают 503.
+        ADMISSION_WRITE_WAIT (float): Сколько секунд запрос записи ждёт места до ответа 503.
+        ADMISSION_READ_LIMIT (int): То же для чтения (GET и POST /api/appointments/by-ids).
+        ADMISSION_READ_QUEUE (int): Очередь чтения.
+        ADMISSION_READ_WAIT (float): Ожидание места для чтения в секундах.
+        ADMISSION_RETRY_AFTER_SECONDS (int): Значение Retry-After в ответе 503.
+        CACHE_BACKEND (str): Кэш чтения записей: memory (LRU в процессе), redis или none.
+        CACHE_TTL_SECONDS (int): Время жизни значения в кэше. При memory и нескольких воркерах это и граница
+            устаревания: изменение записи сбрасывает кэш только своего воркера, остальные видят старое
+            значение до CACHE_TTL_SECONDS секунд (redis общий для воркеров и такой задержки не имеет).
+        CACHE_MAX_SIZE (int): Максимальное количество ключей в memory-кэше.
+        REDIS_URL (Optional[str]): Адрес Redis для CACHE_BACKEND=redis.
+        DB_POOL_SIZE (int): Постоянных соединений в пуле.
+        DB_MAX_OVERFLOW (int): Сколько соединений можно открыть сверх DB_POOL_SIZE под нагрузкой.
+        DB_POOL_TIMEOUT (float): Сколько секунд ждать свободное соединение, прежде чем вернуть ошибку.
+        DB_POOL_RECYCLE (int): Через сколько секунд переоткрывать соединение (-1 — не переоткрывать).
+        DB_POOL_PRE_PING (bool): Проверять соединение перед выдачей из пула.
+        DB_STATEMENT_CACHE_SIZE (int): Размер кэша подготовленных выражений asyncpg на соединение.
+        DB_PGBOUNCER (bool): Режим совместимости с PgBouncer (transaction pooling):
+            подготовленные выражения не кэшируются.
+        DB_REPLICA_URL (Optional[str]): URL реплики для чтения (postgresql+asyncpg://...). Без него
+            всё чтение идёт в основную БД.
+        DB_REPLICA_MAX_LAG_SECONDS (float): При большем отставании реплики чтение идёт в основную БД.
+        DB_REPLICA_LAG_CHECK_INTERVAL (float): Как часто проверять отставание реплики, в секундах.
+        DB_REPLICA_LAG_CHECK_TIMEOUT (float): Сколько секунд ждать ответа реплики на проверку отставания;
+            не ответившая реплика считается недоступной.
+        LOG_FORMAT (str): Формат логов: text (цветной текст с diagnose) или json (структурированные записи
+            без diagnose и backtrace — для продакшена и высокой нагрузки).
+        LOG_SAMPLE_RATE (float): Доля запросов, для которых пишутся info/debug-сообщения горячих путей.
+        LOG_SAMPLE_RATES (Dict[str, float]): Доли по шаблонам маршрутов, например
+            {"/api/appointments/{appointment_id}": 0.01}; остальные маршруты — LOG_SAMPLE_RATE.
+        SLOW_QUERY_THRESHOLD_MS (float): SQL-запросы дольше этого порога (в миллисекундах) пишутся в лог.
+        PARTITION_MONTHS_AHEAD (int): На сколько месяцев вперёд создавать секции appointments при запуске.
+        STARTUP_MODE (str): Что делать при запуске: migrate (применить миграции Alembic),
+            seed (миграции и демо-данные, если БД пуста) или none (ничего, схема готовится отдельно).
     """
 
     ENV: str = Field(default="db")  # default = local, но может быть 'container' или 'prod'
@@ -38,6 +86,41 @@ class Settings(BaseSettings):
     LOGGER_LEVEL_FILE: str
     LOGGER_ERROR_FILE: str
     LOG_DIR: Path = Path(__file__).resolve().parent / "logs"
+    BOOKING_MODE: Literal["classic", "single_statement"] = "classic"
+    BOOKING_SERIALIZATION: Literal["none", "advisory", "sharded"] = "none"
+    BOOKING_LOCK_SHARDS: int = Field(default=64, ge=1)
+    BOOKING_BATCH_LOCK_LIMIT: int = Field(default=256, ge=1)
+    BOOKING_BATCH_MAX_ITEMS: int = 20_000
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_SECONDS: int = 30
+    ADMISSION_WRITE_LIMIT: int = 20
+    ADMISSION_WRITE_QUEUE: int = 500
+    ADMISSION_WRITE_WAIT: float = 2
+    ADMISSION_READ_LIMIT: int = 100
+    ADMISSION_READ_QUEUE: int = 1000
+    ADMISSION_READ_WAIT: float = 1
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_MAX_SIZE: int = 10_000
+    REDIS_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PGBOUNCER: bool = False
+    DB_REPLICA_URL: Optional[str] = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 1
+    DB_REPLICA_LAG_CHECK_TIMEOUT: float = 2
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_SAMPLE_RATE: float = Field(default=1.0, ge=0, le=1)
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    PARTITION_MONTHS_AHEAD: int = 3
+    STARTUP_MODE: Literal["migrate", "seed", "none"] = "migrate"
 
     model_config = SettingsConfigDict(extra="ignore")
 
@@ -112,6 +195,7 @@ class LoggerConfig:
         logger_level_file: Уровень логирования для файлового лога
         logger_error_file: Уровень логирования для файла ошибок
         extra_defaults: Значения по умолчанию для extra полей
+        log_format: text или json (структурированные записи без diagnose, backtrace и фильтров-функций)
     """
 
     def __init__(
@@ -121,12 +205,14 @@ class LoggerConfig:
         logger_level_file: str = "DEBUG",
         logger_error_file: str = "ERROR",
         extra_defaults: Optional[Dict[str, Any]] = None,
+        log_format: Literal["text", "json"] = "text",
     ) -> None:
         self.log_dir = log_dir
         self.logger_level_stdout = logger_level_stdout
         self.logger_level_file = logger_level_file
         self.logger_error_file = logger_error_file
         self.extra_defaults = extra_defaults or {"user": "-"}
+        self.log_format = log_format
 
         self._ensure_log_dir_exists()
         self._setup_logging()
@@ -159,9 +245,40 @@ class LoggerConfig:
         """Настраивает обработчики логирования."""
         logger.remove()
         logger.configure(extra=self.extra_defaults)
+        if self.log_format == "json":
+            self._add_json_handlers()
+            return
         self._add_stdout_handler()
         self._add_file_handlers()
 
+    def _add_json_handlers(self) -> None:
+        """
+        Добавляет обработчики JSON: по записи на строку, без diagnose и backtrace.
+
+        Фильтры текстового режима (_user_filter / _default_filter) пропускают все записи, поэтому здесь
+        их нет; в file.jsonl остаются только записи ниже WARNING — как _exclude_errors для file.log.
+        """
+        common: Dict[str, Any] = {"serialize": True, "diagnose": False, "backtrace": False, "catch": True}
+        logger.add(sys.stdout, level=self.logger_level_stdout, enqueue=True, **common)
+        warning_no = logger.level("WARNING").no
+        logger.add(
+            str(self.log_dir / "file.jsonl"),
+            level=self.logger_level_file,
+            filter=lambda r: r["level"].no < warning_no,
+            rotation="1 day",
+            retention="30 days",
+            enqueue=True,
+            **common,
+        )
+        logger.add(
+            str(self.log_dir / "error.jsonl"),
+            level=self.logger_error_file,
+            rotation="1 day",
+            retention="30 days",
+            enqueue=True,
+            **common,
+        )
+
     def _add_stdout_handler(self) -> None:
         """Добавляет обработчик для вывода в stdout."""
         logger.add(
@@ -225,6 +342,7 @@ logger_config = LoggerConfig(
     logger_level_file=settings.LOGGER_LEVEL_FILE,
     logger_error_file=settings.LOGGER_ERROR_FILE,
     extra_defaults={"user": "-"},
+    log_format=settings.LOG_FORMAT,
 )
 # Теперь вы можете использовать logger в других модулях
 # Явный экспорт для того что б mypy не ругался
@@ -1,10 +1,26 @@
-from typing import Any, Generic, List, Sequence, Type, TypeVar
+import base64
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Generic, Iterable, List, Mapping, Sequence, Tuple, Type, TypeVar
 
-from sqlalchemy import delete as sqlalchemy_delete, update as sqlalchemy_update
+from sqlalchemy import (
+    ColumnElement,
+    Insert,
+    Integer,
+    any_,
+    bindparam,
+    delete as sqlalchemy_delete,
+    insert,
+    tuple_,
+    update as sqlalchemy_update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.cache import CacheBackend
 from app.database import Base
 
 # Определяем тип переменной для модели
@@ -19,6 +35,32 @@ class BaseDAO(Generic[M]):
     """
 
     model: Type[M]  # Указываем, что model будет типа M
+    add_many_chunk_size: int = 1000  # Сколько строк вставлять одним INSERT в add_many
+    page_key: Tuple[str, ...] = ("id",)  # Колонки, по которым find_page сортирует и строит курсор
+    cache: CacheBackend | None = None  # Кэш чтения по id, сбрасывается в update и delete
+
+    @classmethod
+    def _cache_key(cls, data_id: int) -> str:
+        """Ключ кэша для строки с указанным id."""
+        return f"{cls.model.__tablename__}:{data_id}"
+
+    @classmethod
+    async def _invalidate(cls, ids: Sequence[int]) -> None:
+        """Сбросить кэш для строк с указанными id."""
+        if cls.cache is not None and ids:
+            await cls.cache.delete(cls._cache_key(data_id) for data_id in ids)
+
+    @classmethod
+    async def _on_delete(cls, ids: Sequence[int], delete_all: bool) -> None:
+        """
+        Действия после удаления строк.
+
+        Наследники переопределяют, если удаление каскадно затрагивает кэш других таблиц.
+        """
+        if delete_all and cls.cache is not None:
+            await cls.cache.clear()
+        else:
+            await cls._invalidate(ids)
 
     @classmethod
     async def find_all(cls, async_session: AsyncSession, **filter_by) -> Sequence[M] | None:
@@ -33,6 +75,78 @@ class BaseDAO(Generic[M]):
         result = await async_session.execute(query)
         return result.scalars().all()
 
+    @classmethod
+    def _encode_cursor(cls, instance: Any) -> str:
+        """Курсор на строку (экземпляр модели или Row): значения page_key в base64 JSON."""
+        values = [getattr(instance, name) for name in cls.page_key]
+        raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @classmethod
+    def _decode_cursor(cls, cursor: str) -> List[Any]:
+        """
+        Значения page_key из курсора.
+
+        :raises ValueError: Если курсор повреждён или построен для другой таблицы.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            columns = [getattr(cls.model, name) for name in cls.page_key]
+            if not isinstance(values, list) or len(values) != len(columns):
+                raise ValueError(cursor)
+            return [
+                datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+                for column, value in zip(columns, values)
+            ]
+        except (ValueError, TypeError) as e:
+            raise ValueError("Некорректный курсор") from e
+
+    @classmethod
+    async def _find_page(
+        cls,
+        async_session: AsyncSession,
+        cursor: str | None,
+        limit: int,
+        where: Sequence[ColumnElement[bool]],
+        filter_by: Mapping[str, Any],
+        columns: Sequence[Any] = (),
+    ) -> Tuple[Sequence[Any], str | None]:
+        """
+        Общая часть find_page: keyset-условие по page_key вместо OFFSET.
+
+        Если заданы columns, выбираются только они (строки Row без ORM-объектов);
+        колонки page_key должны входить в columns.
+        """
+        key = [getattr(cls.model, name) for name in cls.page_key]
+        query = select(*columns) if columns else select(cls.model)
+        query = query.filter_by(**filter_by).where(*where).order_by(*key).limit(limit + 1)
+        if cursor is not None:
+            query = query.where(tuple_(*key) > tuple_(*cls._decode_cursor(cursor)))
+        result = await async_session.execute(query)
+        rows: Sequence[Any] = result.all() if columns else result.scalars().all()
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], cls._encode_cursor(rows[limit - 1])
+
+    @classmethod
+    async def find_page(
+        cls, async_session: AsyncSession, cursor: str | None = None, limit: int = 50, **filter_by
+    ) -> Tuple[Sequence[M], str | None]:
+        """
+        Получение страницы строк таблицы с keyset-пагинацией.
+
+        Строки сортируются по page_key, следующая страница начинается строго после курсора,
+        поэтому выборка любой страницы — это один проход по индексу без OFFSET.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param cursor: Курсор из предыдущей страницы (None — первая страница).
+        :param limit: Размер страницы.
+        :param filter_by: Фильтры для выборки.
+        :raises ValueError: Если курсор некорректный.
+        :return: Строки страницы и курсор следующей страницы (None, если страница последняя).
+        """
+        return await cls._find_page(async_session, cursor, limit, (), filter_by)
+
     @classmethod
     async def find_one_or_none_by_id(cls, async_session: AsyncSession, data_id: int) -> M | None:
         """
@@ -46,6 +160,39 @@ class BaseDAO(Generic[M]):
         result = await async_session.execute(query)
         return result.unique().scalar_one_or_none()
 
+    @classmethod
+    async def _find_many_by_ids(
+        cls, async_session: AsyncSession, ids: Sequence[int], columns: Sequence[Any] = ()
+    ) -> Tuple[List[Any], List[int]]:
+        """
+        Общая часть find_many_by_ids.
+
+        Если заданы columns, выбираются только они (строки Row без ORM-объектов); колонка id должна входить в columns.
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        query = (select(*columns) if columns else select(cls.model)).where(
+            cls.model.id == any_(bindparam("ids", unique_ids, type_=ARRAY(Integer)))
+        )
+        result = await async_session.execute(query)
+        found = {row.id: row for row in (result.all() if columns else result.scalars().all())}
+        return [found[data_id] for data_id in unique_ids if data_id in found], [
+            data_id for data_id in unique_ids if data_id not in found
+        ]
+
+    @classmethod
+    async def find_many_by_ids(cls, async_session: AsyncSession, ids: Sequence[int]) -> Tuple[List[M], List[int]]:
+        """
+        Получение строк таблицы по списку id одним запросом (WHERE id = ANY(:ids)).
+
+        Список id передаётся одним параметром-массивом, поэтому текст запроса не зависит
+        от количества id. Повторяющиеся id возвращаются один раз.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param ids: Список id.
+        :return: Найденные строки в порядке ids и id, которых нет в таблице (тоже в порядке ids).
+        """
+        return await cls._find_many_by_ids(async_session, ids)
+
     @classmethod
     async def find_one_or_none(cls, async_session: AsyncSession, **filter_by) -> M | None:
         """
@@ -77,6 +224,46 @@ class BaseDAO(Generic[M]):
             raise e
         return new_instance
 
+    @classmethod
+    def _add_many_statement(cls) -> Insert:
+        """
+        Выражение INSERT для add_many.
+
+        Наследники могут переопределить его, например, чтобы пропускать дубликаты через ON CONFLICT.
+        """
+        return insert(cls.model).returning(cls.model.id, sort_by_parameter_order=True)
+
+    @classmethod
+    async def add_many(
+        cls,
+        async_session: AsyncSession,
+        values: Iterable[Mapping[str, Any]],
+        chunk_size: int | None = None,
+    ) -> List[int]:
+        """
+        Добавить много строк одной транзакцией.
+
+        Строки вставляются пачками по chunk_size через многострочный INSERT ... RETURNING id,
+        commit выполняется один раз в конце.
+
+        :param async_session: Асинхронная сессия базы данных.
+        :param values: Значения строк (ключи — имена атрибутов модели). Может быть генератором.
+        :param chunk_size: Размер пачки, по умолчанию add_many_chunk_size.
+        :return: ID добавленных строк в порядке вставки.
+        """
+        chunk_size = chunk_size or cls.add_many_chunk_size
+        rows = iter(values)
+        ids: List[int] = []
+        try:
+            while chunk := [dict(row) for row in islice(rows, chunk_size)]:
+                result = await async_session.execute(cls._add_many_statement(), chunk)
+                ids.extend(result.scalars().all())
+            await async_session.commit()
+        except SQLAlchemyError as e:
+            await async_session.rollback()
+            raise e
+        return ids
+
     @classmethod
     async def update(cls, async_session: AsyncSession, filter_by: dict[Any, Any], **values) -> List[M]:
         """
@@ -99,11 +286,12 @@ class BaseDAO(Generic[M]):
         try:
             updated_rows = result.fetchall()  # Получаем все измененные строки
             await async_session.commit()
-            # return updated_rows
-            return [cls.model(**{column: value for column, value in zip(result.keys(), row)}) for row in updated_rows]
         except SQLAlchemyError as e:
             await async_session.rollback()
             raise e
+        updated = [cls.model(**{column: value for column, value in zip(result.keys(), row)}) for row in updated_rows]
+        await cls._invalidate([instance.id for instance in updated])
+        return updated
 
     @classmethod
     async def delete(cls, async_session: AsyncSession, delete_all: bool = False, **filter_by) -> int:
@@ -123,11 +311,13 @@ class BaseDAO(Generic[M]):
         else:
             query = sqlalchemy_delete(cls.model).filter_by(**filter_by)  # Удаление по фильтрам
 
-        result = await async_session.execute(query)
+        result = await async_session.execute(query.returning(cls.model.id))
         try:
+            deleted_ids = result.scalars().all()
             await async_session.commit()
         except SQLAlchemyError as e:
             await async_session.rollback()
             raise e
 
-        return result.rowcount  # Возвращает количество удаленных строк
+        await cls._on_delete(deleted_ids, delete_all)
+        return len(deleted_ids)  # Возвращает количество удаленных строк
@@ -1,16 +1,51 @@
-from datetime import datetime, time
+"""
+Генерация тестовых данных: врачи, пациенты и записи на приём.
+
+Небольшие наборы (демо-данные при запуске, тесты) строятся фабриками factory_boy и вставляются через DAO.
+Для нагрузочного тестирования и оценки ёмкости есть массовый режим: строки генерируются потоком
+с заранее распределёнными слотами врачей (без подбора со случайными повторами) и пишутся в Postgres
+через COPY или в CSV-файлы. Одинаковые --seed и --start дают одинаковые данные.
+
+Запуск:
+    ENV=local python -m app.data_generate --doctors 10000 --patients 1000000 --per-doctor 300 --days 90 --seed 42
+    ENV=local python -m app.data_generate --format csv --out /tmp/girumed-data --doctors 1000 --per-doctor 100
+"""
+
+import argparse
+import asyncio
+import csv
+import random
+import time as timer
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
 from random import choice, randint
-from typing import List, Set, Tuple
+from typing import Any, Dict, Iterator, List, Literal, Sequence, Set, Tuple
 
 import faker
 from factory.base import Factory
 from factory.declarations import LazyAttribute, LazyFunction
 from factory.faker import Faker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
 
+from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
 from app.appointments.models import Appointment, Doctor, Patient
+from app.appointments.partitions import add_months, create_partitions, month_start
+from app.config import logger
+from app.database import engine, test_engine
 
 faker_instance = faker.Faker("ru_RU")
 
+SPECIALIZATIONS = ["Терапевт", "Хирург", "Кардиолог", "Невролог"]
+# Массовый режим: часовые слоты с 8:00, последний начинается не позже 17:45
+WORKDAY_SLOTS = 10
+SLOT_MINUTES = (0, 15, 30, 45)
+NAME_POOL_SIZE = 2000
+
+DOCTOR_COLUMNS = ("id", "name", "specialization", "experience_years")
+PATIENT_COLUMNS = ("id", "name", "email", "phone")
+APPOINTMENT_COLUMNS = ("doctor_id", "patient_id", "start_time")
+
 
 class PatientFactory(Factory[Patient]):
     """Фабрика для генерации экземпляров модели Patient."""
@@ -30,7 +65,7 @@ class DoctorFactory(Factory[Doctor]):
         model = Doctor
 
     name = Faker("name", locale="ru_RU")
-    specialization = LazyFunction(lambda: choice(["Терапевт", "Хирург", "Кардиолог", "Невролог"]))
+    specialization = LazyFunction(lambda: choice(SPECIALIZATIONS))
     experience_years = LazyFunction(lambda: randint(1, 40))
 
 
@@ -127,14 +162,269 @@ def generate_appointments(
     return appointments
 
 
-if __name__ == "__main__":
-    patients = generate_patients()
-    doctors = generate_doctors()
-    appointments = generate_appointments(patients, doctors)
+def instance_values(instance: Appointment | Doctor | Patient) -> Dict[str, Any]:
+    """
+    Значения колонок сгенерированного экземпляра для вставки в БД.
+
+    Пустые значения (id, created_at, updated_at) отбрасываются, чтобы их заполнила БД.
+    """
+    return {key: value for key, value in instance.to_dict().items() if value is not None}
+
+
+async def seed_database(
+    async_session: AsyncSession,
+    num_doctors: int = 5,
+    num_patients: int = 10,
+    num_appointments: int = 20,
+    chunk_size: int = 1000,
+) -> Tuple[int, int, int]:
+    """
+    Заполняет БД сгенерированными врачами, пациентами и записями.
+
+    Данные вставляются через add_many пачками по chunk_size, по одной транзакции на таблицу,
+    поэтому заполнение сотнями тысяч строк занимает секунды, а не минуты.
+    Записи, конфликтующие с уже существующими, пропускаются.
+
+    Args:
+        async_session (AsyncSession): Асинхронная сессия базы данных.
+        num_doctors (int): Количество врачей.
+        num_patients (int): Количество пациентов.
+        num_appointments (int): Желаемое количество записей.
+        chunk_size (int): Сколько строк вставлять одним INSERT.
+
+    Returns:
+        Tuple[int, int, int]: Количество добавленных врачей, пациентов и записей.
+    """
+    doctor_ids = await DoctorDAO.add_many(
+        async_session, (instance_values(doctor) for doctor in generate_doctors(num_doctors)), chunk_size
+    )
+    patient_ids = await PatientDAO.add_many(
+        async_session, (instance_values(patient) for patient in generate_patients(num_patients)), chunk_size
+    )
+    appointments = generate_appointments(
+        patients=[Patient(id=patient_id) for patient_id in patient_ids],
+        doctors=[Doctor(id=doctor_id) for doctor_id in doctor_ids],
+        num_appointments=num_appointments,
+    )
+    appointment_ids = await AppointmentDAO.add_many(
+        async_session, (instance_values(appointment) for appointment in appointments), chunk_size
+    )
+    return len(doctor_ids), len(patient_ids), len(appointment_ids)
+
+
+def name_pool(seed: int, size: int = NAME_POOL_SIZE) -> List[str]:
+    """
+    Набор имён Faker для массового режима: вызывать Faker на каждую из миллионов строк слишком долго.
+
+    :param seed: Зерно генератора.
+    :param size: Размер набора.
+    :return: Имена.
+    """
+    fake = faker.Faker("ru_RU")
+    fake.seed_instance(seed)
+    return [fake.name() for _ in range(size)]
+
+
+def bulk_doctor_rows(count: int, first_id: int, names: Sequence[str], rng: random.Random) -> Iterator[Tuple[Any, ...]]:
+    """
+    Строки врачей (DOCTOR_COLUMNS) с ID first_id..first_id + count - 1.
+
+    :param count: Количество врачей.
+    :param first_id: ID первого врача.
+    :param names: Набор имён.
+    :param rng: Генератор случайных чисел.
+    :return: Итератор строк.
+    """
+    for doctor_id in range(first_id, first_id + count):
+        yield doctor_id, rng.choice(names), rng.choice(SPECIALIZATIONS), rng.randint(1, 40)
 
-    print(f"Создано пациентов: {len(patients)}")
-    print(f"Создано врачей: {len(doctors)}")
-    print(f"Создано записей: {len(appointments)}")
 
-    for app in appointments:
-        print(app)
+def bulk_patient_rows(count: int, first_id: int, names: Sequence[str], rng: random.Random) -> Iterator[Tuple[Any, ...]]:
+    """
+    Строки пациентов (PATIENT_COLUMNS) с ID first_id..first_id + count - 1; email уникален по ID.
+
+    :param count: Количество пациентов.
+    :param first_id: ID первого пациента.
+    :param names: Набор имён.
+    :param rng: Генератор случайных чисел.
+    :return: Итератор строк.
+    """
+    for patient_id in range(first_id, first_id + count):
+        yield patient_id, rng.choice(names), f"patient{patient_id}@example.com", f"+7{rng.randrange(10**10):010d}"
+
+
+def bulk_appointment_rows(
+    doctor_ids: range,
+    patient_ids: range,
+    per_doctor: int,
+    start: date,
+    days: int,
+    rng: random.Random,
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    Строки записей (APPOINTMENT_COLUMNS): по per_doctor у каждого врача в окне из days дней.
+
+    Сетка врача — days * WORKDAY_SLOTS часовых слотов, сдвинутых на случайные 0/15/30/45 минут.
+    Врачу выбираются per_doctor разных слотов и per_doctor разных пациентов через rng.sample,
+    поэтому приёмы врача не пересекаются, пары врач-пациент не повторяются, а время генерации
+    линейно по количеству записей — без проверки кандидатов и повторных попыток.
+
+    :param doctor_ids: ID врачей.
+    :param patient_ids: ID пациентов (не меньше per_doctor).
+    :param per_doctor: Записей у одного врача (не больше days * WORKDAY_SLOTS).
+    :param start: Первый день окна.
+    :param days: Длина окна в днях.
+    :param rng: Генератор случайных чисел.
+    :return: Итератор строк.
+    """
+    day_starts = [datetime.combine(start + timedelta(days=day), time(8)) for day in range(days)]
+    # Время каждого слота для каждого сдвига считается один раз, а не на каждую строку
+    slot_times = [
+        [day_start + timedelta(hours=hour, minutes=minute) for day_start in day_starts for hour in range(WORKDAY_SLOTS)]
+        for minute in SLOT_MINUTES
+    ]
+    slots = range(days * WORKDAY_SLOTS)
+    for doctor_id in doctor_ids:
+        times = slot_times[rng.randrange(len(SLOT_MINUTES))]
+        for slot, patient_id in zip(sorted(rng.sample(slots, per_doctor)), rng.sample(patient_ids, per_doctor)):
+            yield doctor_id, patient_id, times[slot]
+
+
+async def _next_id(connection: AsyncConnection, table: str) -> int:
+    return (await connection.execute(text(f"SELECT coalesce(max(id), 0) + 1 FROM {table}"))).scalar_one()
+
+
+async def copy_bulk(
+    async_engine: AsyncEngine,
+    num_doctors: int,
+    num_patients: int,
+    per_doctor: int,
+    start: date,
+    days: int,
+    seed: int,
+) -> Tuple[int, int, int]:
+    """
+    Генерирует данные и потоком пишет их в БД через COPY одной транзакцией.
+
+    Врачи и пациенты получают ID после уже существующих (таблицы блокируются от вставок на время
+    загрузки), последовательности ID затем сдвигаются. Секции appointments на месяцы окна создаются заранее.
+
+    :param async_engine: Движок БД.
+    :param num_doctors: Количество врачей.
+    :param num_patients: Количество пациентов.
+    :param per_doctor: Записей у одного врача.
+    :param start: Первый день окна записей.
+    :param days: Длина окна в днях.
+    :param seed: Зерно генератора.
+    :return: Количество добавленных врачей, пациентов и записей.
+    """
+    rng = random.Random(seed)
+    names = name_pool(seed)
+    async with async_engine.begin() as connection:
+        await connection.execute(text("LOCK TABLE doctors, patients IN EXCLUSIVE MODE"))
+        first_doctor = await _next_id(connection, "doctors")
+        first_patient = await _next_id(connection, "patients")
+        await create_partitions(connection, start, add_months(month_start(start + timedelta(days=days - 1)), 1))
+        raw: Any = (await connection.get_raw_connection()).driver_connection  # asyncpg.Connection
+        doctor_ids = range(first_doctor, first_doctor + num_doctors)
+        patient_ids = range(first_patient, first_patient + num_patients)
+        for table, columns, rows in (
+            ("doctors", DOCTOR_COLUMNS, bulk_doctor_rows(num_doctors, first_doctor, names, rng)),
+            ("patients", PATIENT_COLUMNS, bulk_patient_rows(num_patients, first_patient, names, rng)),
+            (
+                "appointments",
+                APPOINTMENT_COLUMNS,
+                bulk_appointment_rows(doctor_ids, patient_ids, per_doctor, start, days, rng),
+            ),
+        ):
+            started = timer.perf_counter()
+            status = await raw.copy_records_to_table(table, records=rows, columns=list(columns))
+            logger.info(f"📥 {table}: {status} за {timer.perf_counter() - started:.1f} с")
+        for table in ("doctors", "patients"):
+            await connection.execute(
+                text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))")
+            )
+        await connection.execute(text("ANALYZE doctors, patients, appointments"))
+    return num_doctors, num_patients, num_doctors * per_doctor
+
+
+def write_csv_bulk(
+    out_dir: Path,
+    num_doctors: int,
+    num_patients: int,
+    per_doctor: int,
+    start: date,
+    days: int,
+    seed: int,
+) -> Tuple[int, int, int]:
+    r"""
+    Генерирует данные в CSV-файлы doctors.csv, patients.csv и appointments.csv (с заголовками, ID с 1).
+
+    Файлы загружаются в пустую БД (с секциями на месяцы окна) командой
+    psql \copy <table> (<columns>) FROM '<file>' CSV HEADER; затем последовательности ID сдвигаются setval.
+
+    :param out_dir: Каталог для файлов.
+    :param num_doctors: Количество врачей.
+    :param num_patients: Количество пациентов.
+    :param per_doctor: Записей у одного врача.
+    :param start: Первый день окна записей.
+    :param days: Длина окна в днях.
+    :param seed: Зерно генератора.
+    :return: Количество врачей, пациентов и записей.
+    """
+    rng = random.Random(seed)
+    names = name_pool(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for table, columns, rows in (
+        ("doctors", DOCTOR_COLUMNS, bulk_doctor_rows(num_doctors, 1, names, rng)),
+        ("patients", PATIENT_COLUMNS, bulk_patient_rows(num_patients, 1, names, rng)),
+        (
+            "appointments",
+            APPOINTMENT_COLUMNS,
+            bulk_appointment_rows(range(1, num_doctors + 1), range(1, num_patients + 1), per_doctor, start, days, rng),
+        ),
+    ):
+        with open(out_dir / f"{table}.csv", "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            writer.writerows(rows)
+        logger.info(f"📄 {out_dir / f'{table}.csv'} записан")
+    return num_doctors, num_patients, num_doctors * per_doctor
+
+
+async def main() -> None:
+    """Точка входа массовой генерации данных."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=1000, help="Количество врачей")
+    parser.add_argument("--patients", type=int, default=100000, help="Количество пациентов")
+    parser.add_argument("--per-doctor", type=int, default=100, help="Записей у одного врача")
+    parser.add_argument("--days", type=int, default=30, help="Длина окна записей в днях")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="Первый день окна (по умолчанию завтра)")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора")
+    parser.add_argument("--format", choices=("copy", "csv"), default="copy", help="COPY в Postgres или CSV-файлы")
+    parser.add_argument("--db", choices=("main", "test"), default="main", help="База для --format copy")
+    parser.add_argument("--out", type=Path, default=Path("generated"), help="Каталог для --format csv")
+    args = parser.parse_args()
+    if args.per_doctor > args.days * WORKDAY_SLOTS:
+        parser.error(f"--per-doctor больше слотов в окне ({args.days * WORKDAY_SLOTS})")
+    if args.per_doctor > args.patients:
+        parser.error("--per-doctor больше количества пациентов: пары врач-пациент не могут повторяться")
+
+    start = args.start or date.today() + timedelta(days=1)
+    output_format: Literal["copy", "csv"] = args.format
+    started = timer.perf_counter()
+    if output_format == "csv":
+        counts = write_csv_bulk(args.out, args.doctors, args.patients, args.per_doctor, start, args.days, args.seed)
+    else:
+        async_engine = engine if args.db == "main" else test_engine
+        counts = await copy_bulk(
+            async_engine, args.doctors, args.patients, args.per_doctor, start, args.days, args.seed
+        )
+        await async_engine.dispose()
+    logger.info(
+        f"✅ Врачей: {counts[0]}, пациентов: {counts[1]}, записей: {counts[2]} за {timer.perf_counter() - started:.1f} с"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,20 +1,196 @@
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, Dict, Optional
 
-from sqlalchemy import func
-from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event, exc, func
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, mapped_column
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
 from typing_extensions import Annotated
 
-from app.config import settings
+from app.config import Settings, logger, settings
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который считает время ожидания соединения.
+
+    Время checkout включает ожидание свободного соединения, создание нового и pre-ping.
+
+    Атрибуты:
+        checkouts (int): Сколько раз соединение выдавалось из пула.
+        wait_seconds_total (float): Суммарное время ожидания соединения.
+        wait_seconds_max (float): Самое долгое ожидание.
+        timeouts (int): Сколько раз соединение не дождались за pool_timeout.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Создаёт пул с обнулёнными счётчиками."""
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def connect(self) -> PoolProxiedConnection:
+        """Выдать соединение из пула, замерив время ожидания."""
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.checkouts += 1
+        return connection
+
+
+def engine_options(config: Settings) -> Dict[str, Any]:
+    """
+    Параметры create_async_engine из настроек пула.
+
+    В режиме DB_PGBOUNCER кэши подготовленных выражений asyncpg и SQLAlchemy выключены,
+    а имена выражений уникальны: в transaction pooling соседние транзакции идут через разные соединения.
+
+    :param config: Настройки приложения.
+    :return: Именованные аргументы для create_async_engine.
+    """
+    connect_args: Dict[str, Any] = {"statement_cache_size": config.DB_STATEMENT_CACHE_SIZE}
+    if config.DB_PGBOUNCER:
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+def pool_stats(async_engine: AsyncEngine) -> Dict[str, Any]:
+    """
+    Состояние пула соединений движка для мониторинга.
+
+    :param async_engine: Асинхронный движок.
+    :return: Размер пула, занятые и свободные соединения, переполнение и счётчики ожидания.
+    """
+    pool = async_engine.pool
+    stats: Dict[str, Any] = {
+        "size": pool.size(),  # type: ignore[attr-defined]
+        "in_use": pool.checkedout(),  # type: ignore[attr-defined]
+        "idle": pool.checkedin(),  # type: ignore[attr-defined]
+        "overflow": pool.overflow(),  # type: ignore[attr-defined]
+    }
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            wait_seconds_total=round(pool.wait_seconds_total, 6),
+            wait_seconds_max=round(pool.wait_seconds_max, 6),
+            timeouts=pool.timeouts,
+        )
+    return stats
+
+
+@dataclass
+class QueryStats:
+    """
+    Статистика SQL-запросов одного HTTP-запроса.
+
+    Атрибуты:
+        count (int): Сколько запросов выполнено.
+        total_seconds (float): Суммарное время запросов.
+        slowest_seconds (float): Время самого долгого запроса.
+        slowest_statement (Optional[str]): Текст самого долгого запроса.
+    """
+
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """Учесть выполненный запрос."""
+        self.count += 1
+        self.total_seconds += elapsed
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing: суммарное время БД и самый долгий запрос, в миллисекундах."""
+        return (
+            f'db;dur={self.total_seconds * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_seconds * 1000:.2f}"
+        )
+
+
+# Статистика текущего HTTP-запроса; устанавливается QueryStatsMiddleware. Хуки движков выполняются
+# в greenlet с контекстом вызывающей задачи, поэтому видят тот же объект
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def instrument_engine(async_engine: AsyncEngine, slow_query_threshold_ms: float) -> None:
+    """
+    Подключает к движку замер времени SQL-запросов.
+
+    Время каждого запроса добавляется в статистику текущего HTTP-запроса (current_query_stats),
+    запросы дольше порога пишутся в лог.
+
+    :param async_engine: Асинхронный движок.
+    :param slow_query_threshold_ms: Порог медленного запроса в миллисекундах.
+    """
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        if elapsed * 1000 >= slow_query_threshold_ms:
+            logger.warning(f"🐢 Медленный SQL-запрос ({elapsed * 1000:.1f} мс): {statement}")
+
+    def handle_error(exception_context) -> None:
+        # При ошибке after_cursor_execute не вызывается: снимаем время начала, чтобы стек не рос
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(async_engine.sync_engine, "handle_error", handle_error)
+
 
 DATABASE_URL = settings.get_db_url()
 TEST_DATABASE_URL = settings.get_test_db_url()
 # настройки БД для работы как с боевой так и с тестовой базой данных
-engine = create_async_engine(DATABASE_URL)
-test_engine = create_async_engine(TEST_DATABASE_URL)
+engine = create_async_engine(DATABASE_URL, **engine_options(settings))
+test_engine = create_async_engine(TEST_DATABASE_URL, **engine_options(settings))
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 async_test_session = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+# Необязательная реплика для чтения
+replica_engine = (
+    create_async_engine(settings.DB_REPLICA_URL, **engine_options(settings)) if settings.DB_REPLICA_URL else None
+)
+async_replica_session = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False) if replica_engine else None
+)
+for instrumented_engine in (engine, test_engine, replica_engine):
+    if instrumented_engine is not None:
+        instrument_engine(instrumented_engine, settings.SLOW_QUERY_THRESHOLD_MS)
 
 # настройка аннотаций
 int_pk = Annotated[int, mapped_column(primary_key=True, autoincrement=True)]
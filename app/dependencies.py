@@ -1,9 +1,19 @@
 import asyncio
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.database import async_session
+from app.config import settings
+from app.database import async_replica_session, async_session
+from app.replica import ReplicaRouter
+
+read_router = ReplicaRouter(
+    primary=async_session,
+    replica=async_replica_session,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+    probe_timeout=settings.DB_REPLICA_LAG_CHECK_TIMEOUT,
+)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -20,6 +30,41 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """
+    Функция для получения фабрики асинхронных сессий.
+
+    Нужна потоковым ответам: сессия из get_session закрывается до отправки тела ответа,
+    поэтому генератор тела открывает собственную сессию из этой фабрики.
+
+    :return: Фабрика асинхронных сессий.
+    """
+    return async_session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Функция для получения сессии только для чтения.
+
+    Сессия открывается на реплике (DB_REPLICA_URL), если она задана и отстаёт не больше
+    DB_REPLICA_MAX_LAG_SECONDS, иначе — на основной БД. Записи через эту сессию не выполняются.
+
+    :yield: Асинхронная сессия базы данных (AsyncSession)
+    """
+    session_maker = await read_router.session_maker()
+    async with session_maker() as session:
+        yield session
+
+
+async def get_read_session_maker() -> async_sessionmaker[AsyncSession]:
+    """
+    Функция для получения фабрики сессий только для чтения (реплика или основная БД).
+
+    :return: Фабрика асинхронных сессий.
+    """
+    return await read_router.session_maker()
+
+
 async def main():
     """Здесь я тестирую методы работы с БД."""
 
@@ -0,0 +1,24 @@
+class DoctorNotFoundError(LookupError):
+    """Доктор с указанным ID не найден."""
+
+    def __init__(self, doctor_id: int) -> None:
+        """Сохраняет ID не найденного доктора."""
+        self.doctor_id = doctor_id
+        super().__init__(f"Доктор с ID {doctor_id} не найден.")
+
+
+class PatientNotFoundError(LookupError):
+    """Пациент с указанным ID не найден."""
+
+    def __init__(self, patient_id: int) -> None:
+        """Сохраняет ID не найденного пациента."""
+        self.patient_id = patient_id
+        super().__init__(f"Пациент с ID {patient_id} не найден.")
+
+
+class AppointmentConflictError(ValueError):
+    """Время приёма занято или у пациента уже есть запись к этому врачу."""
+
+    def __init__(self, message: str = "Время приёма занято или перекрывается с другим приёмом.") -> None:
+        """Создаёт исключение с сообщением по умолчанию."""
+        super().__init__(message)
@@ -1,40 +1,53 @@
-from typing import Awaitable, Union
+from typing import Any, Awaitable, Dict, Union
 
 from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
 
 from app.config import logger
 
 
-async def http_exception_handler(request: Request, exc: HTTPException) -> Union[JSONResponse, Awaitable[JSONResponse]]:
+def http_exception_content(exc: HTTPException) -> Dict[str, Any]:
+    """
+    Тело ответа на HTTPException (оно же сохраняется для повторов по Idempotency-Key).
+
+    :param exc: Исключение HTTPException.
+    :return: Словарь с информацией об ошибке.
+    """
+    return {"result": False, "error_type": "HTTPException", "error_message": exc.detail}
+
+
+async def http_exception_handler(
+    request: Request, exc: HTTPException
+) -> Union[ORJSONResponse, Awaitable[ORJSONResponse]]:
     """
     Обработка исключений HTTPException.
 
     :param request: Запрос, вызвавший исключение.
     :param exc: Исключение HTTPException.
-    :return: JSONResponse с информацией об ошибке.
+    :return: ORJSONResponse с информацией об ошибке.
     """
     logger.error(exc.detail)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
-        content={"result": False, "error_type": "HTTPException", "error_message": exc.detail},
+        content=http_exception_content(exc),
+        headers=exc.headers,  # например, Retry-After
     )
 
 
 async def integrity_error_exception_handler(
     request: Request, exc: IntegrityError
-) -> Union[JSONResponse, Awaitable[JSONResponse]]:
+) -> Union[ORJSONResponse, Awaitable[ORJSONResponse]]:
     """
     Обработка исключений IntegrityError.
 
     :param request: Запрос, вызвавший исключение.
     :param exc: Исключение IntegrityError.
-    :return: JSONResponse с информацией об ошибке.
+    :return: ORJSONResponse с информацией об ошибке.
     """
     logger.error(repr(exc.orig))
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=409,
         content={"result": False, "error_type": "sqlalchemy.exc.IntegrityError", "error_message": repr(exc.orig)},
     )
@@ -42,15 +55,15 @@ async def integrity_error_exception_handler(
 
 async def validation_exception_handler(
     request: Request, exc: ValidationError
-) -> Union[JSONResponse, Awaitable[JSONResponse]]:
+) -> Union[ORJSONResponse, Awaitable[ORJSONResponse]]:
     """
     Обработка исключений ValidationError.
 
     :param request: Запрос, вызвавший исключение.
     :param exc: Исключение ValidationError.
-    :return: JSONResponse с информацией об ошибке.
+    :return: ORJSONResponse с информацией об ошибке.
     """
     logger.error(exc.errors())
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=400, content={"result": False, "error_type": "Validation error", "error_message": exc.errors()}
     )
@@ -1,24 +1,32 @@
-import os
-from contextlib import asynccontextmanager
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
 from typing import Any, Dict, List
 
 import uvicorn
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-
-from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
-from app.appointments.router import router as router_appointment
-from app.config import logger
-from app.data_generate import generate_appointments, generate_doctors, generate_patients
-from app.database import Base, engine
-from app.dependencies import get_session
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.exc import IntegrityError
+
+from app.appointments.dao import AppointmentDAO
+from app.appointments.idempotency import purge_expired_keys
+from app.appointments.router import (
+    doctors_router as router_doctors,
+    patients_router as router_patients,
+    router as router_appointment,
+)
+from app.config import logger, settings
+from app.database import async_session, engine, pool_stats
+from app.dependencies import read_router
 from app.exceptions.exceptions_methods import (
     http_exception_handler,
     integrity_error_exception_handler,
     validation_exception_handler,
 )
-from migrations_script import run_alembic_command
+from app.metrics import mark_process_dead, refresh_pool_metrics, render_metrics
+from app.middleware import AdmissionControlMiddleware, LogSamplingMiddleware, MetricsMiddleware, QueryStatsMiddleware
+from app.startup import run_startup
 
 # API теги и их описание
 tags_metadata: List[Dict[str, Any]] = [
@@ -26,6 +34,14 @@ tags_metadata: List[Dict[str, Any]] = [
         "name": "Appointments",
         "description": "Логика записи пациентов",
     },
+    {
+        "name": "Doctors",
+        "description": "Врачи",
+    },
+    {
+        "name": "Patients",
+        "description": "Пациенты",
+    },
 ]
 
 
@@ -34,32 +50,28 @@ async def lifespan(app: FastAPI):
     """
     Действия перед запуском приложения.
 
+    Подготовка БД зависит от STARTUP_MODE: migrate, seed или none.
+
     :param app:
     :return:
     """
-    logger.info("Перед первым запуском необходимо убедиться в актуальности версии миграции")
-    if os.path.split(os.getcwd())[1] == "app":
-        run_alembic_command("cd ..; alembic upgrade head;alembic current")
-    elif os.path.split(os.getcwd())[1] == "girumed":
-        run_alembic_command("alembic upgrade head;alembic current")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-
-    async for session in get_session():
-        [await DoctorDAO.add(session, **user.to_dict()) for user in generate_doctors(5)]
-        [await PatientDAO.add(session, **user.to_dict()) for user in generate_patients(5)]
-        doctors = await DoctorDAO.find_all(async_session=session)
-        patients = await PatientDAO.find_all(async_session=session)
-        # Генерируем приёмы
-        for user in generate_appointments(patients=patients, doctors=doctors, num_appointments=20):  # type: ignore
-            try:
-                await AppointmentDAO.add(session, **user.to_dict())
-            except ValueError as e:
-                logger.warning(f"⚠️ Не удалось создать приём: {e}")
-            except SQLAlchemyError as e:
-                logger.error(f"❌ Ошибка базы данных при создании приёма: {e}")
+    started = time.perf_counter()
+    await run_startup(settings.STARTUP_MODE, engine, async_session)
+    logger.info(
+        f"🚀 Запуск (STARTUP_MODE={settings.STARTUP_MODE}) занял {(time.perf_counter() - started) * 1000:.0f} мс"
+    )
+    background = [
+        asyncio.create_task(refresh_pool_metrics(engine)),
+        asyncio.create_task(purge_expired_keys(async_session)),
+    ]
+    if read_router.replica is not None:
+        background.append(asyncio.create_task(read_router.monitor()))
     yield
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    mark_process_dead()
 
 
 app = FastAPI(
@@ -90,9 +102,19 @@ app = FastAPI(
         "email": "BorisTheBlade.glebov@yandex.ru",
     },
     lifespan=lifespan,
+    # Ответы сериализуются orjson вместо json.dumps
+    default_response_class=ORJSONResponse,
 )
 
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(LogSamplingMiddleware)  # снаружи QueryStats: его итог тоже выбирается
+# Внутри MetricsMiddleware: время ожидания в очереди и ответы 503 попадают в метрики HTTP
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(router_appointment)
+app.include_router(router_doctors)
+app.include_router(router_patients)
 
 
 # Определение обработчиков исключений
@@ -107,5 +129,26 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Метрики в текстовом формате Prometheus (в multiprocess-режиме — суммарно по всем воркерам)."""
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
+@app.get("/health/pool")
+async def db_pool_stats():
+    """Состояние пула соединений основной БД: занятые соединения и время ожидания."""
+    return pool_stats(engine)
+
+
+@app.get("/health/cache")
+async def cache_stats():
+    """Счётчики попаданий и промахов кэша записей на приём."""
+    if AppointmentDAO.cache is None:
+        return {"backend": "none"}
+    return AppointmentDAO.cache.stats()
+
+
 if __name__ == "__main__":
     uvicorn.run(app="main:app", host="0.0.0.0", port=8000, reload=True)
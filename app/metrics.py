@@ -0,0 +1,151 @@
+"""
+Метрики приложения в формате Prometheus.
+
+При нескольких воркерах uvicorn задайте PROMETHEUS_MULTIPROC_DIR (пустой каталог, очищаемый при запуске):
+каждый процесс пишет значения в свои mmap-файлы, а /metrics в любом воркере суммирует файлы всех
+процессов. Без переменной метрики собираются в памяти процесса (один воркер, тесты).
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, Literal, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import logger
+from app.database import pool_stats
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+POOL_METRICS_INTERVAL = 5  # Как часто каждый воркер обновляет метрики пула, в секундах
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter("http_requests_total", "Количество HTTP-запросов", ["method", "route", "status"])
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP-запросы в обработке", ["method"], multiprocess_mode="livesum"
+)
+APPOINTMENT_BOOKINGS = Counter(
+    "appointment_bookings_total",
+    "Попытки записи на приём через POST /api/appointments по результату",
+    ["result"],  # created | conflict | not_found | replayed (ответ по Idempotency-Key)
+)
+BOOKING_LOCK_WAIT = Histogram(
+    "booking_lock_wait_seconds",
+    "Ожидание очереди записей к врачу при BOOKING_SERIALIZATION",
+    ["mode"],  # advisory | sharded
+    buckets=LATENCY_BUCKETS,
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Обращения к кэшу записей на приём",
+    ["backend", "result"],  # backend: memory | redis; result: hit | miss
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Запросы, выполняющиеся в бюджете admission control", ["budget"], multiprocess_mode="livesum"
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Запросы, ждущие места в бюджете admission control",
+    ["budget"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total",
+    "Запросы, получившие 503 от admission control",
+    ["budget", "reason"],  # reason: queue_full | timeout
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds", "Время ожидания места в бюджете admission control", ["budget"], buckets=LATENCY_BUCKETS
+)
+
+# Пул соединений: (имя из pool_stats, описание, агрегация по живым воркерам) — текущее состояние
+DB_POOL_METRICS: Tuple[Tuple[str, str, Literal["livesum", "livemax"]], ...] = (
+    ("size", "Постоянных соединений в пуле", "livesum"),
+    ("in_use", "Выданных соединений", "livesum"),
+    ("idle", "Свободных соединений в пуле", "livesum"),
+    ("overflow", "Соединений сверх pool_size", "livesum"),
+    ("wait_seconds_max", "Самое долгое ожидание соединения", "livemax"),
+)
+DB_POOL_GAUGES = {
+    name: Gauge(f"db_pool_{name}", description, multiprocess_mode=mode) for name, description, mode in DB_POOL_METRICS
+}
+# Накопительные счётчики пула: (имя из pool_stats, счётчик). Counter переживает перезапуск воркера,
+# поэтому rate() по ним не ломается, в отличие от livesum-Gauge
+DB_POOL_COUNTERS: Tuple[Tuple[str, Counter], ...] = (
+    ("checkouts", Counter("db_pool_checkouts", "Сколько раз соединение выдавалось из пула")),
+    ("timeouts", Counter("db_pool_timeouts", "Сколько раз соединение не дождались за pool_timeout")),
+    ("wait_seconds_total", Counter("db_pool_wait_seconds", "Суммарное время ожидания соединения")),
+)
+_pool_totals: Dict[str, float] = {}
+
+
+def update_pool_metrics(async_engine: AsyncEngine) -> None:
+    """
+    Переписывает метрики состояния пула текущего процесса и добавляет к счётчикам прирост с прошлого вызова.
+
+    :param async_engine: Движок основной БД.
+    """
+    stats = pool_stats(async_engine)
+    for name, value in stats.items():
+        if name in DB_POOL_GAUGES:
+            DB_POOL_GAUGES[name].set(value)
+    for name, counter in DB_POOL_COUNTERS:
+        if name not in stats:
+            continue
+        value = stats[name]
+        previous = _pool_totals.get(name, 0)
+        # Пул пересоздан (engine.dispose) — его счётчики начались с нуля
+        delta = value - previous if value >= previous else value
+        if delta > 0:
+            counter.inc(delta)
+        _pool_totals[name] = value
+
+
+async def refresh_pool_metrics(async_engine: AsyncEngine, interval: float = POOL_METRICS_INTERVAL) -> None:
+    """
+    Фоновая задача воркера: обновляет метрики пула раз в interval секунд.
+
+    Состояние пула известно только своему процессу, поэтому обновлять его должен каждый воркер,
+    а не только тот, который обслуживает /metrics.
+
+    :param async_engine: Движок основной БД.
+    :param interval: Период обновления в секундах.
+    """
+    while True:
+        update_pool_metrics(async_engine)
+        await asyncio.sleep(interval)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Текущие метрики в текстовом формате Prometheus.
+
+    :return: Тело ответа и его Content-Type.
+    """
+    if MULTIPROCESS:
+        registry: Any = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Убирает live-метрики завершившегося воркера из агрегации (multiprocess-режим)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+        logger.debug(f"Метрики воркера {os.getpid()} помечены завершёнными")
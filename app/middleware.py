@@ -0,0 +1,192 @@
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from starlette import status
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.admission import AdmissionLimiter, AdmissionRejected, build_limiters
+from app.config import logger, settings
+from app.database import QueryStats, current_query_stats
+from app.exceptions.exceptions_methods import http_exception_content
+from app.metrics import HTTP_IN_PROGRESS, HTTP_LATENCY, HTTP_REQUESTS
+from app.request_log import current_scope, hot_logger
+
+
+class QueryStatsMiddleware:
+    """
+    Считает SQL-запросы каждого HTTP-запроса и отдаёт их в заголовке Server-Timing.
+
+    Написан как ASGI-middleware без BaseHTTPMiddleware, чтобы не буферизовать ответ и не
+    запускать эндпойнт в отдельной задаче. Заголовок отражает запросы, выполненные до начала
+    ответа: запросы потоковой выгрузки после этого момента попадают только в лог.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Создаёт middleware.
+
+        :param app: Приложение ASGI.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработка запроса ASGI."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            if stats.count:
+                hot_logger().opt(lazy=True).debug(
+                    "🗄️ {} {}: SQL-запросов {}, {:.1f} мс, самый долгий {:.1f} мс",
+                    lambda: scope["method"],
+                    lambda: scope["path"],
+                    lambda: stats.count,
+                    lambda: stats.total_seconds * 1000,
+                    lambda: stats.slowest_seconds * 1000,
+                )
+
+
+class MetricsMiddleware:
+    """
+    Метрики HTTP-запросов: количество по маршруту и статусу, гистограмма времени, запросы в обработке.
+
+    Маршрут берётся из шаблона пути FastAPI (/api/appointments/{appointment_id}), а не из самого пути,
+    чтобы число рядов метрик не зависело от ID в запросах.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Создаёт middleware.
+
+        :param app: Приложение ASGI.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработка запроса ASGI."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Роутер FastAPI кладёт найденный маршрут в scope
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_LATENCY.labels(method, path).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, path, str(status_code)).inc()
+
+
+class LogSamplingMiddleware:
+    """Делает scope запроса доступным hot_logger() (выборка журнала по маршруту, см. app/request_log.py)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Создаёт middleware.
+
+        :param app: Приложение ASGI.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработка запроса ASGI."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+class AdmissionControlMiddleware:
+    """
+    Admission control для /api: отдельные бюджеты записи и чтения (см. app/admission.py).
+
+    Запрос классифицируется по методу и пути до маршрутизации: GET/HEAD и POST на READ_POST_PATHS — чтение,
+    остальные методы — запись. Пути вне /api (/health, /metrics, документация) не ограничиваются.
+    """
+
+    API_PREFIX = "/api/"
+    READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+    READ_POST_PATHS = frozenset({"/api/appointments/by-ids"})  # POST только из-за длины списка ID
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        write: Optional[AdmissionLimiter] = None,
+        read: Optional[AdmissionLimiter] = None,
+        retry_after: Optional[int] = None,
+    ) -> None:
+        """
+        Создаёт middleware.
+
+        :param app: Приложение ASGI.
+        :param write: Бюджет записи (по умолчанию — из настроек ADMISSION_WRITE_*).
+        :param read: Бюджет чтения (по умолчанию — из настроек ADMISSION_READ_*).
+        :param retry_after: Значение Retry-After в ответе 503 (по умолчанию ADMISSION_RETRY_AFTER_SECONDS).
+        """
+        self.app = app
+        if write is None and read is None:
+            write, read = build_limiters(settings)
+        self.write = write
+        self.read = read
+        self.retry_after = retry_after if retry_after is not None else settings.ADMISSION_RETRY_AFTER_SECONDS
+
+    def _limiter(self, scope: Scope) -> Optional[AdmissionLimiter]:
+        path = scope["path"]
+        if not path.startswith(self.API_PREFIX):
+            return None
+        if scope["method"] in self.READ_METHODS or path in self.READ_POST_PATHS:
+            return self.read
+        return self.write
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработка запроса ASGI."""
+        limiter = self._limiter(scope) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            async with limiter.slot():
+                await self.app(scope, receive, send)
+        except AdmissionRejected as e:
+            exc = HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервис перегружен, повторите запрос позже.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            # Снаружи LogSamplingMiddleware выборки нет, а отказы считает admission_rejections_total
+            logger.debug("⛔ {} {}: отказ admission control ({})", scope["method"], scope["path"], e.reason)
+            response = ORJSONResponse(http_exception_content(exc), status_code=exc.status_code, headers=exc.headers)
+            await response(scope, receive, send)
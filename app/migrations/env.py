@@ -18,8 +18,8 @@ if db_choice == "test":
 else:
     config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
-# Конфигурация логгирования Alembic
-if context.config.config_file_name is not None:
+# Конфигурация логгирования Alembic (при запуске из приложения логгеры uvicorn не трогаем)
+if context.config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(context.config.config_file_name)
 
 target_metadata = Base.metadata
@@ -0,0 +1,31 @@
+"""appointments keyset indexes
+
+Revision ID: 95f32ba4b75b
+Revises: ac4c872bbdb8
+Create Date: 2025-07-13 10:41:07.902315
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "95f32ba4b75b"
+down_revision: Union[str, Sequence[str], None] = "ac4c872bbdb8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_appointments_start_time_id", "appointments", ["start_time", "id"])
+    op.create_index("ix_appointments_doctor_id_start_time_id", "appointments", ["doctor_id", "start_time", "id"])
+    op.create_index("ix_appointments_patient_id_start_time_id", "appointments", ["patient_id", "start_time", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_appointments_patient_id_start_time_id", table_name="appointments")
+    op.drop_index("ix_appointments_doctor_id_start_time_id", table_name="appointments")
+    op.drop_index("ix_appointments_start_time_id", table_name="appointments")
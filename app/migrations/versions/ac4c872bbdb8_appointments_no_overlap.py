@@ -0,0 +1,41 @@
+"""appointments no overlap
+
+Revision ID: ac4c872bbdb8
+Revises: 7a7cbcf0f1c8
+Create Date: 2025-07-12 12:04:31.418270
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "ac4c872bbdb8"
+down_revision: Union[str, Sequence[str], None] = "7a7cbcf0f1c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist нужен, чтобы в GiST-индексе сравнивать doctor_id через "="
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # Уникальность doctor_id + start_time покрывается ограничением-исключением ниже
+    op.drop_constraint("unique_doctor_slot", "appointments", type_="unique")
+    op.create_unique_constraint("unique_doctor_patient", "appointments", ["doctor_id", "patient_id"])
+    op.create_exclude_constraint(
+        "no_doctor_overlap",
+        "appointments",
+        (sa.column("doctor_id"), "="),
+        (sa.text("tsrange(start_time, start_time + interval '1 hour')"), "&&"),
+        using="gist",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("no_doctor_overlap", "appointments")
+    op.drop_constraint("unique_doctor_patient", "appointments", type_="unique")
+    op.create_unique_constraint("unique_doctor_slot", "appointments", ["doctor_id", "start_time"])
@@ -0,0 +1,41 @@
+"""covering indexes
+
+Revision ID: d3b8e1f4c2a7
+Revises: 95f32ba4b75b
+Create Date: 2025-07-15 09:12:44.518203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d3b8e1f4c2a7"
+down_revision: Union[str, Sequence[str], None] = "95f32ba4b75b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя, колонки ключа, колонки INCLUDE)
+APPOINTMENT_INDEXES = (
+    ("ix_appointments_start_time_id", ["start_time", "id"], ["doctor_id", "patient_id"]),
+    ("ix_appointments_doctor_id_start_time_id", ["doctor_id", "start_time", "id"], ["patient_id"]),
+    ("ix_appointments_patient_id_start_time_id", ["patient_id", "start_time", "id"], ["doctor_id"]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индексы keyset-пагинации становятся покрывающими: все колонки appointments есть в индексе
+    for name, columns, include in APPOINTMENT_INDEXES:
+        op.drop_index(name, table_name="appointments")
+        op.create_index(name, "appointments", columns, postgresql_include=include)
+    op.create_index("ix_doctors_specialization_id", "doctors", ["specialization", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_doctors_specialization_id", table_name="doctors")
+    for name, columns, _ in reversed(APPOINTMENT_INDEXES):
+        op.drop_index(name, table_name="appointments")
+        op.create_index(name, "appointments", columns)
@@ -0,0 +1,131 @@
+"""partition appointments
+
+Revision ID: e5c1a9b2f7d4
+Revises: d3b8e1f4c2a7
+Create Date: 2025-07-16 11:27:03.114862
+
+"""
+
+from datetime import date
+from typing import List, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5c1a9b2f7d4"
+down_revision: Union[str, Sequence[str], None] = "d3b8e1f4c2a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+COLUMNS = "id, doctor_id, patient_id, start_time, created_at, updated_at"
+# (имя, колонки ключа, колонки INCLUDE)
+APPOINTMENT_INDEXES = (
+    ("ix_appointments_start_time_id", "start_time, id", "doctor_id, patient_id"),
+    ("ix_appointments_doctor_id_start_time_id", "doctor_id, start_time, id", "patient_id"),
+    ("ix_appointments_patient_id_start_time_id", "patient_id, start_time, id", "doctor_id"),
+)
+OVERLAP = "EXCLUDE USING gist (doctor_id WITH =, tsrange(start_time, start_time + interval '1 hour') WITH &&)"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_constraints(name: str) -> List[str]:
+    # Те же выражения, что в app/appointments/partitions.py на момент миграции
+    return [
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_unique_doctor_patient UNIQUE (doctor_id, patient_id)",
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_no_doctor_overlap {OVERLAP}",
+    ]
+
+
+def _create_indexes() -> None:
+    for name, columns, include in APPOINTMENT_INDEXES:
+        op.execute(f"CREATE INDEX {name} ON appointments ({columns}) INCLUDE ({include})")
+
+
+def _create_table(partitioned: bool) -> None:
+    primary_key = "id, start_time" if partitioned else "id"
+    op.execute(
+        "CREATE TABLE appointments ("
+        "id INTEGER NOT NULL DEFAULT nextval('appointments_id_seq'), "
+        "doctor_id INTEGER NOT NULL, "
+        "patient_id INTEGER NOT NULL, "
+        "start_time TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+        "updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+        f"CONSTRAINT appointments_pkey PRIMARY KEY ({primary_key}), "
+        "CONSTRAINT appointments_doctor_id_fkey FOREIGN KEY (doctor_id) REFERENCES doctors (id) ON DELETE CASCADE, "
+        "CONSTRAINT appointments_patient_id_fkey FOREIGN KEY (patient_id) REFERENCES patients (id) ON DELETE CASCADE"
+        ")" + (" PARTITION BY RANGE (start_time)" if partitioned else "")
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # Старая таблица остаётся до переноса данных; имена её индексов и ограничений освобождаются
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE appointments RENAME TO appointments_legacy")
+    op.execute("ALTER INDEX appointments_pkey RENAME TO appointments_legacy_pkey")
+    op.execute("ALTER TABLE appointments_legacy DROP CONSTRAINT unique_doctor_patient")
+    op.execute("ALTER TABLE appointments_legacy DROP CONSTRAINT no_doctor_overlap")
+    for name, _, _ in APPOINTMENT_INDEXES:
+        op.drop_index(name, table_name="appointments_legacy")
+
+    _create_table(partitioned=True)
+    _create_indexes()
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY appointments.id")
+
+    # Секции: от месяца самой ранней записи до MONTHS_AHEAD месяцев вперёд, плюс секция по умолчанию
+    first = op.get_bind().execute(sa.text("SELECT min(start_time) FROM appointments_legacy")).scalar()
+    month = date.today().replace(day=1)
+    if first is not None:
+        month = min(month, first.date().replace(day=1))
+    last = _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    while month <= last:
+        name = f"appointments_{month:%Y_%m}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF appointments "
+            f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+        )
+        for ddl in _partition_constraints(name):
+            op.execute(ddl)
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE appointments_default PARTITION OF appointments DEFAULT")
+    for ddl in _partition_constraints("appointments_default"):
+        op.execute(ddl)
+
+    op.execute(f"INSERT INTO appointments ({COLUMNS}) SELECT {COLUMNS} FROM appointments_legacy")
+    op.execute("DROP TABLE appointments_legacy")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Пара doctor_id + patient_id снова станет уникальной по всей таблице: из записей пациента к врачу
+    # в разных месяцах остаётся самая ранняя, остальные переносятся в appointments_downgrade_duplicates
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE appointments RENAME TO appointments_partitioned")
+    op.execute("ALTER INDEX appointments_pkey RENAME TO appointments_partitioned_pkey")
+    for name, _, _ in APPOINTMENT_INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_partitioned")
+
+    _create_table(partitioned=False)
+    op.execute(
+        f"INSERT INTO appointments ({COLUMNS}) "
+        f"SELECT DISTINCT ON (doctor_id, patient_id) {COLUMNS} FROM appointments_partitioned "
+        "ORDER BY doctor_id, patient_id, start_time, id"
+    )
+    op.execute(
+        "CREATE TABLE appointments_downgrade_duplicates AS "
+        f"SELECT {COLUMNS} FROM appointments_partitioned p "
+        "WHERE NOT EXISTS (SELECT 1 FROM appointments a WHERE a.id = p.id)"
+    )
+    op.execute("ALTER TABLE appointments ADD CONSTRAINT unique_doctor_patient UNIQUE (doctor_id, patient_id)")
+    op.execute(f"ALTER TABLE appointments ADD CONSTRAINT no_doctor_overlap {OVERLAP}")
+    _create_indexes()
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY appointments.id")
+    op.execute("DROP TABLE appointments_partitioned CASCADE")
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import logger
+
+# Отставание реплики в секундах. Если реплика проиграла всё полученное WAL, она не отстаёт,
+# даже если последняя транзакция на primary была давно. На primary запрос возвращает 0
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaRouter:
+    """
+    Выбор БД для чтения: реплика, пока её отставание в пределах порога, иначе primary.
+
+    Отставание измеряет фоновая задача monitor() раз в check_interval секунд, а session_maker()
+    только читает последнее значение, поэтому медленная или недоступная реплика не задерживает
+    запросы. Недоступная реплика, как и реплика без свежего измерения, считается отстающей.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replica: Optional[async_sessionmaker[AsyncSession]],
+        max_lag: float = 5,
+        check_interval: float = 1,
+        probe_timeout: float = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Создаёт маршрутизатор чтения.
+
+        :param primary: Фабрика сессий основной БД.
+        :param replica: Фабрика сессий реплики (None — реплики нет, чтение идёт в primary).
+        :param max_lag: Допустимое отставание реплики в секундах.
+        :param check_interval: Как часто проверять отставание, в секундах.
+        :param probe_timeout: Сколько секунд ждать ответа реплики на проверку, включая подключение.
+        :param clock: Источник времени (подменяется в тестах).
+        """
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        self.lag: Optional[float] = None  # Последнее измеренное отставание (None — реплика недоступна)
+        self._checked_at: Optional[float] = None
+
+    async def _measure_lag(self) -> Optional[float]:
+        assert self.replica is not None
+        replica = self.replica
+
+        async def probe() -> float:
+            async with replica() as session:
+                return float((await session.execute(REPLICA_LAG_SQL)).scalar_one())
+
+        try:
+            return await asyncio.wait_for(probe(), self.probe_timeout)
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"⚠️ Реплика недоступна, чтение идёт в primary: {e!r}")
+            return None
+
+    async def refresh(self) -> Optional[float]:
+        """
+        Измеряет отставание реплики и запоминает его.
+
+        :return: Отставание в секундах или None, если реплика недоступна.
+        """
+        self.lag = await self._measure_lag()
+        self._checked_at = self.clock()
+        return self.lag
+
+    async def monitor(self) -> None:
+        """Фоновая задача воркера: измеряет отставание раз в check_interval секунд."""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.check_interval)
+
+    def _is_stale(self) -> bool:
+        # Измерения нет или monitor() давно не обновлял его — значению нельзя доверять
+        stale_after = 3 * self.check_interval + self.probe_timeout
+        return self._checked_at is None or self.clock() - self._checked_at > stale_after
+
+    async def session_maker(self) -> async_sessionmaker[AsyncSession]:
+        """
+        Фабрика сессий для очередного чтения; к реплике не обращается.
+
+        :return: Фабрика сессий реплики или primary.
+        """
+        if self.replica is None or self._is_stale():
+            return self.primary
+        if self.lag is None or self.lag > self.max_lag:
+            return self.primary
+        return self.replica
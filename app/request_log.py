@@ -0,0 +1,63 @@
+"""
+Логирование на горячих путях запросов с выборкой по маршруту.
+
+Журнал одного запроса пишется целиком или не пишется вовсе: решение принимается при первом
+обращении к hot_logger() по шаблону маршрута (LOG_SAMPLE_RATES, иначе LOG_SAMPLE_RATE) и хранится
+в scope запроса. Предупреждения и ошибки пишутся обычным logger и не выбираются.
+
+Аргументы сообщения передаются отдельно от шаблона ("ID={}", appointment_id): loguru форматирует
+их, только если запись пройдёт по уровню. Для дорого вычисляемых значений используйте
+hot_logger().opt(lazy=True) с функциями вместо значений.
+"""
+
+import random
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from starlette.types import Scope
+
+from app.config import logger, settings
+
+current_scope: ContextVar[Optional[Scope]] = ContextVar("current_scope", default=None)
+
+
+class NullLogger:
+    """Логгер, который ничего не делает: для запросов, не попавших в выборку."""
+
+    def _discard(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+    debug = info = success = _discard
+
+    def opt(self, *args: Any, **kwargs: Any) -> "NullLogger":
+        """Возвращает себя: ленивые вызовы тоже ничего не делают."""
+        return self
+
+
+NULL_LOGGER = NullLogger()
+
+
+def route_sample_rate(route_path: str) -> float:
+    """
+    Доля запросов маршрута, журнал которых пишется.
+
+    :param route_path: Шаблон пути маршрута (например, /api/appointments/{appointment_id}).
+    :return: Доля от 0 до 1.
+    """
+    return settings.LOG_SAMPLE_RATES.get(route_path, settings.LOG_SAMPLE_RATE)
+
+
+def hot_logger() -> Any:
+    """
+    Логгер для info/success/debug на горячих путях текущего запроса.
+
+    :return: loguru logger, если запрос попал в выборку (или вызов вне запроса), иначе NullLogger.
+    """
+    scope = current_scope.get()
+    if scope is None:
+        return logger
+    sampled = scope.get("log_sampled")
+    if sampled is None:
+        rate = route_sample_rate(getattr(scope.get("route"), "path", ""))
+        sampled = scope["log_sampled"] = rate >= 1 or random.random() < rate
+    return logger if sampled else NULL_LOGGER
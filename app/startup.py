@@ -0,0 +1,90 @@
+import asyncio
+import os
+from argparse import Namespace
+from typing import Literal
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.appointments.models import Doctor
+from app.appointments.partitions import maintain_partitions
+from app.config import logger, settings
+from app.data_generate import seed_database
+
+StartupMode = Literal["migrate", "seed", "none"]
+
+# Ключ pg_advisory_xact_lock: пока один воркер применяет миграции и заполняет БД, остальные ждут
+STARTUP_LOCK_KEY = 4_725_310_517
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def alembic_config(db: Literal["main", "test"] = "main") -> Config:
+    """
+    Конфигурация Alembic для запуска из кода, не зависящая от текущей директории.
+
+    :param db: Какая база: main (DB_NAME) или test (DB_TEST), как -x db=test в командной строке.
+    :return: Конфигурация Alembic.
+    """
+    config = Config(os.path.join(ROOT_DIR, "alembic.ini"), cmd_opts=Namespace(x=[f"db={db}"]))
+    config.set_main_option("script_location", os.path.join(ROOT_DIR, "app", "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+async def upgrade_database(db: Literal["main", "test"] = "main") -> None:
+    """
+    Применяет миграции до head в этом же процессе.
+
+    env.py запускает собственный цикл событий, поэтому команда выполняется в отдельном потоке.
+
+    :param db: Какая база: main или test.
+    """
+    await asyncio.to_thread(command.upgrade, alembic_config(db), "head")
+
+
+async def seed_if_empty(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """
+    Заполняет БД демо-данными пакетными вставками, если в ней ещё нет врачей.
+
+    :param session_maker: Фабрика сессий базы данных.
+    """
+    async with session_maker() as session:
+        if (await session.execute(select(Doctor.id).limit(1))).first() is not None:
+            logger.info("БД уже содержит данные, заполнение пропущено")
+            return
+        try:
+            doctors, patients, appointments = await seed_database(
+                session, num_doctors=5, num_patients=5, num_appointments=20
+            )
+            logger.info(f"Добавлено врачей: {doctors}, пациентов: {patients}, приёмов: {appointments}")
+        except SQLAlchemyError as e:
+            logger.error(f"❌ Ошибка базы данных при заполнении: {e}")
+
+
+async def run_startup(mode: StartupMode, engine: AsyncEngine, session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """
+    Подготовка БД при запуске приложения.
+
+    После миграций создаются недостающие помесячные секции appointments на PARTITION_MONTHS_AHEAD месяцев вперёд.
+    Работа выполняется под транзакционной advisory-блокировкой: при запуске N воркеров
+    миграции применяет первый, остальные дожидаются его и видят схему уже актуальной.
+    Блокировка снимается вместе с транзакцией, без отдельного pg_advisory_unlock: с PgBouncer
+    в transaction pooling разблокировка могла бы уйти на другое соединение сервера.
+
+    :param mode: migrate, seed или none.
+    :param engine: Движок основной БД.
+    :param session_maker: Фабрика сессий основной БД.
+    """
+    if mode == "none":
+        return
+
+    async with engine.begin() as connection:
+        await connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": STARTUP_LOCK_KEY})
+        await upgrade_database("main")
+        await maintain_partitions(engine, months_ahead=settings.PARTITION_MONTHS_AHEAD)
+        if mode == "seed":
+            await seed_if_empty(session_maker)
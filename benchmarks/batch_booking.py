@@ -0,0 +1,89 @@
+"""
+Бенчмарк POST /api/appointments/batch: сколько занимает импорт пачки записей.
+
+Создаёт врачей и пациентов в тестовой БД (DB_TEST), формирует расписание на неделю
+(10% элементов намеренно конфликтуют) и отправляет его одним запросом.
+
+Запуск:
+    ENV=local python -m benchmarks.batch_booking --items 10000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, Dict, List
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.dao import DoctorDAO, PatientDAO
+from app.database import async_test_session
+from app.dependencies import get_session
+from app.main import app
+
+
+async def _test_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_test_session() as session:
+        yield session
+
+
+async def build_payload(num_items: int) -> List[Dict[str, object]]:
+    """
+    Готовит тестовую БД и расписание для импорта.
+
+    :param num_items: Количество элементов пачки.
+    :return: Тело запроса.
+    """
+    # 10 часовых слотов в день * 7 дней на врача
+    per_doctor = 70
+    num_doctors = max(1, num_items // per_doctor + 1)
+    async with async_test_session() as session:
+        await session.execute(text("TRUNCATE TABLE appointments, doctors, patients RESTART IDENTITY CASCADE;"))
+        await session.commit()
+        doctor_ids = [
+            (await DoctorDAO.add(session, name=f"Bench {i}", specialization="Терапевт", experience_years=5)).id
+            for i in range(num_doctors)
+        ]
+        patient_ids = [
+            (await PatientDAO.add(session, name=f"Bench {i}", email=f"bench{i}@example.com")).id
+            for i in range(per_doctor)
+        ]
+
+    monday = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=7)
+    payload: List[Dict[str, object]] = []
+    for k in range(num_items):
+        doctor_id = doctor_ids[k // per_doctor]
+        slot = k % per_doctor
+        start_time = monday + timedelta(days=slot // 10, hours=slot % 10)
+        if k % 10 == 9:
+            # Каждый десятый элемент пересекается с предыдущим слотом того же врача
+            start_time -= timedelta(minutes=30)
+        payload.append({"doctor_id": doctor_id, "patient_id": patient_ids[slot], "start_time": start_time.isoformat()})
+    return payload
+
+
+async def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000, help="Размер пачки (не больше BOOKING_BATCH_MAX_ITEMS)")
+    args = parser.parse_args()
+
+    app.dependency_overrides[get_session] = _test_session
+    payload = await build_payload(args.items)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        response = await client.post("/api/appointments/batch", json=payload)
+        elapsed = time.perf_counter() - started
+
+    data = response.json()
+    print(
+        f"items={args.items} status={response.status_code} created={data.get('created')} "
+        f"rejected={data.get('rejected')} elapsed={elapsed * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
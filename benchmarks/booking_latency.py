@@ -0,0 +1,111 @@
+"""
+Бенчмарк задержки POST /api/appointments в режимах classic и single_statement.
+
+Запросы идут в приложение in-process через httpx ASGITransport, сессии открываются
+к тестовой БД (DB_TEST). Перед каждым режимом таблица appointments очищается.
+
+Запуск:
+    ENV=local python -m benchmarks.booking_latency --requests 1000 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, List, Tuple
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.dao import DoctorDAO, PatientDAO
+from app.config import settings
+from app.database import async_test_session
+from app.dependencies import get_session
+from app.main import app
+from benchmarks.common import LatencyReport
+
+MODES = ("classic", "single_statement")
+
+
+async def _test_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_test_session() as session:
+        yield session
+
+
+async def seed(num_requests: int, per_doctor: int) -> List[Tuple[int, int, datetime]]:
+    """
+    Создаёт врачей и пациентов и готовит неконфликтующие записи.
+
+    :param num_requests: Количество записей.
+    :param per_doctor: Сколько записей приходится на одного врача.
+    :return: Список (doctor_id, patient_id, start_time).
+    """
+    async with async_test_session() as session:
+        await session.execute(text("TRUNCATE TABLE appointments, doctors, patients RESTART IDENTITY CASCADE;"))
+        await session.commit()
+        num_doctors = max(1, num_requests // per_doctor)
+        doctor_ids = [
+            (await DoctorDAO.add(session, name=f"Bench {i}", specialization="Терапевт", experience_years=5)).id
+            for i in range(num_doctors)
+        ]
+        patient_ids = [
+            (await PatientDAO.add(session, name=f"Bench {i}", email=f"bench{i}@example.com")).id
+            for i in range(num_requests)
+        ]
+    base = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return [
+        (doctor_ids[k % num_doctors], patient_ids[k], base + timedelta(hours=k // num_doctors))
+        for k in range(num_requests)
+    ]
+
+
+async def run_mode(mode: str, bookings: List[Tuple[int, int, datetime]], concurrency: int) -> LatencyReport:
+    """
+    Прогоняет все бронирования в указанном режиме.
+
+    :param mode: Значение BOOKING_MODE.
+    :param bookings: Список (doctor_id, patient_id, start_time).
+    :param concurrency: Количество одновременных запросов.
+    :return: Отчёт о задержках.
+    """
+    async with async_test_session() as session:
+        await session.execute(text("TRUNCATE TABLE appointments RESTART IDENTITY;"))
+        await session.commit()
+
+    settings.BOOKING_MODE = mode  # type: ignore[assignment]
+    report = LatencyReport(name=mode)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def book(doctor_id: int, patient_id: int, start_time: datetime) -> None:
+            payload = {"doctor_id": doctor_id, "patient_id": patient_id, "start_time": start_time.isoformat()}
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/appointments", json=payload)
+                report.samples.append(time.perf_counter() - started)
+            assert response.status_code == 201, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(book(*item) for item in bookings))
+        report.elapsed = time.perf_counter() - started
+    return report
+
+
+async def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Количество бронирований на режим")
+    parser.add_argument("--concurrency", type=int, default=10, help="Одновременных запросов")
+    parser.add_argument("--per-doctor", type=int, default=50, help="Записей на одного врача")
+    args = parser.parse_args()
+
+    app.dependency_overrides[get_session] = _test_session
+    bookings = await seed(args.requests, args.per_doctor)
+    for mode in MODES:
+        print((await run_mode(mode, bookings, args.concurrency)).format())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
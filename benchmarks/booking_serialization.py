@@ -0,0 +1,165 @@
+"""
+Бенчмарк POST /api/appointments при разных BOOKING_SERIALIZATION на горячем и равномерном потоке.
+
+hot — доля --hot-share запросов идёт к одному врачу, uniform — врачи выбираются равномерно.
+Время приёма выбирается случайно из 15-минутных слотов за --days дней, поэтому запросы к одному
+врачу перекрываются и часть из них получает 409. Для каждого режима и потока печатаются задержки,
+количество 201/409 и проверка, что у врачей нет пересекающихся приёмов.
+
+Запросы идут в приложение in-process через httpx ASGITransport, сессии открываются
+к тестовой БД (DB_TEST). Перед каждым прогоном таблица appointments очищается.
+
+Запуск:
+    ENV=local python -m benchmarks.booking_serialization --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, AsyncGenerator, Dict, List, Tuple
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_test_session, test_engine
+from app.dependencies import get_session
+from app.main import app
+from benchmarks.common import LatencyReport
+
+MODES = ("none", "advisory", "sharded")
+WORKLOADS = ("hot", "uniform")
+SLOTS_PER_DAY = 40  # 15-минутные слоты с 8:00 до 18:00
+
+Booking = Tuple[int, int, datetime]
+
+OVERLAPS_SQL = text(
+    "SELECT count(*) FROM appointments a JOIN appointments b "
+    "ON a.doctor_id = b.doctor_id AND a.id < b.id "
+    "AND a.start_time < b.start_time + interval '1 hour' AND b.start_time < a.start_time + interval '1 hour'"
+)
+
+
+async def _test_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_test_session() as session:
+        yield session
+
+
+async def seed(doctors: int, patients: int) -> None:
+    """
+    Заполняет тестовую БД врачами и пациентами.
+
+    :param doctors: Количество врачей (ID с 1).
+    :param patients: Количество пациентов (ID с 1).
+    """
+    async with test_engine.begin() as connection:
+        await connection.execute(text("TRUNCATE TABLE appointments, doctors, patients RESTART IDENTITY CASCADE"))
+        await connection.execute(
+            text(
+                "INSERT INTO doctors (name, specialization, experience_years) "
+                "SELECT 'Bench ' || i, 'Терапевт', 5 FROM generate_series(1, :n) AS i"
+            ),
+            {"n": doctors},
+        )
+        await connection.execute(
+            text(
+                "INSERT INTO patients (name, email) "
+                "SELECT 'Bench ' || i, 'serial' || i || '@example.com' FROM generate_series(1, :n) AS i"
+            ),
+            {"n": patients},
+        )
+
+
+def build_bookings(
+    workload: str, num_requests: int, doctors: int, days: int, hot_share: float, seed: int
+) -> List[Booking]:
+    """
+    Готовит поток бронирований.
+
+    :param workload: hot или uniform.
+    :param num_requests: Количество запросов (и пациентов: у каждого запроса свой пациент).
+    :param doctors: Количество врачей.
+    :param days: На сколько дней распределяются приёмы.
+    :param hot_share: Доля запросов к врачу 1 в потоке hot.
+    :param seed: Зерно генератора, одинаковое для всех режимов.
+    :return: Список (doctor_id, patient_id, start_time).
+    """
+    rng = random.Random(seed)
+    base = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    bookings = []
+    for patient_id in range(1, num_requests + 1):
+        if workload == "hot" and rng.random() < hot_share:
+            doctor_id = 1
+        else:
+            doctor_id = rng.randint(1, doctors)
+        start_time = base + timedelta(days=rng.randrange(days), minutes=15 * rng.randrange(SLOTS_PER_DAY))
+        bookings.append((doctor_id, patient_id, start_time))
+    return bookings
+
+
+async def run(
+    mode: str, workload: str, bookings: List[Booking], concurrency: int
+) -> Tuple[LatencyReport, Dict[str, Any]]:
+    """
+    Прогоняет поток бронирований в указанном режиме.
+
+    :param mode: Значение BOOKING_SERIALIZATION.
+    :param workload: Название потока для отчёта.
+    :param bookings: Список (doctor_id, patient_id, start_time).
+    :param concurrency: Количество одновременных запросов.
+    :return: Отчёт о задержках и счётчики: коды ответов и найденные пересечения.
+    """
+    async with test_engine.begin() as connection:
+        await connection.execute(text("TRUNCATE TABLE appointments RESTART IDENTITY"))
+
+    settings.BOOKING_SERIALIZATION = mode  # type: ignore[assignment]
+    report = LatencyReport(name=f"{workload}/{mode}")
+    codes: Counter[int] = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def book(doctor_id: int, patient_id: int, start_time: datetime) -> None:
+            payload = {"doctor_id": doctor_id, "patient_id": patient_id, "start_time": start_time.isoformat()}
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/appointments", json=payload)
+                report.samples.append(time.perf_counter() - started)
+            codes[response.status_code] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(book(*item) for item in bookings))
+        report.elapsed = time.perf_counter() - started
+
+    async with test_engine.connect() as connection:
+        overlaps = (await connection.execute(OVERLAPS_SQL)).scalar_one()
+    return report, {"codes": dict(sorted(codes.items())), "overlaps": overlaps}
+
+
+async def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Количество бронирований на прогон")
+    parser.add_argument("--concurrency", type=int, default=50, help="Одновременных запросов")
+    parser.add_argument("--doctors", type=int, default=200, help="Количество врачей")
+    parser.add_argument("--days", type=int, default=30, help="На сколько дней распределяются приёмы")
+    parser.add_argument("--hot-share", type=float, default=0.8, help="Доля запросов к горячему врачу")
+    parser.add_argument("--modes", default=",".join(MODES), help="Режимы BOOKING_SERIALIZATION через запятую")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора")
+    args = parser.parse_args()
+
+    app.dependency_overrides[get_session] = _test_session
+    await seed(args.doctors, args.requests)
+    for workload in WORKLOADS:
+        bookings = build_bookings(workload, args.requests, args.doctors, args.days, args.hot_share, args.seed)
+        for mode in args.modes.split(","):
+            report, outcome = await run(mode, workload, bookings, args.concurrency)
+            print(f"{report.format()} codes={outcome['codes']} overlaps={outcome['overlaps']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+import statistics
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    Возвращает перцентиль выборки.
+
+    :param samples: Выборка значений.
+    :param q: Перцентиль в диапазоне 0–100.
+    :return: Значение перцентиля.
+    """
+    if not samples:
+        return 0.0
+    if len(samples) == 1:
+        return samples[0]
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    if q <= 0:
+        return min(samples)
+    if q >= 100:
+        return max(samples)
+    return cuts[int(q) - 1]
+
+
+@dataclass
+class LatencyReport:
+    """
+    Результат замера задержек.
+
+    Атрибуты:
+        name (str): Название сценария.
+        samples (List[float]): Задержки отдельных запросов в секундах.
+        elapsed (float): Общее время прогона в секундах.
+    """
+
+    name: str
+    samples: List[float] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Сводка по задержкам в миллисекундах."""
+        return {
+            "count": len(self.samples),
+            "rps": round(len(self.samples) / self.elapsed, 1) if self.elapsed else 0.0,
+            "mean_ms": round(statistics.fmean(self.samples) * 1000, 3) if self.samples else 0.0,
+            "p50_ms": round(percentile(self.samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(self.samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(self.samples, 99) * 1000, 3),
+        }
+
+    def format(self) -> str:
+        """Строка с результатом для вывода в консоль."""
+        s = self.summary()
+        return (
+            f"{self.name:<24} n={s['count']:<6} rps={s['rps']:<8} "
+            f"p50={s['p50_ms']}ms p95={s['p95_ms']}ms p99={s['p99_ms']}ms"
+        )
@@ -0,0 +1,106 @@
+"""
+Бенчмарк GET /api/free-slots: поиск ближайших слотов среди многих врачей.
+
+Создаёт в тестовой БД (DB_TEST) врачей одной специализации и заполняет их расписание
+на две недели вперёд через add_many, затем замеряет задержку поиска по специализации.
+
+Запуск:
+    ENV=local python -m benchmarks.free_slots --doctors 500 --per-day 6 --requests 200
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, Dict, List
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
+from app.database import async_test_session
+from app.dependencies import get_read_session, get_session
+from app.main import app
+from benchmarks.common import LatencyReport
+
+DAYS = 14
+SPECIALIZATION = "Кардиолог"
+
+
+async def _test_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_test_session() as session:
+        yield session
+
+
+async def seed(num_doctors: int, per_day: int, start: datetime) -> None:
+    """
+    Создаёт врачей и приёмы: per_day приёмов в день у каждого врача, через час.
+
+    :param num_doctors: Количество врачей.
+    :param per_day: Приёмов на врача в день (не больше 10).
+    :param start: Первый день расписания.
+    """
+    num_patients = per_day * DAYS
+    async with async_test_session() as session:
+        await session.execute(text("TRUNCATE TABLE appointments, doctors, patients RESTART IDENTITY CASCADE;"))
+        await session.commit()
+        doctor_ids = await DoctorDAO.add_many(
+            session,
+            [
+                {"name": f"Bench {i}", "specialization": SPECIALIZATION, "experience_years": 5}
+                for i in range(num_doctors)
+            ],
+        )
+        patient_ids = await PatientDAO.add_many(
+            session, [{"name": f"Bench {i}", "email": f"bench{i}@example.com"} for i in range(num_patients)]
+        )
+        appointments: List[Dict[str, object]] = [
+            {
+                "doctor_id": doctor_id,
+                "patient_id": patient_ids[day * per_day + k],
+                # Сдвиг по врачу, чтобы свободные слоты у всех были в разное время
+                "start_time": start + timedelta(days=day, hours=k, minutes=15 * (n % 4)),
+            }
+            for n, doctor_id in enumerate(doctor_ids)
+            for day in range(DAYS)
+            for k in range(per_day)
+        ]
+        await AppointmentDAO.add_many(session, appointments)
+
+
+async def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=500, help="Количество врачей")
+    parser.add_argument("--per-day", type=int, default=6, help="Приёмов на врача в день")
+    parser.add_argument("--requests", type=int, default=200, help="Количество запросов поиска")
+    parser.add_argument("--limit", type=int, default=100, help="Параметр limit поиска")
+    args = parser.parse_args()
+
+    app.dependency_overrides[get_session] = _test_session
+    app.dependency_overrides[get_read_session] = _test_session
+    start = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    await seed(args.doctors, args.per_day, start)
+
+    params = {
+        "specialization": SPECIALIZATION,
+        "from": start.isoformat(),
+        "to": (start + timedelta(days=DAYS)).isoformat(),
+        "limit": args.limit,
+    }
+    report = LatencyReport(name=f"free-slots x{args.doctors}")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            request_started = time.perf_counter()
+            response = await client.get("/api/free-slots", params=params)
+            response.raise_for_status()
+            report.samples.append(time.perf_counter() - request_started)
+        report.elapsed = time.perf_counter() - started
+
+    print(report.format())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Микробенчмарк стоимости журнала одного запроса GET /api/appointments/{appointment_id} (без БД).
+
+Каждая итерация пишет то же, что обработчик и QueryStatsMiddleware: info, success и debug-итог.
+Сценарии:
+- eager-text: f-строки, текстовые синки с diagnose (прежний вариант);
+- lazy-text: аргументы "{}" и opt(lazy=True) через hot_logger(), текстовые синки;
+- lazy-json: то же с LOG_FORMAT=json (serialize, без diagnose и backtrace);
+- sampled-json: lazy-json с долей маршрута 1% (LOG_SAMPLE_RATES).
+Прогон с --level WARNING показывает стоимость сообщений, отброшенных по уровню: f-строка
+форматируется всё равно, аргументы "{}" и lazy — нет.
+
+Логи пишутся во временный каталог. Время прогона включает logger.complete(), то есть запись
+очереди enqueue в файлы.
+
+Запуск:
+    ENV=local python -m benchmarks.logging_overhead --requests 20000 --level DEBUG
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, Literal, Tuple
+
+from app.config import LoggerConfig, logger, settings
+from app.request_log import current_scope, hot_logger
+from benchmarks.common import LatencyReport
+
+ROUTE = "/api/appointments/{appointment_id}"
+
+
+def eager_request(appointment_id: int) -> None:
+    """Журнал запроса f-строками: текст сообщения собирается до проверки уровня."""
+    logger.info(f"🔍 Запрос на получение записи с ID={appointment_id}")
+    logger.success(f"✅ Найдена запись: ID={appointment_id}")
+    logger.debug(f"🗄️ GET /api/appointments/{appointment_id}: SQL-запросов 1, {0.42:.1f} мс, самый долгий {0.42:.1f} мс")
+
+
+def lazy_request(appointment_id: int) -> None:
+    """Журнал запроса через hot_logger(): форматирование только для записей, которые будут записаны."""
+    hot_logger().info("🔍 Запрос на получение записи с ID={}", appointment_id)
+    hot_logger().success("✅ Найдена запись: ID={}", appointment_id)
+    hot_logger().opt(lazy=True).debug(
+        "🗄️ {} {}: SQL-запросов {}, {:.1f} мс, самый долгий {:.1f} мс",
+        lambda: "GET",
+        lambda: f"/api/appointments/{appointment_id}",
+        lambda: 1,
+        lambda: 0.42,
+        lambda: 0.42,
+    )
+
+
+def measure(
+    name: str,
+    log_request: Callable[[int], None],
+    log_format: Literal["text", "json"],
+    level: str,
+    requests: int,
+) -> LatencyReport:
+    """
+    Замер requests итераций журнала запроса с синками заданного формата.
+
+    :param name: Название сценария.
+    :param log_request: Функция, пишущая журнал одного запроса.
+    :param log_format: Формат синков (text или json).
+    :param level: Уровень stdout и файлового синка.
+    :param requests: Количество итераций.
+    :return: Отчёт о задержках.
+    """
+    report = LatencyReport(name=name)
+    with tempfile.TemporaryDirectory() as log_dir:
+        LoggerConfig(
+            log_dir=Path(log_dir),
+            # stdout бенчмарка занят результатами, поэтому в stdout пишутся только ошибки
+            logger_level_stdout="ERROR",
+            logger_level_file=level,
+            logger_error_file="ERROR",
+            log_format=log_format,
+        )
+        started = time.perf_counter()
+        for appointment_id in range(1, requests + 1):
+            token = current_scope.set({"type": "http", "route": SimpleNamespace(path=ROUTE)})
+            call_started = time.perf_counter()
+            log_request(appointment_id)
+            report.samples.append(time.perf_counter() - call_started)
+            current_scope.reset(token)
+        logger.complete()
+        report.elapsed = time.perf_counter() - started
+        logger.remove()
+    return report
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="Итераций на сценарий")
+    parser.add_argument("--level", default="DEBUG", help="Уровень файлового лога (DEBUG, INFO, WARNING)")
+    parser.add_argument("--sample-rate", type=float, default=0.01, help="Доля маршрута в сценарии sampled-json")
+    args = parser.parse_args()
+
+    all_requests: Dict[str, float] = {ROUTE: 1.0}
+    scenarios: Tuple[Tuple[str, Callable[[int], None], Literal["text", "json"], Dict[str, float]], ...] = (
+        ("eager-text", eager_request, "text", all_requests),
+        ("lazy-text", lazy_request, "text", all_requests),
+        ("lazy-json", lazy_request, "json", all_requests),
+        (f"sampled-json {args.sample_rate:g}", lazy_request, "json", {ROUTE: args.sample_rate}),
+    )
+    for name, log_request, log_format, rates in scenarios:
+        settings.LOG_SAMPLE_RATES = rates
+        report = measure(name, log_request, log_format, args.level, args.requests)
+        print(f"{report.format()} total={report.elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
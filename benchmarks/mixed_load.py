@@ -0,0 +1,383 @@
+"""
+Нагрузочный тест API записей: смешанные GET/POST-запросы с заданной параллельностью.
+
+Данные заполняются в тестовой БД (DB_TEST) через generate_series: врачи, пациенты и история приёмов
+за прошедшие месяцы (по SLOTS_PER_MONTH приёмов у каждого врача в месяц, каждый месяц в своей секции).
+Бронирования идут в будущие месяцы и не конфликтуют ни с историей, ни друг с другом; после прогона
+они удаляются, поэтому повторный запуск с --no-seed работает на тех же данных.
+
+Операции и веса задаются --mix:
+- get: GET /api/appointments/{id} случайной записи истории;
+- list: GET /api/appointments?doctor_id=...&limit=50;
+- slots: GET /api/doctors/{id}/free-slots;
+- history: GET /api/patients/{id}/appointments;
+- post: POST /api/appointments.
+
+По умолчанию запросы идут в приложение in-process через httpx ASGITransport. С --base-url — в запущенный
+uvicorn, который должен работать с той же БД (DB_NAME=$DB_TEST).
+
+Результат (RPS и p50/p95/p99 в целом и по операциям) пишется в JSON. С --baseline результат сравнивается
+с сохранённым прогоном: рост p95 или падение RPS больше --tolerance, а также новые ошибки считаются
+регрессией, и команда завершается с кодом 1.
+
+Запуск:
+    ENV=local python -m benchmarks.mixed_load --requests 20000 --concurrency 50 --mix get=60,list=15,post=25
+    ENV=local python -m benchmarks.mixed_load --no-seed --baseline benchmarks/results/baseline.json
+    ENV=local python -m benchmarks.mixed_load --base-url http://localhost:8000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.partitions import add_months, create_partitions, month_start
+from app.config import settings
+from app.database import async_test_session, test_engine
+from app.dependencies import get_read_session, get_read_session_maker, get_session, get_session_maker
+from app.main import app
+from benchmarks.common import LatencyReport
+
+HOURS_PER_DAY = 10
+DAYS_PER_MONTH = 28
+# Приёмов у одного врача за месяц: слоты по часу с 8:00, HOURS_PER_DAY в день
+SLOTS_PER_MONTH = HOURS_PER_DAY * DAYS_PER_MONTH
+SPECIALIZATIONS = ("Терапевт", "Хирург", "Кардиолог", "Невролог")
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_MIX = "get=60,list=10,slots=5,history=5,post=20"
+# Ожидаемый код ответа по операции; остальные коды считаются ошибками
+EXPECTED_STATUS = {"get": 200, "list": 200, "slots": 200, "history": 200, "post": 201}
+
+# Запрос: (операция, метод, путь, JSON-тело)
+Request = Tuple[str, str, str, Optional[Dict[str, Any]]]
+
+
+@dataclass
+class Dataset:
+    """
+    Объём данных, на которых идёт прогон.
+
+    Атрибуты:
+        doctors (int): Количество врачей (ID 1..doctors).
+        patients (int): Количество пациентов (ID 1..patients).
+        history (int): Записей истории (ID 1..history).
+    """
+
+    doctors: int
+    patients: int
+    history: int
+
+
+async def _test_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_test_session() as session:
+        yield session
+
+
+def slot_patient(doctor_id: int, slot: int, patients: int) -> int:
+    """
+    Пациент слота slot врача doctor_id: у одного врача в месяце пациенты не повторяются.
+
+    :param doctor_id: ID врача.
+    :param slot: Номер слота в месяце (0..SLOTS_PER_MONTH - 1).
+    :param patients: Количество пациентов (не меньше SLOTS_PER_MONTH).
+    :return: ID пациента.
+    """
+    return ((doctor_id - 1) * SLOTS_PER_MONTH + slot) % patients + 1
+
+
+def slot_time(month: date, slot: int) -> datetime:
+    """Время слота с номером slot в месяце: по HOURS_PER_DAY часовых приёмов в день с 8:00."""
+    return datetime(month.year, month.month, 1, 8) + timedelta(days=slot // HOURS_PER_DAY, hours=slot % HOURS_PER_DAY)
+
+
+async def seed(doctors: int, patients: int, history_months: int, current: date) -> Dataset:
+    """
+    Очищает тестовую БД и заполняет врачей, пациентов и историю за history_months прошедших месяцев.
+
+    :param doctors: Количество врачей.
+    :param patients: Количество пациентов.
+    :param history_months: Сколько прошедших месяцев заполнить приёмами.
+    :param current: Первое число текущего месяца.
+    :return: Объём данных.
+    """
+    async with test_engine.begin() as connection:
+        await connection.execute(text("TRUNCATE TABLE appointments, doctors, patients RESTART IDENTITY CASCADE;"))
+        await connection.execute(
+            text(
+                "INSERT INTO doctors (name, specialization, experience_years) "
+                "SELECT 'Load ' || n, (CAST(:specializations AS text[]))[n % :count_spec + 1], n % 40 "
+                "FROM generate_series(1, :count) n"
+            ),
+            {"specializations": list(SPECIALIZATIONS), "count_spec": len(SPECIALIZATIONS), "count": doctors},
+        )
+        await connection.execute(
+            text(
+                "INSERT INTO patients (name, email) "
+                "SELECT 'Load ' || n, 'load' || n || '@example.com' FROM generate_series(1, :count) n"
+            ),
+            {"count": patients},
+        )
+    for offset in range(history_months, 0, -1):
+        month = add_months(current, -offset)
+        async with test_engine.begin() as connection:
+            await create_partitions(connection, month, add_months(month, 1))
+            await connection.execute(
+                text(
+                    "INSERT INTO appointments (doctor_id, patient_id, start_time) "
+                    "SELECT d, ((d - 1) * :slots + k) % :patients + 1, "
+                    "CAST(:month AS timestamp) + make_interval(days => k / :hours, hours => 8 + k % :hours) "
+                    "FROM generate_series(1, :doctors) d, generate_series(0, :slots - 1) k"
+                ),
+                {
+                    "month": month,
+                    "hours": HOURS_PER_DAY,
+                    "doctors": doctors,
+                    "slots": SLOTS_PER_MONTH,
+                    "patients": patients,
+                },
+            )
+    async with test_engine.begin() as connection:
+        await connection.execute(text("ANALYZE doctors, patients, appointments"))
+    return Dataset(doctors=doctors, patients=patients, history=doctors * SLOTS_PER_MONTH * history_months)
+
+
+async def load_dataset() -> Dataset:
+    """Объём уже заполненных данных (для --no-seed)."""
+    async with test_engine.connect() as connection:
+        row = (
+            await connection.execute(
+                text(
+                    "SELECT (SELECT count(*) FROM doctors), (SELECT count(*) FROM patients), "
+                    "(SELECT count(*) FROM appointments)"
+                )
+            )
+        ).one()
+    return Dataset(doctors=row[0], patients=row[1], history=row[2])
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """
+    Разбирает веса операций вида get=60,post=20.
+
+    :param value: Строка с весами.
+    :return: Вес по операции.
+    :raises ValueError: Неизвестная операция или неположительный вес.
+    """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in EXPECTED_STATUS or not weight.isdigit() or int(weight) <= 0:
+            raise ValueError(f"Неверный элемент --mix: {part!r} (операции: {', '.join(EXPECTED_STATUS)})")
+        mix[name] = int(weight)
+    return mix
+
+
+def build_requests(
+    mix: Dict[str, int], count: int, dataset: Dataset, first_month: date, rng: random.Random
+) -> List[Request]:
+    """
+    Готовит последовательность запросов заранее, чтобы генерация не попадала в замер.
+
+    k-е бронирование идёт к врачу k % doctors в слот k // doctors, начиная с first_month:
+    слоты одного врача не пересекаются, а пациенты у врача в месяце не повторяются.
+
+    :param mix: Вес по операции.
+    :param count: Количество запросов.
+    :param dataset: Объём данных.
+    :param first_month: Первый месяц для бронирований.
+    :param rng: Генератор случайных чисел (зерно задаёт воспроизводимый прогон).
+    :return: Список запросов.
+    """
+    builders: Dict[str, Callable[[], Tuple[str, str, Optional[Dict[str, Any]]]]] = {
+        "get": lambda: ("GET", f"/api/appointments/{rng.randint(1, dataset.history)}", None),
+        "list": lambda: ("GET", f"/api/appointments?doctor_id={rng.randint(1, dataset.doctors)}&limit=50", None),
+        "slots": lambda: ("GET", f"/api/doctors/{rng.randint(1, dataset.doctors)}/free-slots", None),
+        "history": lambda: ("GET", f"/api/patients/{rng.randint(1, dataset.patients)}/appointments", None),
+    }
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    requests: List[Request] = []
+    bookings = 0
+    for name in rng.choices(names, weights=weights, k=count):
+        if name == "post":
+            doctor_id = bookings % dataset.doctors + 1
+            slot = bookings // dataset.doctors
+            month = add_months(first_month, slot // SLOTS_PER_MONTH)
+            payload = {
+                "doctor_id": doctor_id,
+                "patient_id": slot_patient(doctor_id, slot % SLOTS_PER_MONTH, dataset.patients),
+                "start_time": slot_time(month, slot % SLOTS_PER_MONTH).isoformat(),
+            }
+            requests.append((name, "POST", "/api/appointments", payload))
+            bookings += 1
+        else:
+            requests.append((name, *builders[name]()))
+    return requests
+
+
+async def run(
+    client: AsyncClient, requests: List[Request], concurrency: int
+) -> Tuple[Dict[str, LatencyReport], Dict[str, int]]:
+    """
+    Прогоняет запросы concurrency параллельными клиентами (каждый берёт следующий запрос, как только получил ответ).
+
+    :param client: HTTP-клиент.
+    :param requests: Запросы.
+    :param concurrency: Количество одновременных запросов.
+    :return: Отчёты по операциям и по всем запросам ("total") и количество ошибок по операциям.
+    """
+    reports: Dict[str, LatencyReport] = {"total": LatencyReport(name="total")}
+    errors: Dict[str, int] = {"total": 0}
+    pending = iter(requests)
+
+    async def worker() -> None:
+        for name, method, url, payload in pending:
+            started = time.perf_counter()
+            response = await client.request(method, url, json=payload)
+            elapsed = time.perf_counter() - started
+            for key in (name, "total"):
+                reports.setdefault(key, LatencyReport(name=key)).samples.append(elapsed)
+                if response.status_code != EXPECTED_STATUS[name]:
+                    errors[key] = errors.get(key, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    for report in reports.values():
+        report.elapsed = elapsed
+    return reports, errors
+
+
+def git_commit() -> Optional[str]:
+    """Текущий коммит репозитория (None вне git)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Ищет регрессии относительно базового прогона по операциям, которые есть в обоих.
+
+    :param current: Результат текущего прогона.
+    :param baseline: Результат базового прогона.
+    :param tolerance: Допустимое относительное ухудшение (0.1 — 10%).
+    :return: Описания регрессий (пустой список — регрессий нет).
+    """
+    regressions = []
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            continue
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {result['p95_ms']} мс")
+        if base["rps"] and result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {base['rps']} -> {result['rps']}")
+        if result["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: ошибок {base.get('errors', 0)} -> {result['errors']}")
+    return regressions
+
+
+async def cleanup_bookings(first_month: date) -> None:
+    """Удаляет записи, созданные прогоном (всё, начиная с first_month)."""
+    async with test_engine.begin() as connection:
+        await connection.execute(text("DELETE FROM appointments WHERE start_time >= :start"), {"start": first_month})
+
+
+async def main() -> None:
+    """Точка входа нагрузочного теста."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000, help="Количество запросов в замере")
+    parser.add_argument("--warmup", type=int, default=500, help="Запросов прогрева (не попадают в результат)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Одновременных запросов")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Веса операций: get, list, slots, history, post")
+    parser.add_argument("--doctors", type=int, default=200, help="Количество врачей")
+    parser.add_argument("--patients", type=int, default=20000, help="Количество пациентов")
+    parser.add_argument("--history-months", type=int, default=3, help="Прошедших месяцев истории")
+    parser.add_argument("--no-seed", action="store_true", help="Не пересоздавать данные, взять уже заполненные")
+    parser.add_argument("--random-seed", type=int, default=42, help="Зерно генератора запросов")
+    parser.add_argument("--base-url", default=None, help="Адрес запущенного сервера вместо in-process приложения")
+    parser.add_argument("--output", type=Path, default=None, help="Файл результата (по умолчанию benchmarks/results/)")
+    parser.add_argument("--baseline", type=Path, default=None, help="Результат прошлого прогона для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Допустимое ухудшение p95 и RPS (0.1 — 10%%)")
+    args = parser.parse_args()
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.patients < SLOTS_PER_MONTH:
+        parser.error(f"--patients должно быть не меньше {SLOTS_PER_MONTH}")
+
+    current = month_start(date.today())
+    dataset = (
+        await load_dataset() if args.no_seed else await seed(args.doctors, args.patients, args.history_months, current)
+    )
+    if dataset.history == 0 and "get" in mix:
+        parser.error("В БД нет записей истории для операции get")
+
+    # Бронирования начинаются со следующего месяца; секции создаются на все задействованные месяцы
+    first_month = add_months(current, 1)
+    rng = random.Random(args.random_seed)
+    requests = build_requests(mix, args.warmup + args.requests, dataset, first_month, rng)
+    bookings = sum(1 for request in requests if request[0] == "post")
+    months = bookings // (dataset.doctors * SLOTS_PER_MONTH) + 1
+    async with test_engine.begin() as connection:
+        await create_partitions(connection, first_month, add_months(first_month, months))
+
+    if args.base_url is None:
+        app.dependency_overrides[get_session] = _test_session
+        app.dependency_overrides[get_read_session] = _test_session
+        app.dependency_overrides[get_session_maker] = lambda: async_test_session
+        app.dependency_overrides[get_read_session_maker] = lambda: async_test_session
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=60)
+    else:
+        client = AsyncClient(base_url=args.base_url, timeout=60)
+    try:
+        async with client:
+            await run(client, requests[: args.warmup], args.concurrency)
+            reports, errors = await run(client, requests[args.warmup :], args.concurrency)
+    finally:
+        await cleanup_bookings(first_month)
+
+    result = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "target": args.base_url or "asgi",
+        "args": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        "settings": {"BOOKING_MODE": settings.BOOKING_MODE, "CACHE_BACKEND": settings.CACHE_BACKEND},
+        "dataset": vars(dataset),
+        "results": {name: {**report.summary(), "errors": errors.get(name, 0)} for name, report in reports.items()},
+    }
+    for name, report in reports.items():
+        print(f"{report.format()} errors={errors.get(name, 0)}")
+
+    output = args.output or RESULTS_DIR / f"mixed_load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f"Результат: {output}")
+
+    if args.baseline is not None:
+        regressions = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"РЕГРЕССИЯ {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"Регрессий относительно {args.baseline} нет")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,158 @@
+"""
+Бенчмарк POST /api/appointments при растущей истории приёмов.
+
+История заполняется в тестовой БД (DB_TEST) целыми прошедшими месяцами через generate_series,
+каждый месяц в своей секции. На каждом шаге замеряется задержка бронирования в следующем месяце:
+при секционировании она не должна расти вместе с объёмом истории.
+
+Запуск:
+    ENV=local python -m benchmarks.partition_history --steps 0,1000000,10000000 --requests 500
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from typing import AsyncGenerator, List, Tuple
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.partitions import add_months, create_partitions, month_start
+from app.database import async_test_session, test_engine
+from app.dependencies import get_session
+from app.main import app
+from benchmarks.common import LatencyReport
+
+HOURS_PER_DAY = 10
+DAYS_PER_MONTH = 28
+# Приёмов у одного врача за месяц истории; пациенты 1..SLOTS_PER_MONTH не повторяются у врача в месяце
+SLOTS_PER_MONTH = HOURS_PER_DAY * DAYS_PER_MONTH
+
+
+async def _test_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_test_session() as session:
+        yield session
+
+
+def slot_time(month: date, slot: int) -> datetime:
+    """Время слота с номером slot в месяце: по HOURS_PER_DAY часовых приёмов в день с 8:00."""
+    return datetime(month.year, month.month, 1, 8) + timedelta(days=slot // HOURS_PER_DAY, hours=slot % HOURS_PER_DAY)
+
+
+async def seed(num_doctors: int, num_requests: int) -> None:
+    """
+    Очищает БД и создаёт врачей и пациентов (для истории и для замеряемых бронирований).
+
+    :param num_doctors: Количество врачей.
+    :param num_requests: Количество бронирований на шаг.
+    """
+    async with test_engine.begin() as connection:
+        await connection.execute(text("TRUNCATE TABLE appointments, doctors, patients RESTART IDENTITY CASCADE;"))
+        await connection.execute(
+            text(
+                "INSERT INTO doctors (name, specialization, experience_years) "
+                "SELECT 'Bench ' || n, 'Терапевт', 5 FROM generate_series(1, :count) n"
+            ),
+            {"count": num_doctors},
+        )
+        await connection.execute(
+            text(
+                "INSERT INTO patients (name, email) "
+                "SELECT 'Bench ' || n, 'bench' || n || '@example.com' FROM generate_series(1, :count) n"
+            ),
+            {"count": SLOTS_PER_MONTH + num_requests},
+        )
+
+
+async def grow_history(target: int, filled: List[date], num_doctors: int, current: date) -> int:
+    """
+    Добавляет прошедшие месяцы истории, пока строк не станет не меньше target.
+
+    :param target: Желаемое количество строк истории.
+    :param filled: Уже заполненные месяцы (дополняется).
+    :param num_doctors: Количество врачей.
+    :param current: Первое число текущего месяца.
+    :return: Количество строк истории.
+    """
+    per_month = num_doctors * SLOTS_PER_MONTH
+    while len(filled) * per_month < target:
+        month = add_months(current, -len(filled) - 1)
+        async with test_engine.begin() as connection:
+            await create_partitions(connection, month, add_months(month, 1))
+            await connection.execute(
+                text(
+                    "INSERT INTO appointments (doctor_id, patient_id, start_time) "
+                    "SELECT d, k + 1, CAST(:month AS timestamp) + make_interval(days => k / :hours, hours => 8 + k % :hours) "
+                    "FROM generate_series(1, :doctors) d, generate_series(0, :slots - 1) k"
+                ),
+                {"month": month, "hours": HOURS_PER_DAY, "doctors": num_doctors, "slots": SLOTS_PER_MONTH},
+            )
+        filled.append(month)
+    async with test_engine.begin() as connection:
+        await connection.execute(text("ANALYZE appointments"))
+    return len(filled) * per_month
+
+
+async def run_step(bookings: List[Tuple[int, int, datetime]], concurrency: int, name: str) -> LatencyReport:
+    """
+    Бронирует все записи и удаляет их после замера, чтобы шаги были одинаковыми.
+
+    :param bookings: Список (doctor_id, patient_id, start_time).
+    :param concurrency: Количество одновременных запросов.
+    :param name: Название шага.
+    :return: Отчёт о задержках.
+    """
+    report = LatencyReport(name=name)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def book(doctor_id: int, patient_id: int, start_time: datetime) -> None:
+            payload = {"doctor_id": doctor_id, "patient_id": patient_id, "start_time": start_time.isoformat()}
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/appointments", json=payload)
+                report.samples.append(time.perf_counter() - started)
+            assert response.status_code == 201, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(book(*item) for item in bookings))
+        report.elapsed = time.perf_counter() - started
+
+    async with test_engine.begin() as connection:
+        await connection.execute(
+            text("DELETE FROM appointments WHERE start_time >= :start"), {"start": bookings[0][2].date()}
+        )
+    return report
+
+
+async def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", default="0,1000000,10000000", help="Объёмы истории через запятую")
+    parser.add_argument("--doctors", type=int, default=2000, help="Количество врачей")
+    parser.add_argument("--requests", type=int, default=500, help="Бронирований на шаг")
+    parser.add_argument("--concurrency", type=int, default=10, help="Одновременных запросов")
+    args = parser.parse_args()
+
+    app.dependency_overrides[get_session] = _test_session
+    current = month_start(date.today())
+    target_month = add_months(current, 1)
+    async with test_engine.begin() as connection:
+        await create_partitions(connection, current, add_months(target_month, 1))
+    await seed(args.doctors, args.requests)
+
+    bookings = [
+        (k % args.doctors + 1, SLOTS_PER_MONTH + k + 1, slot_time(target_month, k // args.doctors))
+        for k in range(args.requests)
+    ]
+    filled: List[date] = []
+    for target in (int(step) for step in args.steps.split(",")):
+        rows = await grow_history(target, filled, args.doctors, current)
+        print((await run_step(bookings, args.concurrency, f"history={rows}")).format())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Микробенчмарк сериализации ответов с записями на приём (без БД).
+
+Сравнивает три пути для одной записи и для списка:
+- stdlib: ORM-объект -> RBAppointmentRead.model_validate -> jsonable_encoder -> JSONResponse (json.dumps);
+- orjson: ORM-объект -> RBAppointmentRead.model_validate -> model_dump(mode="json") -> ORJSONResponse;
+- rows: строка выборки -> appointment_row_dict -> orjson.dumps (путь find_one_payload_by_id / find_page_payload).
+
+Запуск:
+    ENV=local python -m benchmarks.serialization --sizes 1,10000 --repeat 20
+"""
+
+import argparse
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.appointments.models import Appointment
+from app.appointments.rb import RBAppointmentRead, appointment_row_dict
+from benchmarks.common import LatencyReport
+
+# Строка выборки AppointmentDAO._read_columns(): те же атрибуты, что у sqlalchemy Row
+AppointmentRow = namedtuple("AppointmentRow", "id patient_id doctor_id start_time")
+
+
+def stdlib_path(appointments: List[Appointment]) -> bytes:
+    """Прежний путь: модель Pydantic, jsonable_encoder и json.dumps."""
+    items = [jsonable_encoder(RBAppointmentRead.model_validate(a)) for a in appointments]
+    return JSONResponse(items).body
+
+
+def orjson_path(appointments: List[Appointment]) -> bytes:
+    """Модель Pydantic и ORJSONResponse (ответ с response_model при default_response_class=ORJSONResponse)."""
+    items = [RBAppointmentRead.model_validate(a).model_dump(mode="json") for a in appointments]
+    return ORJSONResponse(items).body
+
+
+def rows_path(rows: List[Any]) -> bytes:
+    """Строки выборки сразу в JSON, без ORM-объектов и моделей Pydantic."""
+    return orjson.dumps([appointment_row_dict(row) for row in rows])
+
+
+def measure(name: str, func: Callable[[List[Any]], bytes], data: List[Any], repeat: int) -> LatencyReport:
+    """
+    Замер repeat вызовов func(data).
+
+    :param name: Название сценария.
+    :param func: Сериализация.
+    :param data: Входные данные.
+    :param repeat: Количество повторов.
+    :return: Отчёт о задержках.
+    """
+    report = LatencyReport(name=name)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call_started = time.perf_counter()
+        func(data)
+        report.samples.append(time.perf_counter() - call_started)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,10000", help="Размеры ответа через запятую")
+    parser.add_argument("--repeat", type=int, default=20, help="Повторов на сценарий")
+    args = parser.parse_args()
+
+    start = datetime(2025, 7, 1, 8, 0)
+    for size in (int(value) for value in args.sizes.split(",")):
+        values: List[Dict[str, Any]] = [
+            {"id": i, "patient_id": i % 500 + 1, "doctor_id": i % 50 + 1, "start_time": start + timedelta(hours=i)}
+            for i in range(1, size + 1)
+        ]
+        appointments = [Appointment(**value) for value in values]
+        rows = [AppointmentRow(**value) for value in values]
+        # Все пути дают одинаковый JSON
+        assert orjson.loads(stdlib_path(appointments)) == orjson.loads(rows_path(rows))
+        repeat = args.repeat if size > 1 else args.repeat * 1000
+
+        for report in (
+            measure(f"stdlib x{size}", stdlib_path, appointments, repeat),
+            measure(f"orjson x{size}", orjson_path, appointments, repeat),
+            measure(f"rows x{size}", rows_path, rows, repeat),
+        ):
+            print(report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+from starlette.types import Receive, Scope, Send
+
+from app.admission import AdmissionLimiter, AdmissionRejected
+from app.config import settings
+from app.middleware import AdmissionControlMiddleware
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_limiter_rejects_when_queue_full() -> None:
+    """Сверх limit запросы ждут в очереди, сверх max_queue — сразу отклоняются."""
+    limiter = AdmissionLimiter("test-queue", limit=1, max_queue=1, max_wait=5)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert limiter.waiting == 1
+
+    with pytest.raises(AdmissionRejected) as error:
+        async with limiter.slot():
+            pass
+    assert error.value.reason == "queue_full"
+    assert (
+        REGISTRY.get_sample_value("admission_rejections_total", {"budget": "test-queue", "reason": "queue_full"}) == 1
+    )
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    assert limiter.waiting == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_limiter_rejects_after_max_wait() -> None:
+    """Запрос в очереди получает отказ, если место не освободилось за max_wait, и не занимает место."""
+    limiter = AdmissionLimiter("test-wait", limit=1, max_queue=10, max_wait=0.01)
+    async with limiter.slot():
+        with pytest.raises(AdmissionRejected) as error:
+            async with limiter.slot():
+                pass
+    assert error.value.reason == "timeout"
+    async with limiter.slot():
+        assert limiter.waiting == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_middleware_separates_write_and_read_budgets() -> None:
+    """Пока бюджет записи занят, запись получает 503 с Retry-After, а чтение и /health проходят."""
+    release = asyncio.Event()
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["method"] == "POST" and scope["path"] == "/api/appointments":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = AdmissionControlMiddleware(
+        app,
+        write=AdmissionLimiter("test-write", limit=1, max_queue=0, max_wait=1),
+        read=AdmissionLimiter("test-read", limit=10, max_queue=0, max_wait=1),
+        retry_after=3,
+    )
+    async with AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test") as client:
+        booking = asyncio.create_task(client.post("/api/appointments", json={}))
+        while middleware.write is not None and not middleware.write._semaphore.locked():
+            await asyncio.sleep(0)
+
+        rejected = await client.post("/api/appointments", json={})
+        assert rejected.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert rejected.headers["Retry-After"] == "3"
+        assert rejected.json()["result"] is False
+
+        assert (await client.get("/api/appointments/1")).status_code == status.HTTP_200_OK
+        assert (await client.post("/api/appointments/by-ids", json=[1])).status_code == status.HTTP_200_OK
+        assert (await client.get("/health")).status_code == status.HTTP_200_OK
+
+        release.set()
+        assert (await booking).status_code == status.HTTP_200_OK
+
+
+def test_middleware_budgets_from_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест может включить admission control обратно: бюджеты по умолчанию берутся из ADMISSION_*."""
+    monkeypatch.setattr(settings, "ADMISSION_WRITE_LIMIT", 2)
+    monkeypatch.setattr(settings, "ADMISSION_WRITE_QUEUE", 5)
+    monkeypatch.setattr(settings, "ADMISSION_READ_LIMIT", 0)
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        pass
+
+    middleware = AdmissionControlMiddleware(app)
+    assert middleware.write is not None
+    assert (middleware.write.limit, middleware.write.max_queue) == (2, 5)
+    assert middleware.read is None
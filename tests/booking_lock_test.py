@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from app.appointments.booking_locks import BOOKING_LOCK_NAMESPACE, ShardedLocks, lock_chunks, serialize_doctors
+from app.config import settings
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_sharded_locks_serialize_same_doctor_only() -> None:
+    """Записи к одному врачу ждут друг друга, к врачу из другого шарда — выполняются сразу."""
+    locks = ShardedLocks(4)
+    release = asyncio.Event()
+    order: List[str] = []
+
+    async def book(doctor_id: int, name: str, wait: bool) -> None:
+        async with locks.hold([doctor_id]):
+            order.append(name)
+            if wait:
+                await release.wait()
+
+    first = asyncio.create_task(book(1, "first", wait=True))
+    await asyncio.sleep(0)
+    same_doctor = asyncio.create_task(book(1, "same", wait=False))
+    await asyncio.wait_for(book(2, "other", wait=False), timeout=1)
+    assert order == ["first", "other"]
+
+    release.set()
+    await asyncio.gather(first, same_doctor)
+    assert order == ["first", "other", "same"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_sharded_locks_batches_do_not_deadlock() -> None:
+    """Пачки с общими врачами в разном порядке берут блокировки по возрастанию шарда и не зависают."""
+    locks = ShardedLocks(8)
+
+    async def batch(doctor_ids: List[int]) -> None:
+        async with locks.hold(doctor_ids):
+            await asyncio.sleep(0)
+
+    await asyncio.wait_for(asyncio.gather(*(batch([1, 2, 3]) for _ in range(20)), batch([3, 2, 1])), timeout=1)
+    assert locks.shard(9) == locks.shard(1)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_advisory_locks_full_doctor_id(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Advisory-блокировка берётся по самому doctor_id, без шардирования, по возрастанию и без повторов."""
+    monkeypatch.setattr(settings, "BOOKING_SERIALIZATION", "advisory")
+    monkeypatch.setattr(settings, "BOOKING_LOCK_SHARDS", 16)
+    executed: List[Dict[str, Any]] = []
+
+    class RecordingSession:
+        async def execute(self, statement: Any, params: Dict[str, Any]) -> None:
+            executed.append(params)
+
+    async with serialize_doctors(RecordingSession(), [17, 1, 33, 1]):  # type: ignore[arg-type]
+        pass
+    assert executed == [{"namespace": BOOKING_LOCK_NAMESPACE, "lock_keys": [1, 17, 33]}]
+
+
+def test_lock_chunks_bound_doctors_per_transaction() -> None:
+    """Части пачки идут подряд и содержат не больше limit разных врачей; повтор врача не начинает новую часть."""
+    doctor_ids = [1, 2, 1, 3, 2, 4, 4, 5]
+    chunks = lock_chunks(doctor_ids, 2)
+    assert chunks == [slice(0, 3), slice(3, 5), slice(5, 8)]
+    assert [doctor_id for chunk in chunks for doctor_id in doctor_ids[chunk]] == doctor_ids
+    assert all(len(set(doctor_ids[chunk])) <= 2 for chunk in chunks)
+    assert lock_chunks(list(range(5000)), 256)[-1] == slice(4864, 5000)
+    assert lock_chunks([], 256) == []
@@ -0,0 +1,122 @@
+import fnmatch
+from typing import AsyncIterator, Dict, Optional
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.dao import AppointmentDAO
+from app.appointments.models import Appointment
+from app.cache import MemoryCache, RedisCache
+
+
+class FakeRedis:
+    """Минимальная замена redis.asyncio.Redis в памяти (TTL не учитывается)."""
+
+    def __init__(self) -> None:
+        """Создаёт пустое хранилище."""
+        self.data: Dict[str, bytes] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Получить значение."""
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        """Сохранить значение."""
+        self.data[key] = value
+
+    async def delete(self, *keys: str) -> None:
+        """Удалить ключи."""
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match: str) -> AsyncIterator[str]:
+        """Перебрать ключи по шаблону."""
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_memory_cache_lru_and_ttl() -> None:
+    """Проверка вытеснения по LRU, истечения TTL и счётчиков."""
+    now = [0.0]
+    cache = MemoryCache(max_size=2, ttl=10, clock=lambda: now[0])
+
+    await cache.set("a", b"1")
+    await cache.set("b", b"2")
+    assert await cache.get("a") == b"1"  # "a" становится самым свежим
+    await cache.set("c", b"3")  # вытесняет "b"
+    assert await cache.get("b") is None
+    assert await cache.get("c") == b"3"
+
+    now[0] = 11
+    assert await cache.get("a") is None
+
+    assert cache.stats() == {"backend": "memory", "hits": 2, "misses": 2, "size": 1}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_cache_requests_metric() -> None:
+    """Попадания и промахи попадают в cache_requests_total с меткой бэкенда."""
+
+    def sample(backend: str, result: str) -> float:
+        return REGISTRY.get_sample_value("cache_requests_total", {"backend": backend, "result": result}) or 0.0
+
+    hits, misses = sample("memory", "hit"), sample("memory", "miss")
+    cache = MemoryCache()
+    await cache.set("a", b"1")
+    assert await cache.get("a") == b"1"
+    assert await cache.get("b") is None
+    assert await cache.get("c") is None
+
+    assert sample("memory", "hit") == hits + 1
+    assert sample("memory", "miss") == misses + 2
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_cache_prefix() -> None:
+    """Проверка RedisCache на локальной замене клиента: clear удаляет только свои ключи."""
+    client = FakeRedis()
+    client.data["other:1"] = b"x"
+    cache = RedisCache(client, ttl=10, prefix="girumed:")
+
+    await cache.set("appointments:1", b"1")
+    assert client.data["girumed:appointments:1"] == b"1"
+    assert await cache.get("appointments:1") == b"1"
+
+    await cache.clear()
+    assert await cache.get("appointments:1") is None
+    assert client.data == {"other:1": b"x"}
+    assert cache.stats() == {"backend": "redis", "hits": 1, "misses": 1}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_appointment_cached_and_invalidated(
+    test_appointment: Appointment,
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+) -> None:
+    """Повторный GET отдаётся из кэша, а обновление записи сбрасывает кэш."""
+    cache = AppointmentDAO.cache
+    assert cache is not None
+    await cache.delete([AppointmentDAO._cache_key(test_appointment.id)])
+
+    first = await async_client.get(f"/api/appointments/{test_appointment.id}")
+    hits = cache.hits
+    second = await async_client.get(f"/api/appointments/{test_appointment.id}")
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert first.content == second.content
+    assert cache.hits == hits + 1
+
+    # Значение то же, чтобы не влиять на другие тесты с этой записью: важен сам факт сброса кэша
+    await AppointmentDAO.update(test_db, {"id": test_appointment.id}, start_time=test_appointment.start_time)
+    misses = cache.misses
+    third = await async_client.get(f"/api/appointments/{test_appointment.id}")
+    assert cache.misses == misses + 1
+    assert third.content == first.content
+
+    stats = await async_client.get("/health/cache")
+    assert stats.json()["backend"] == "memory"
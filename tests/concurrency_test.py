@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
+from app.appointments.models import Appointment, Doctor
+from app.config import settings
+
+CONCURRENT_BOOKINGS = 300
+
+
+@pytest.mark.parametrize("serialization", ["none", "advisory", "sharded"])
+@pytest.mark.parametrize("booking_mode", ["classic", "single_statement"])
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_bookings_same_doctor(
+    booking_mode: str,
+    serialization: str,
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Сотни одновременных записей к одному врачу не дают пересекающихся приёмов в любом режиме сериализации."""
+    monkeypatch.setattr(settings, "BOOKING_MODE", booking_mode)
+    monkeypatch.setattr(settings, "BOOKING_SERIALIZATION", serialization)
+    suffix = f"{booking_mode}-{serialization}"
+    doctor: Doctor = await DoctorDAO.add(
+        test_db, name=f"Dr. Stress {suffix}", specialization="Терапевт", experience_years=7
+    )
+    patient_ids = [
+        (await PatientDAO.add(test_db, name=f"Stress {i}", email=f"stress-{suffix}-{i}@example.com")).id
+        for i in range(CONCURRENT_BOOKINGS)
+    ]
+    # 40 слотов по 15 минут с 8:00 до 18:00: запросы гарантированно перекрываются
+    day = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=60)
+    payloads = [
+        {
+            "doctor_id": doctor.id,
+            "patient_id": patient_id,
+            "start_time": (day + timedelta(minutes=15 * (i % 40))).isoformat(),
+        }
+        for i, patient_id in enumerate(patient_ids)
+    ]
+
+    responses = await asyncio.gather(*(async_client.post("/api/appointments", json=p) for p in payloads))
+    codes = [r.status_code for r in responses]
+    assert set(codes) <= {status.HTTP_201_CREATED, status.HTTP_409_CONFLICT}
+
+    booked: list[Appointment] = await AppointmentDAO.find_all(test_db, doctor_id=doctor.id)  # type: ignore
+    assert len(booked) == codes.count(status.HTTP_201_CREATED) > 0
+    times = sorted(a.start_time for a in booked)
+    assert all(b - a >= timedelta(hours=1) for a, b in zip(times, times[1:]))
@@ -1,21 +1,20 @@
-import os
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Any, AsyncGenerator, Generator
+from typing import Any, AsyncGenerator, Callable, ContextManager, Generator, List
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import text
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
-from app.config import get_settings, logger
-from app.data_generate import generate_appointments, generate_doctors, generate_patients
+from app.config import get_settings, logger, settings
+from app.data_generate import seed_database
 from app.database import Base, async_test_session, test_engine
-from app.dependencies import get_session
+from app.dependencies import get_read_session, get_read_session_maker, get_session, get_session_maker
 from app.main import app
-from migrations_script import run_alembic_command
+from app.startup import upgrade_database
 
 
 async def get_session_override() -> AsyncGenerator[AsyncSession, None]:
@@ -30,23 +29,23 @@ async def get_session_override() -> AsyncGenerator[AsyncSession, None]:
 
 # Подменяем зависимость на тестовую сессию
 app.dependency_overrides[get_session] = get_session_override
+app.dependency_overrides[get_read_session] = get_session_override
+app.dependency_overrides[get_session_maker] = lambda: async_test_session
+app.dependency_overrides[get_read_session_maker] = lambda: async_test_session
 
 
 @pytest_asyncio.fixture(scope="session", autouse=True)
 async def clean_database() -> None:
     """Очищает все таблицы базы данных и применяет актуальные миграции Alembic перед запуском тестов."""
-    cwd = os.path.split(os.getcwd())[1]
-
-    if cwd == "tests":
-        run_alembic_command("cd ..; alembic -x db=test upgrade head; alembic -x db=test current")
-    elif cwd == "girumed":
-        run_alembic_command("alembic -x db=test upgrade head; alembic -x db=test current")
+    await upgrade_database("test")
 
     async with async_test_session() as session:
         await session.execute(text("TRUNCATE TABLE appointments RESTART IDENTITY CASCADE;"))
         await session.execute(text("TRUNCATE TABLE doctors RESTART IDENTITY CASCADE;"))
         await session.execute(text("TRUNCATE TABLE patients RESTART IDENTITY CASCADE;"))
         await session.commit()
+    if AppointmentDAO.cache is not None:
+        await AppointmentDAO.cache.clear()
 
     logger.info("🧹 База данных очищена.")
 
@@ -63,33 +62,80 @@ async def test_db(async_client: AsyncClient) -> AsyncGenerator[AsyncSession, Non
         await conn.run_sync(Base.metadata.create_all)
 
     async with async_test_session() as session:
-        doctors = [await DoctorDAO.add(session, **doc.to_dict()) for doc in generate_doctors(5)]
-        patients = [await PatientDAO.add(session, **pat.to_dict()) for pat in generate_patients(5)]
+        await seed_database(session, num_doctors=5, num_patients=5, num_appointments=20)
+        yield session
+
 
-        appointments = generate_appointments(patients=patients, doctors=doctors, num_appointments=20)
+@pytest.fixture(scope="session", autouse=True)
+def admission_disabled() -> Generator[None, None, None]:
+    """
+    Выключает admission control приложения на время тестов.
 
-        for appointment in appointments:
-            try:
-                await AppointmentDAO.add(session, **appointment.to_dict())
-            except ValueError as e:
-                logger.warning(f"⚠️ Не удалось создать приём: {e}")
-            except SQLAlchemyError as e:
-                logger.error(f"❌ Ошибка БД при создании приёма: {e}")
+    Тесты конкурентности шлют сотни одновременных запросов в один процесс, и ожидание места
+    не должно превращаться в 503. Бюджеты читаются при сборке middleware — при первом запросе,
+    поэтому фикстура нужна до async_client. Тесты admission control задают лимиты сами
+    через monkeypatch или параметры AdmissionControlMiddleware.
 
-        yield session
+    :yield: Ничего; настройки восстанавливаются в конце сессии.
+    """
+    assert app.middleware_stack is None, "admission control нужно выключить до первого запроса к приложению"
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "ADMISSION_WRITE_LIMIT", 0)
+        patch.setattr(settings, "ADMISSION_READ_LIMIT", 0)
+        yield
 
 
 @pytest_asyncio.fixture(scope="session")
-async def async_client() -> AsyncGenerator[AsyncClient, None]:
+async def async_client(admission_disabled: None) -> AsyncGenerator[AsyncClient, None]:
     """
     Создаёт асинхронный клиент для тестов FastAPI.
 
+    :param admission_disabled: Admission control выключен до первого запроса.
     :yield: AsyncClient с приложением.
     """
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         yield client
 
 
+@pytest.fixture
+def sql_statements() -> Generator[List[str], None, None]:
+    """
+    Собирает тексты SQL-запросов, выполненных в тестовой БД во время теста.
+
+    :yield: Список запросов (его можно очищать перед измеряемым действием).
+    """
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def query_budget(sql_statements: List[str]) -> Callable[[int], ContextManager[List[str]]]:
+    """
+    Бюджет SQL-запросов на блок кода.
+
+    Блок под `with query_budget(n)` падает, если внутри выполнено больше n запросов.
+
+    :param sql_statements: Сборщик запросов к тестовой БД.
+    :return: Фабрика контекстных менеджеров.
+    """
+
+    @contextmanager
+    def budget(max_statements: int) -> Generator[List[str], None, None]:
+        sql_statements.clear()
+        yield sql_statements
+        assert (
+            len(sql_statements) <= max_statements
+        ), f"Выполнено {len(sql_statements)} SQL-запросов при бюджете {max_statements}:\n" + "\n".join(sql_statements)
+
+    return budget
+
+
 @pytest.fixture(scope="session")
 def config() -> Generator[Any, None, None]:
     """
@@ -1,8 +1,12 @@
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.appointments.dao import PatientDAO
-from app.appointments.models import Patient
+from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
+from app.appointments.models import Appointment, Doctor, Patient
+from app.exceptions.exceptions_classes import AppointmentConflictError, DoctorNotFoundError, PatientNotFoundError
 
 
 @pytest.mark.asyncio(loop_scope="session")
@@ -52,3 +56,111 @@ async def test_patient_find_all_and_update_and_delete(async_client, test_db: Asy
     # Проверяем, что пациент действительно удалён
     deleted_patient: Patient | None = await PatientDAO.find_one_or_none_by_id(test_db, patient.id)
     assert deleted_patient is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_appointment_book_single_statement(async_client, test_db: AsyncSession) -> None:
+    """Тест записи на приём одним запросом: успех, 404 по врачу/пациенту и конфликт."""
+    doctor: Doctor = await DoctorDAO.add(test_db, name="Dr. Book", specialization="Терапевт", experience_years=3)
+    patient: Patient = await PatientDAO.add(test_db, name="Book Patient", email="book@example.com")
+    # Середина месяца: повторная запись через день попадает в ту же секцию, где действует unique_doctor_patient
+    start_time = (datetime.now() + timedelta(days=60)).replace(day=14, hour=10, minute=0, second=0, microsecond=0)
+
+    appointment: Appointment = await AppointmentDAO.book(test_db, doctor.id, patient.id, start_time)
+    assert appointment.id is not None
+    found = await AppointmentDAO.find_one_or_none_by_id(test_db, appointment.id)
+    assert found is not None
+    assert found.start_time == start_time
+
+    with pytest.raises(DoctorNotFoundError):
+        await AppointmentDAO.book(test_db, 999999, patient.id, start_time)
+    with pytest.raises(PatientNotFoundError):
+        await AppointmentDAO.book(test_db, doctor.id, 999999, start_time)
+    # Повторная запись той же пары доктор + пациент
+    with pytest.raises(AppointmentConflictError):
+        await AppointmentDAO.book(test_db, doctor.id, patient.id, start_time + timedelta(days=1))
+
+    # Другой пациент в пределах часа от существующей записи
+    other: Patient = await PatientDAO.add(test_db, name="Book Patient 2", email="book2@example.com")
+    with pytest.raises(AppointmentConflictError):
+        await AppointmentDAO.book(test_db, doctor.id, other.id, start_time + timedelta(minutes=30))
+
+
+class DeadlockDetectedError(Exception):
+    """Ошибка драйвера с SQLSTATE взаимной блокировки, как её передаёт asyncpg."""
+
+    sqlstate = "40P01"
+
+
+def _deadlock() -> DBAPIError:
+    return DBAPIError("COMMIT", None, DeadlockDetectedError("deadlock detected"))
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_appointment_deadlock_is_conflict(async_client, test_db: AsyncSession, monkeypatch) -> None:
+    """Взаимная блокировка при commit отдаётся как конфликт записи, а одиночная в пачке — повторяется."""
+    doctor: Doctor = await DoctorDAO.add(test_db, name="Dr. Deadlock", specialization="Терапевт", experience_years=3)
+    patient: Patient = await PatientDAO.add(test_db, name="Deadlock Patient", email="deadlock@example.com")
+    start_time = (datetime.now() + timedelta(days=60)).replace(day=14, hour=12, minute=0, second=0, microsecond=0)
+    commit = test_db.commit
+
+    async def deadlocked_commit() -> None:
+        raise _deadlock()
+
+    monkeypatch.setattr(test_db, "commit", deadlocked_commit)
+    with pytest.raises(AppointmentConflictError):
+        await AppointmentDAO.add(test_db, doctor_id=doctor.id, patient_id=patient.id, start_time=start_time)
+    with pytest.raises(AppointmentConflictError):
+        await AppointmentDAO.book(test_db, doctor.id, patient.id, start_time)
+    monkeypatch.setattr(test_db, "commit", commit)
+    assert await AppointmentDAO.find_one_or_none(test_db, doctor_id=doctor.id) is None
+
+    failures = [_deadlock()]
+
+    async def deadlocked_once() -> None:
+        if failures:
+            raise failures.pop()
+        await commit()
+
+    monkeypatch.setattr(test_db, "commit", deadlocked_once)
+    item = {"doctor_id": doctor.id, "patient_id": patient.id, "start_time": start_time.isoformat()}
+    [(status, appointment)] = await AppointmentDAO.book_batch(test_db, [item])
+    assert status == "created"
+    assert appointment is not None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_add_many(async_client, test_db: AsyncSession) -> None:
+    """Тест пакетной вставки: пачками, с id всех вставленных строк и пропуском дубликатов email."""
+    values = [{"name": f"Bulk {i}", "email": f"bulk{i}@example.com", "phone": None} for i in range(25)]
+
+    ids = await PatientDAO.add_many(test_db, (v for v in values), chunk_size=10)
+    assert len(ids) == 25
+    found, missing = await PatientDAO.find_many_by_ids(test_db, ids)
+    assert not missing
+    assert {patient.email for patient in found} == {v["email"] for v in values}
+
+    # Повторная вставка тех же email пропускается
+    again = await PatientDAO.add_many(test_db, values[:5] + [{"name": "Bulk new", "email": "bulk-new@example.com"}])
+    assert len(again) == 1
+
+    doctor_ids = await DoctorDAO.add_many(
+        test_db, [{"name": f"Dr. Bulk {i}", "specialization": "Терапевт", "experience_years": i} for i in range(3)]
+    )
+    assert len(doctor_ids) == 3
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_find_many_by_ids(async_client, test_db: AsyncSession) -> None:
+    """Тест выборки по списку id: порядок запроса, повторы один раз, ненайденные id отдельно."""
+    ids = await DoctorDAO.add_many(
+        test_db, [{"name": f"Dr. Many {i}", "specialization": "Терапевт", "experience_years": i} for i in range(3)]
+    )
+    missing_id = max(ids) + 100_000
+
+    found, missing = await DoctorDAO.find_many_by_ids(test_db, [ids[2], missing_id, ids[0], ids[2]])
+    assert [doctor.id for doctor in found] == [ids[2], ids[0]]
+    assert found[0].name == "Dr. Many 2"
+    assert missing == [missing_id]
+
+    assert await DoctorDAO.find_many_by_ids(test_db, []) == ([], [])
@@ -0,0 +1,67 @@
+import random
+from collections import Counter
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.appointments.partitions import detach_partition
+from app.data_generate import WORKDAY_SLOTS, bulk_appointment_rows, copy_bulk
+from app.database import test_engine
+
+
+def test_bulk_appointments_respect_booking_rules() -> None:
+    """Приёмы врача не пересекаются, пары врач-пациент не повторяются, время — в рабочих часах."""
+    start, days, per_doctor = date(2030, 1, 1), 3, 3 * WORKDAY_SLOTS
+    rows = list(bulk_appointment_rows(range(1, 21), range(1, 101), per_doctor, start, days, random.Random(7)))
+
+    assert Counter(doctor_id for doctor_id, _, _ in rows) == {doctor_id: per_doctor for doctor_id in range(1, 21)}
+    assert len({(doctor_id, patient_id) for doctor_id, patient_id, _ in rows}) == len(rows)
+    by_doctor: dict = {}
+    for doctor_id, _, start_time in rows:
+        by_doctor.setdefault(doctor_id, []).append(start_time)
+        assert time(8) <= start_time.time() <= time(17, 45)
+        assert start <= start_time.date() < start + timedelta(days=days)
+    for times in by_doctor.values():
+        assert all(later - earlier >= timedelta(hours=1) for earlier, later in zip(times, times[1:]))
+
+
+def test_bulk_appointments_are_reproducible() -> None:
+    """Одинаковое зерно даёт одинаковые данные."""
+
+    def generate(seed: int) -> list:
+        return list(bulk_appointment_rows(range(1, 6), range(1, 51), 10, date(2030, 1, 1), 7, random.Random(seed)))
+
+    assert generate(1) == generate(1)
+    assert generate(1) != generate(2)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_copy_bulk_loads_rows() -> None:
+    """COPY загружает врачей, пациентов и записи и сдвигает последовательности ID."""
+    start = date(2310, 5, 1)
+    async with test_engine.connect() as connection:
+        first_doctor = (await connection.execute(text("SELECT coalesce(max(id), 0) + 1 FROM doctors"))).scalar_one()
+        first_patient = (await connection.execute(text("SELECT coalesce(max(id), 0) + 1 FROM patients"))).scalar_one()
+
+    try:
+        counts = await copy_bulk(test_engine, 3, 50, 20, start, 5, seed=1)
+        assert counts == (3, 50, 60)
+        async with test_engine.connect() as connection:
+            loaded = (
+                await connection.execute(
+                    text("SELECT count(*) FROM appointments WHERE doctor_id >= :first AND start_time >= :start"),
+                    {"first": first_doctor, "start": start},
+                )
+            ).scalar_one()
+            next_doctor = (
+                await connection.execute(text("SELECT nextval(pg_get_serial_sequence('doctors', 'id'))"))
+            ).scalar_one()
+        assert loaded == 60
+        assert next_doctor > first_doctor + 2
+    finally:
+        async with test_engine.begin() as connection:
+            await connection.execute(text("DELETE FROM appointments WHERE start_time >= :start"), {"start": start})
+            await connection.execute(text("DELETE FROM doctors WHERE id >= :first"), {"first": first_doctor})
+            await connection.execute(text("DELETE FROM patients WHERE id >= :first"), {"first": first_patient})
+            await detach_partition(connection, "appointments_2310_05", drop=True)
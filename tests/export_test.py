@@ -0,0 +1,105 @@
+import os
+from datetime import datetime, timedelta
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.export import stream_export
+from app.appointments.models import Appointment
+from app.database import async_test_session
+
+EXPORT_SIDE = 1000  # 1000 врачей * 1000 пациентов = 1 000 000 записей
+RSS_CEILING_BYTES = 100 * 1024 * 1024
+WINDOW_START = datetime(2100, 1, 1, 8, 0)
+WINDOW_END = WINDOW_START + timedelta(days=60)
+
+
+def _rss_bytes() -> int:
+    """Текущий RSS процесса."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def million_appointments(test_db: AsyncSession) -> AsyncGenerator[int, None]:
+    """
+    Создаёт миллион записей на приём в далёком будущем средствами самой БД.
+
+    :yield: Количество созданных записей.
+    """
+    async with async_test_session() as session:
+        result = await session.execute(
+            text(
+                "INSERT INTO doctors (name, specialization, experience_years) "
+                "SELECT 'Export ' || g, 'Терапевт', 1 FROM generate_series(1, :n) g RETURNING id"
+            ),
+            {"n": EXPORT_SIDE},
+        )
+        doctor_ids = list(result.scalars().all())
+        result = await session.execute(
+            text(
+                "INSERT INTO patients (name, email) "
+                "SELECT 'Export ' || g, 'export' || g || '@example.com' FROM generate_series(1, :n) g RETURNING id"
+            ),
+            {"n": EXPORT_SIDE},
+        )
+        patient_ids = list(result.scalars().all())
+        # Каждый врач принимает каждого пациента, приёмы одного врача идут подряд с шагом в час
+        await session.execute(
+            text(
+                "INSERT INTO appointments (doctor_id, patient_id, start_time) "
+                "SELECT d.id, p.id, CAST(:start AS timestamp) + (p.n - 1) * interval '1 hour' "
+                "FROM unnest(CAST(:doctor_ids AS integer[])) AS d(id) "
+                "CROSS JOIN unnest(CAST(:patient_ids AS integer[])) WITH ORDINALITY AS p(id, n)"
+            ),
+            {"start": WINDOW_START, "doctor_ids": doctor_ids, "patient_ids": patient_ids},
+        )
+        await session.commit()
+
+        yield len(doctor_ids) * len(patient_ids)
+
+        await session.execute(text("DELETE FROM doctors WHERE id = ANY(:ids)"), {"ids": doctor_ids})
+        await session.execute(text("DELETE FROM patients WHERE id = ANY(:ids)"), {"ids": patient_ids})
+        await session.commit()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio(loop_scope="session")
+async def test_export_million_rows_flat_memory(million_appointments: int) -> None:
+    """Выгрузка миллиона строк не увеличивает RSS больше чем на RSS_CEILING_BYTES."""
+    baseline = peak = _rss_bytes()
+    lines = 0
+    async for chunk in stream_export(async_test_session, "ndjson", WINDOW_START, WINDOW_END):
+        lines += chunk.count(b"\n")
+        peak = max(peak, _rss_bytes())
+
+    assert lines == million_appointments
+    assert peak - baseline < RSS_CEILING_BYTES
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_export_csv_endpoint(
+    test_appointment: Appointment,
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+) -> None:
+    """Проверка CSV-выгрузки через HTTP."""
+    response = await async_client.get(
+        "/api/appointments/export",
+        params={
+            "format": "csv",
+            "from": test_appointment.start_time.isoformat(),
+            "to": (test_appointment.start_time + timedelta(minutes=1)).isoformat(),
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+
+    lines = response.text.splitlines()
+    assert lines[0] == "id,patient_id,doctor_id,start_time"
+    assert f"{test_appointment.id},{test_appointment.patient_id},{test_appointment.doctor_id}," in response.text
@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Callable, ContextManager, List
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.dao import DoctorDAO, IdempotencyKeyDAO, PatientDAO
+from app.appointments.idempotency import REPLAYED_HEADER, request_fingerprint
+from app.appointments.models import Appointment, IdempotencyKey
+
+
+def test_request_fingerprint_ignores_key_order() -> None:
+    """Хэш тела не зависит от порядка ключей и меняется вместе со значениями."""
+    assert request_fingerprint({"a": 1, "b": 2}) == request_fingerprint({"b": 2, "a": 1})
+    assert request_fingerprint({"a": 1}) != request_fingerprint({"a": 2})
+
+
+async def _booking_payload(session: AsyncSession, suffix: str, days: int) -> dict:
+    """Врач, пациент и тело POST /api/appointments для нового приёма."""
+    doctor = await DoctorDAO.add(session, name=f"Dr. Idem {suffix}", specialization="Терапевт", experience_years=3)
+    patient = await PatientDAO.add(session, name=f"Idem {suffix}", email=f"idem-{suffix}@example.com")
+    start_time = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=days)
+    return {"doctor_id": doctor.id, "patient_id": patient.id, "start_time": start_time.isoformat()}
+
+
+async def _count_appointments(session: AsyncSession, doctor_id: int) -> int:
+    query = select(func.count()).select_from(Appointment).where(Appointment.doctor_id == doctor_id)
+    return (await session.execute(query)).scalar_one()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_retry_returns_stored_response(
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+    query_budget: Callable[[int], ContextManager[List[str]]],
+) -> None:
+    """Повтор с тем же ключом получает тот же ответ, не создавая вторую запись и не бронируя."""
+    payload = await _booking_payload(test_db, "retry", days=60)
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = await async_client.post("/api/appointments", json=payload, headers=headers)
+    assert first.status_code == status.HTTP_201_CREATED
+    assert REPLAYED_HEADER not in first.headers
+
+    # Повтор: только INSERT ... ON CONFLICT и чтение сохранённого ответа
+    with query_budget(2):
+        second = await async_client.post("/api/appointments", json=payload, headers=headers)
+    assert second.status_code == status.HTTP_201_CREATED
+    assert second.headers[REPLAYED_HEADER] == "true"
+    assert second.json() == first.json()
+    assert await _count_appointments(test_db, payload["doctor_id"]) == 1
+
+    response = await async_client.post(
+        "/api/appointments", json={**payload, "start_time": payload["start_time"][:11] + "11:00:00"}, headers=headers
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_error_response_is_replayed(async_client: AsyncClient, test_db: AsyncSession) -> None:
+    """Ответ 404 сохраняется так же, как успешный: повтор не выполняет проверки заново."""
+    payload = await _booking_payload(test_db, "missing", days=61)
+    payload["doctor_id"] = 999999
+    headers = {"Idempotency-Key": "missing-1"}
+
+    first = await async_client.post("/api/appointments", json=payload, headers=headers)
+    second = await async_client.post("/api/appointments", json=payload, headers=headers)
+    assert first.status_code == second.status_code == status.HTTP_404_NOT_FOUND
+    assert second.json() == first.json()
+    assert second.headers[REPLAYED_HEADER] == "true"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_retries_book_once(async_client: AsyncClient, test_db: AsyncSession) -> None:
+    """Одновременные запросы с одним ключом бронируют один раз, остальные ждут или получают сохранённый ответ."""
+    payload = await _booking_payload(test_db, "storm", days=62)
+    headers = {"Idempotency-Key": "storm-1"}
+
+    responses = await asyncio.gather(
+        *(async_client.post("/api/appointments", json=payload, headers=headers) for _ in range(5))
+    )
+    originals = [r for r in responses if r.status_code == status.HTTP_201_CREATED and REPLAYED_HEADER not in r.headers]
+    assert len(originals) == 1
+    for response in responses:
+        if response.status_code == status.HTTP_409_CONFLICT:
+            assert response.headers["Retry-After"] == "1"
+        else:
+            assert response.status_code == status.HTTP_201_CREATED
+    assert await _count_appointments(test_db, payload["doctor_id"]) == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_expired_and_abandoned_keys_are_reclaimed(async_client: AsyncClient, test_db: AsyncSession) -> None:
+    """Истёкший ключ и ключ без ответа дольше IDEMPOTENCY_LOCK_SECONDS занимаются заново."""
+    payload = await _booking_payload(test_db, "expired", days=63)
+    await test_db.execute(
+        text(
+            "INSERT INTO idempotency_keys (key, request_hash, status_code, response, expires_at) VALUES "
+            "('expired-1', 'x', 201, '{}', LOCALTIMESTAMP - interval '1 minute'), "
+            "('abandoned-1', :hash, NULL, NULL, LOCALTIMESTAMP + interval '1 day')"
+        ),
+        {"hash": request_fingerprint(payload)},
+    )
+    await test_db.execute(
+        text("UPDATE idempotency_keys SET created_at = LOCALTIMESTAMP - interval '1 hour' WHERE key = 'abandoned-1'")
+    )
+    await test_db.commit()
+
+    response = await async_client.post("/api/appointments", json=payload, headers={"Idempotency-Key": "expired-1"})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert REPLAYED_HEADER not in response.headers
+
+    response = await async_client.post("/api/appointments", json=payload, headers={"Idempotency-Key": "abandoned-1"})
+    assert response.status_code == status.HTTP_409_CONFLICT  # время уже занято первым запросом
+    assert REPLAYED_HEADER not in response.headers
+
+    await test_db.execute(
+        text("UPDATE idempotency_keys SET expires_at = LOCALTIMESTAMP - interval '1 second' WHERE key = 'expired-1'")
+    )
+    await test_db.commit()
+    assert await IdempotencyKeyDAO.purge_expired(test_db) >= 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_booking_and_stored_response_commit_together(
+    async_client: AsyncClient, test_db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Если ответ не сохранился, запись тоже не создаётся, а ключ освобождается для повтора."""
+    payload = await _booking_payload(test_db, "atomic", days=64)
+    headers = {"Idempotency-Key": "atomic-1"}
+    monkeypatch.setattr(IdempotencyKeyDAO, "save_response_statement", lambda *args: text("SELECT 1 / 0"))
+
+    with pytest.raises(DBAPIError):
+        await async_client.post("/api/appointments", json=payload, headers=headers)
+    assert await _count_appointments(test_db, payload["doctor_id"]) == 0
+    assert await test_db.get(IdempotencyKey, "atomic-1") is None
+
+    monkeypatch.undo()
+    response = await async_client.post("/api/appointments", json=payload, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert REPLAYED_HEADER not in response.headers
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from typing import Callable, ContextManager, List
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.appointments.models import Appointment
+from app.database import QueryStats, async_test_session, current_query_stats
+
+
+def test_query_stats_keeps_slowest() -> None:
+    """Статистика считает запросы, суммирует время и запоминает самый долгий."""
+    stats = QueryStats()
+    stats.record("SELECT 1", 0.002)
+    stats.record("SELECT 2", 0.010)
+    stats.record("SELECT 3", 0.001)
+    assert stats.count == 3
+    assert stats.slowest_statement == "SELECT 2"
+    assert stats.server_timing() == 'db;dur=13.00;desc="3 queries", db-slowest;dur=10.00'
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_engine_hooks_record_into_current_stats() -> None:
+    """Хуки движка пишут в статистику, установленную в контексте."""
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        async with async_test_session() as session:
+            await session.execute(text("SELECT pg_sleep(0.01)"))
+    finally:
+        current_query_stats.reset(token)
+    assert stats.count == 1
+    assert stats.slowest_seconds >= 0.01
+    assert stats.slowest_statement == "SELECT pg_sleep(0.01)"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_server_timing_header(async_client: AsyncClient, test_appointment: Appointment) -> None:
+    """Ответ содержит Server-Timing с числом SQL-запросов запроса."""
+    response = await async_client.get(f"/api/appointments?ids={test_appointment.id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_endpoint_query_budgets(
+    async_client: AsyncClient,
+    test_appointment: Appointment,
+    query_budget: Callable[[int], ContextManager[List[str]]],
+) -> None:
+    """Бюджет SQL-запросов горячих эндпойнтов."""
+    day = (datetime.now() + timedelta(days=1)).replace(microsecond=0).isoformat()
+    budgets = {
+        f"/api/appointments/{test_appointment.id}": 1,
+        "/api/appointments?limit=50": 1,
+        f"/api/appointments?ids={test_appointment.id}": 1,
+        f"/api/doctors/{test_appointment.doctor_id}/calendar": 1,
+        f"/api/doctors/{test_appointment.doctor_id}/free-slots?from={day}": 1,
+        f"/api/patients/{test_appointment.patient_id}/appointments": 1,
+        "/api/doctors?limit=10": 1,
+    }
+    for url, budget in budgets.items():
+        with query_budget(budget):
+            response = await async_client.get(url)
+        assert response.status_code == status.HTTP_200_OK, url
@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+
+from app import metrics
+from app.appointments.models import Appointment
+
+INCREMENT = "from app.metrics import HTTP_REQUESTS; HTTP_REQUESTS.labels('GET', '/probe', '200').inc()"
+RENDER = "import sys; from app.metrics import render_metrics; sys.stdout.write(render_metrics()[0].decode())"
+
+
+def sample(name: str, **labels: str) -> float:
+    """Значение метрики в реестре процесса (0, если ряда ещё нет)."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_metrics_endpoint(async_client: AsyncClient, test_appointment: Appointment) -> None:
+    """Запросы считаются по шаблону маршрута и статусу, 409 при записи попадает в счётчик конфликтов."""
+    route = "/api/appointments/{appointment_id}"
+    before = sample("http_requests_total", method="GET", route=route, status="200")
+    conflicts = sample("appointment_bookings_total", result="conflict")
+
+    await async_client.get(f"/api/appointments/{test_appointment.id}")
+    payload = {
+        "doctor_id": test_appointment.doctor_id,
+        "patient_id": test_appointment.patient_id,
+        "start_time": test_appointment.start_time.isoformat(),
+    }
+    response = await async_client.post("/api/appointments", json=payload)
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert f'http_requests_total{{method="GET",route="{route}",status="200"}}' in response.text
+    assert "http_request_duration_seconds_bucket" in response.text
+    assert "db_pool_in_use" in response.text
+    assert sample("http_requests_total", method="GET", route=route, status="200") == before + 1
+    assert sample("appointment_bookings_total", result="conflict") == conflicts + 1
+
+
+def test_multiprocess_aggregation(tmp_path: Path) -> None:
+    """В multiprocess-режиме /metrics суммирует счётчики всех процессов."""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "LOGGER_LEVEL_STDOUT": "ERROR"}
+    for _ in range(3):
+        subprocess.run([sys.executable, "-c", INCREMENT], env=env, check=True)
+    output = subprocess.run([sys.executable, "-c", RENDER], env=env, check=True, capture_output=True, text=True).stdout
+    assert 'http_requests_total{method="GET",route="/probe",status="200"} 3.0' in output
+
+
+def test_pool_counters_follow_deltas(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Счётчики пула растут на прирост с прошлого обновления, а после пересоздания пула — на его значения."""
+    stats = {"size": 5, "in_use": 1, "idle": 4, "overflow": 0, "wait_seconds_max": 0.2}
+    snapshots = iter(
+        [
+            {**stats, "checkouts": 10, "timeouts": 1, "wait_seconds_total": 0.5},
+            {**stats, "checkouts": 15, "timeouts": 1, "wait_seconds_total": 0.75},
+            {**stats, "checkouts": 2, "timeouts": 0, "wait_seconds_total": 0.25},
+        ]
+    )
+    monkeypatch.setattr(metrics, "pool_stats", lambda async_engine: next(snapshots))
+    monkeypatch.setattr(metrics, "_pool_totals", {})
+    before = {name: sample(name) for name in ("db_pool_checkouts_total", "db_pool_wait_seconds_total")}
+
+    for _ in range(3):
+        metrics.update_pool_metrics(None)  # type: ignore[arg-type]
+    assert sample("db_pool_checkouts_total") - before["db_pool_checkouts_total"] == 17
+    assert sample("db_pool_wait_seconds_total") - before["db_pool_wait_seconds_total"] == pytest.approx(1.0)
+    assert sample("db_pool_in_use") == 1
@@ -0,0 +1,144 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.booking_locks import crosses_month_edge
+from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
+from app.appointments.partitions import add_months, create_partitions, detach_partition, partition_name
+from app.config import settings
+from app.database import test_engine
+from app.exceptions.exceptions_classes import AppointmentConflictError
+
+MONTH = date(2300, 3, 1)
+
+
+def test_month_arithmetic() -> None:
+    """Переход через границу года и имена секций."""
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partition_name(date(2025, 7, 1)) == "appointments_2025_07"
+
+
+def test_crosses_month_edge() -> None:
+    """У границы месяца оказываются приёмы, чей интервал ±1 час заходит в соседний месяц."""
+    assert crosses_month_edge(datetime(2025, 1, 31, 23, 30))
+    assert crosses_month_edge(datetime(2025, 2, 1, 0, 59))
+    assert not crosses_month_edge(datetime(2025, 1, 31, 23, 0))  # приём в 0:00 с ним уже не пересекается
+    assert not crosses_month_edge(datetime(2025, 2, 1, 1, 0))
+    assert not crosses_month_edge(datetime(2025, 2, 14, 10, 0))
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_partition_lifecycle(test_db: AsyncSession) -> None:
+    """Секция забирает записи своего месяца из секции по умолчанию, держит ограничения и уходит в архив."""
+    doctor = await DoctorDAO.add(test_db, name="Dr. Partition", specialization="Терапевт", experience_years=1)
+    patients = [
+        await PatientDAO.add(test_db, name=f"Partition {i}", email=f"partition{i}@example.com") for i in range(2)
+    ]
+    start_time = datetime(2300, 3, 10, 10, 0)
+    appointment = await AppointmentDAO.add(
+        test_db, doctor_id=doctor.id, patient_id=patients[0].id, start_time=start_time
+    )
+
+    async def where_is(appointment_id: int) -> str:
+        result = await test_db.execute(
+            text("SELECT tableoid::regclass::text FROM appointments WHERE id = :id"), {"id": appointment_id}
+        )
+        await test_db.commit()
+        return result.scalar_one()
+
+    assert await where_is(appointment.id) == "appointments_default"
+
+    async with test_engine.begin() as connection:
+        assert await create_partitions(connection, MONTH, add_months(MONTH, 1)) == [partition_name(MONTH)]
+    assert await where_is(appointment.id) == partition_name(MONTH)
+
+    # Ограничение no_doctor_overlap действует в новой секции
+    with pytest.raises(AppointmentConflictError):
+        await AppointmentDAO.add(
+            test_db, doctor_id=doctor.id, patient_id=patients[1].id, start_time=start_time.replace(minute=30)
+        )
+
+    async with test_engine.begin() as connection:
+        await detach_partition(connection, partition_name(MONTH))
+    assert await AppointmentDAO.find_one_or_none_by_id(test_db, appointment.id) is None
+    archived = await test_db.execute(text(f"SELECT count(*) FROM archive.{partition_name(MONTH)}"))
+    assert archived.scalar_one() == 1
+
+    await test_db.execute(text(f"DROP TABLE archive.{partition_name(MONTH)}"))
+    await test_db.commit()
+    await DoctorDAO.delete(test_db, id=doctor.id)
+    for patient in patients:
+        await PatientDAO.delete(test_db, id=patient.id)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_overlap_across_month_edge(test_db: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Приём у границы месяца конфликтует с приёмом врача в соседней секции во всех способах записи."""
+    monkeypatch.setattr(settings, "BOOKING_SERIALIZATION", "none")
+    edge_month = date(2301, 1, 1)
+    async with test_engine.begin() as connection:
+        await create_partitions(connection, edge_month, add_months(edge_month, 1))
+
+    doctor = await DoctorDAO.add(test_db, name="Dr. Edge", specialization="Терапевт", experience_years=1)
+    patients = [await PatientDAO.add(test_db, name=f"Edge {i}", email=f"edge{i}@example.com") for i in range(4)]
+    january = datetime(2301, 1, 31, 23, 30)  # секция appointments_2301_01
+    february = datetime(2301, 2, 1, 0, 0)  # секция по умолчанию
+    await AppointmentDAO.add(test_db, doctor_id=doctor.id, patient_id=patients[0].id, start_time=january)
+
+    with pytest.raises(AppointmentConflictError):
+        await AppointmentDAO.add(test_db, doctor_id=doctor.id, patient_id=patients[1].id, start_time=february)
+    with pytest.raises(AppointmentConflictError):
+        await AppointmentDAO.book(test_db, doctor.id, patients[1].id, february)
+    results = await AppointmentDAO.book_batch(
+        test_db,
+        [
+            {"doctor_id": doctor.id, "patient_id": patients[1].id, "start_time": february},
+            {"doctor_id": doctor.id, "patient_id": patients[2].id, "start_time": datetime(2301, 2, 1, 1, 0)},
+            {"doctor_id": doctor.id, "patient_id": patients[3].id, "start_time": datetime(2301, 2, 1, 1, 30)},
+        ],
+    )
+    assert [status for status, _ in results] == ["conflict", "created", "conflict"]
+
+    async with test_engine.begin() as connection:
+        await detach_partition(connection, partition_name(edge_month), drop=True)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_same_pair_once_per_month(test_db: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Пациент записывается к врачу не больше раза в месяц, а в другом месяце — снова, во всех способах записи."""
+    monkeypatch.setattr(settings, "BOOKING_SERIALIZATION", "none")
+    first_month = date(2302, 3, 1)
+    async with test_engine.begin() as connection:
+        await create_partitions(connection, first_month, add_months(first_month, 4))
+
+    doctor = await DoctorDAO.add(test_db, name="Dr. Monthly", specialization="Терапевт", experience_years=1)
+    patient = await PatientDAO.add(test_db, name="Monthly", email="monthly@example.com")
+    await AppointmentDAO.add(test_db, doctor_id=doctor.id, patient_id=patient.id, start_time=datetime(2302, 3, 10, 10))
+
+    # Тот же месяц — конфликт
+    with pytest.raises(AppointmentConflictError):
+        await AppointmentDAO.add(
+            test_db, doctor_id=doctor.id, patient_id=patient.id, start_time=datetime(2302, 3, 20, 10)
+        )
+    with pytest.raises(AppointmentConflictError):
+        await AppointmentDAO.book(test_db, doctor.id, patient.id, datetime(2302, 3, 20, 10))
+
+    # Другие месяцы — новая запись
+    await AppointmentDAO.add(test_db, doctor_id=doctor.id, patient_id=patient.id, start_time=datetime(2302, 4, 10, 10))
+    await AppointmentDAO.book(test_db, doctor.id, patient.id, datetime(2302, 5, 10, 10))
+    results = await AppointmentDAO.book_batch(
+        test_db,
+        [
+            {"doctor_id": doctor.id, "patient_id": patient.id, "start_time": datetime(2302, 5, 20, 10)},
+            {"doctor_id": doctor.id, "patient_id": patient.id, "start_time": datetime(2302, 6, 10, 10)},
+            {"doctor_id": doctor.id, "patient_id": patient.id, "start_time": datetime(2302, 6, 20, 10)},
+        ],
+    )
+    assert [status for status, _ in results] == ["conflict", "created", "conflict"]
+
+    async with test_engine.begin() as connection:
+        for offset in range(4):
+            await detach_partition(connection, partition_name(add_months(first_month, offset)), drop=True)
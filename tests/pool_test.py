@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import TimedQueuePool, async_test_session, engine_options, pool_stats, test_engine
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_engine_options_pgbouncer() -> None:
+    """В режиме PgBouncer кэши подготовленных выражений выключены, а имена выражений не повторяются."""
+    options = engine_options(settings.model_copy(update={"DB_PGBOUNCER": True, "DB_POOL_SIZE": 3}))
+    connect_args = options["connect_args"]
+
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == 3
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_pool_stats_count_checkouts() -> None:
+    """Выдача соединения учитывается в счётчиках пула."""
+    before = pool_stats(test_engine)
+    async with async_test_session() as session:
+        await session.execute(text("SELECT 1"))
+        assert pool_stats(test_engine)["in_use"] == before["in_use"] + 1
+
+    after = pool_stats(test_engine)
+    assert after["checkouts"] == before["checkouts"] + 1
+    assert after["in_use"] == before["in_use"]
+    assert after["wait_seconds_total"] >= before["wait_seconds_total"]
@@ -0,0 +1,153 @@
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Tuple
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
+from app.database import async_test_session, test_engine
+
+PLAN_DOCTORS = 5000
+PLAN_PATIENTS = 2000
+PER_DOCTOR = 40  # 5000 * 40 = 200 000 записей
+PLAN_SPECIALIZATIONS = 100
+PLAN_START = datetime(2200, 1, 1, 8, 0)
+TABLES = ("appointments", "doctors", "patients")  # appointments_* — секции appointments
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+@contextmanager
+def captured_selects() -> Iterator[List[Tuple[str, Any]]]:
+    """Собирает SELECT-запросы к таблицам приложения (текст и параметры), которые DAO отправляет в тестовую БД."""
+    statements: List[Tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # type: ignore
+        # Служебные запросы драйвера при открытии соединения к таблицам приложения не обращаются
+        if statement.lstrip().upper().startswith("SELECT") and any(table in statement for table in TABLES):
+            statements.append((statement, parameters))
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def scan_nodes(plan: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """Обходит дерево плана и возвращает пары (тип узла, таблица) для узлов чтения таблиц."""
+    if "Relation Name" in plan or plan["Node Type"] == "Bitmap Index Scan":
+        yield plan["Node Type"], plan.get("Relation Name", "")
+    for child in plan.get("Plans", []):
+        yield from scan_nodes(child)
+
+
+async def explain(session: AsyncSession, statement: str, parameters: Any) -> List[Tuple[str, str]]:
+    """EXPLAIN (FORMAT JSON) для запроса в том виде, в каком его отправил драйвер."""
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    raw = result.scalar_one()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    return list(scan_nodes(plan))
+
+
+async def non_empty(session: AsyncSession, relations: List[str]) -> List[str]:
+    """
+    Оставляет таблицы, в которых по статистике есть строки.
+
+    Пустые помесячные секции планировщик честно читает через Seq Scan — это бесплатно и регрессией не считается.
+    """
+    if not relations:
+        return []
+    result = await session.execute(
+        text("SELECT relname FROM pg_class WHERE relname = ANY(:names) AND reltuples > 0"), {"names": relations}
+    )
+    return list(result.scalars().all())
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def plan_dataset(test_db: AsyncSession) -> AsyncGenerator[Dict[str, int], None]:
+    """
+    Заполняет БД объёмом, при котором планировщик выбирает индексы осознанно, и обновляет статистику.
+
+    :yield: ID врача и пациента из набора.
+    """
+    async with async_test_session() as session:
+        result = await session.execute(
+            text(
+                "INSERT INTO doctors (name, specialization, experience_years) "
+                "SELECT 'Plan ' || g, 'Plan spec ' || (g % :specs), 1 FROM generate_series(1, :n) g RETURNING id"
+            ),
+            {"n": PLAN_DOCTORS, "specs": PLAN_SPECIALIZATIONS},
+        )
+        doctor_ids = list(result.scalars().all())
+        result = await session.execute(
+            text(
+                "INSERT INTO patients (name, email) "
+                "SELECT 'Plan ' || g, 'plan' || g || '@example.com' FROM generate_series(1, :n) g RETURNING id"
+            ),
+            {"n": PLAN_PATIENTS},
+        )
+        patient_ids = list(result.scalars().all())
+        # Врач d принимает PER_DOCTOR разных пациентов: по 10 приёмов в день с шагом в час
+        await session.execute(
+            text(
+                "INSERT INTO appointments (doctor_id, patient_id, start_time) "
+                "SELECT d.id, (CAST(:patient_ids AS integer[]))[((d.n * :per + k) % :patients) + 1], "
+                "CAST(:start AS timestamp) + (k / 10) * interval '1 day' + (k % 10) * interval '1 hour' "
+                "FROM unnest(CAST(:doctor_ids AS integer[])) WITH ORDINALITY AS d(id, n) "
+                "CROSS JOIN generate_series(0, :per - 1) AS k"
+            ),
+            {
+                "start": PLAN_START,
+                "doctor_ids": doctor_ids,
+                "patient_ids": patient_ids,
+                "per": PER_DOCTOR,
+                "patients": PLAN_PATIENTS,
+            },
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE doctors, patients, appointments"))
+        await session.commit()
+
+        yield {"doctor_id": doctor_ids[len(doctor_ids) // 2], "patient_id": patient_ids[len(patient_ids) // 2]}
+
+        await session.execute(text("DELETE FROM doctors WHERE id = ANY(:ids)"), {"ids": doctor_ids})
+        await session.execute(text("DELETE FROM patients WHERE id = ANY(:ids)"), {"ids": patient_ids})
+        await session.commit()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio(loop_scope="session")
+async def test_dao_queries_use_indexes(plan_dataset: Dict[str, int]) -> None:
+    """Каждый SELECT горячих методов DAO читает таблицы через индекс, а не Seq Scan."""
+    doctor_id, patient_id = plan_dataset["doctor_id"], plan_dataset["patient_id"]
+    window_from, window_to = PLAN_START + timedelta(days=1), PLAN_START + timedelta(days=2)
+
+    async with async_test_session() as session:
+        with captured_selects() as statements:
+            await AppointmentDAO.find_one_or_none_by_id(session, 1)
+            await AppointmentDAO.find_all(session, doctor_id=doctor_id)
+            await AppointmentDAO.find_page(session, limit=50, doctor_id=doctor_id)
+            await AppointmentDAO.find_page_payload(session, limit=50, patient_id=patient_id)
+            await AppointmentDAO.find_page_payload(session, limit=50, start_from=window_from, start_to=window_to)
+            await DoctorDAO.find_page(session, limit=50, specialization="Plan spec 7")
+            await DoctorDAO.find_busy_times(session, window_from, window_to, id=doctor_id)
+            await DoctorDAO.find_busy_times(session, window_from, window_to, specialization="Plan spec 7")
+            await PatientDAO.find_one_or_none(session, email="plan7@example.com")
+            # Проверка пересечений из AppointmentDAO.book: doctor_id + диапазон start_time или doctor_id + patient_id
+            conflict = AppointmentDAO._conflict_clause(doctor_id, patient_id, window_from)
+            await session.execute(select(AppointmentDAO.model.id).where(conflict))
+
+        assert len(statements) == 10
+        for statement, parameters in statements:
+            nodes = await explain(session, statement, parameters)
+            assert nodes, statement
+            seq_scans = await non_empty(
+                session, [table for node, table in nodes if node == "Seq Scan" and table.startswith(TABLES)]
+            )
+            assert not seq_scans, f"Seq Scan по {seq_scans}: {statement}"
+            assert any(node in INDEX_NODES for node, _ in nodes), statement
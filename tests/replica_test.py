@@ -0,0 +1,61 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import async_test_session, test_engine
+from app.replica import ReplicaRouter
+
+# Роль primary играет отдельная фабрика, а «реплики» — тестовая БД: на сервере без recovery отставание 0
+primary = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reads_go_to_fresh_replica() -> None:
+    """Реплика без отставания обслуживает чтение после первого измерения, до него чтение идёт в primary."""
+    read_router = ReplicaRouter(primary, async_test_session, max_lag=5)
+    assert await read_router.session_maker() is primary
+    assert await read_router.refresh() == 0
+    assert await read_router.session_maker() is async_test_session
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_lagging_or_stale_replica_falls_back_to_primary() -> None:
+    """При отставании больше порога или без свежего измерения чтение уходит в primary."""
+    now = [0.0]
+    read_router = ReplicaRouter(
+        primary, async_test_session, max_lag=5, check_interval=1, probe_timeout=2, clock=lambda: now[0]
+    )
+    await read_router.refresh()
+    assert await read_router.session_maker() is async_test_session
+
+    read_router.lag = 30  # как будто реплика отстала при последней проверке
+    assert await read_router.session_maker() is primary
+
+    read_router.lag = 0
+    now[0] = 10  # monitor() давно не обновлял значение
+    assert await read_router.session_maker() is primary
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_unresponsive_replica_times_out() -> None:
+    """Зависшая реплика не ждётся дольше probe_timeout и считается недоступной."""
+
+    @asynccontextmanager
+    async def hanging_session() -> AsyncIterator[AsyncSession]:
+        await asyncio.sleep(60)
+        yield AsyncSession()
+
+    read_router = ReplicaRouter(primary, hanging_session, probe_timeout=0.05)  # type: ignore[arg-type]
+    assert await asyncio.wait_for(read_router.refresh(), timeout=1) is None
+    assert await read_router.session_maker() is primary
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_without_replica_reads_use_primary() -> None:
+    """Без DB_REPLICA_URL чтение идёт в primary без проверок."""
+    read_router = ReplicaRouter(primary, None)
+    assert await read_router.session_maker() is primary
+    assert read_router.lag is None
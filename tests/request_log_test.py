@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import logger, settings
+from app.request_log import NULL_LOGGER, current_scope, hot_logger, route_sample_rate
+
+ROUTE = "/api/appointments/{appointment_id}"
+
+
+def _request_scope() -> dict:
+    """Scope запроса после маршрутизации (FastAPI кладёт найденный маршрут в scope["route"])."""
+    return {"type": "http", "route": SimpleNamespace(path=ROUTE)}
+
+
+def test_hot_logger_outside_request_is_logger() -> None:
+    """Вне запроса (фоновые задачи, CLI) журнал пишется всегда."""
+    assert hot_logger() is logger
+
+
+def test_route_sample_rate_override(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Доля маршрута берётся из LOG_SAMPLE_RATES, для остальных — LOG_SAMPLE_RATE."""
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATE", 0.5)
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATES", {ROUTE: 0.01})
+    assert route_sample_rate(ROUTE) == 0.01
+    assert route_sample_rate("/api/doctors") == 0.5
+
+
+@pytest.mark.parametrize("rate, expected", [(0.0, NULL_LOGGER), (1.0, logger)])
+def test_hot_logger_by_rate(monkeypatch: pytest.MonkeyPatch, rate: float, expected: object) -> None:
+    """При доле 0 запрос не журналируется, при доле 1 — журналируется."""
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATES", {ROUTE: rate})
+    token = current_scope.set(_request_scope())
+    try:
+        assert hot_logger() is expected
+    finally:
+        current_scope.reset(token)
+
+
+def test_hot_logger_decision_is_per_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Решение принимается один раз на запрос: журнал запроса пишется целиком или не пишется."""
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATES", {ROUTE: 0.0})
+    scope = _request_scope()
+    token = current_scope.set(scope)
+    try:
+        assert hot_logger() is NULL_LOGGER
+        monkeypatch.setattr(settings, "LOG_SAMPLE_RATES", {ROUTE: 1.0})
+        assert hot_logger() is NULL_LOGGER
+        assert scope["log_sampled"] is False
+    finally:
+        current_scope.reset(token)
+
+
+def test_null_logger_accepts_lazy_calls() -> None:
+    """Пустой логгер поддерживает те же вызовы, что и logger на горячих путях."""
+    NULL_LOGGER.opt(lazy=True).debug("{}", lambda: 1 / 0)
+    NULL_LOGGER.info("{}", 1)
+    NULL_LOGGER.success("{}", 1)
@@ -5,7 +5,9 @@ from fastapi import status
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.appointments.dao import AppointmentDAO, DoctorDAO, PatientDAO
 from app.appointments.models import Appointment, Doctor, Patient
+from app.config import settings
 
 
 @pytest.mark.asyncio(loop_scope="session")
@@ -114,3 +116,310 @@ async def test_create_appointment_patient_not_found(
     response = await async_client.post("/api/appointments", json=payload)
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert "Пациент" in response.json()["error_message"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_create_appointment_single_statement_mode(
+    test_doctor: Doctor,
+    test_patient1: Patient,
+    test_appointment: Appointment,
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Проверка, что режим single_statement сохраняет семантику 404/409."""
+    monkeypatch.setattr(settings, "BOOKING_MODE", "single_statement")
+    start_time = datetime.now() + timedelta(days=2)
+
+    response = await async_client.post(
+        "/api/appointments",
+        json={"doctor_id": 999999, "patient_id": test_patient1.id, "start_time": start_time.isoformat()},
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert "Доктор" in response.json()["error_message"]
+
+    response = await async_client.post(
+        "/api/appointments",
+        json={"doctor_id": test_doctor.id, "patient_id": 999999, "start_time": start_time.isoformat()},
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert "Пациент" in response.json()["error_message"]
+
+    response = await async_client.post(
+        "/api/appointments",
+        json={
+            "doctor_id": test_appointment.doctor_id,
+            "patient_id": test_appointment.patient_id,
+            "start_time": test_appointment.start_time.isoformat(),
+        },
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert "занято" in response.json()["error_message"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_create_appointments_batch(
+    test_appointment: Appointment,
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+) -> None:
+    """Проверка пакетного создания: конфликты внутри пачки, с базой и несуществующие врач/пациент."""
+    doctor = await DoctorDAO.add(test_db, name="Dr. Batch", specialization="Хирург", experience_years=12)
+    patients = [await PatientDAO.add(test_db, name=f"Batch {i}", email=f"batch{i}@example.com") for i in range(4)]
+    day = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=20)
+
+    def item(doctor_id: int, patient_id: int, start_time: datetime) -> dict[str, object]:
+        return {"doctor_id": doctor_id, "patient_id": patient_id, "start_time": start_time.isoformat()}
+
+    payload = [
+        item(doctor.id, patients[0].id, day),
+        item(doctor.id, patients[1].id, day + timedelta(minutes=30)),  # пересечение с элементом 0
+        item(doctor.id, patients[0].id, day + timedelta(hours=3)),  # пара врач + пациент уже в пачке
+        item(doctor.id, patients[2].id, day + timedelta(hours=1)),  # ровно через час — допустимо
+        item(999999, patients[3].id, day),
+        item(doctor.id, 999999, day + timedelta(hours=5)),
+        item(test_appointment.doctor_id, patients[3].id, test_appointment.start_time),  # занято в БД
+    ]
+    response = await async_client.post("/api/appointments/batch", json=payload)
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert [i["status"] for i in data["items"]] == [
+        "created",
+        "conflict",
+        "conflict",
+        "created",
+        "doctor_not_found",
+        "patient_not_found",
+        "conflict",
+    ]
+    assert data["created"] == 2
+    assert data["rejected"] == 5
+    assert data["items"][3]["appointment"]["patient_id"] == patients[2].id
+    assert data["items"][1]["appointment"] is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_list_appointments_keyset_pagination(
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+) -> None:
+    """Проверка, что постраничный обход по курсору возвращает все записи ровно один раз и по порядку."""
+    doctor = await DoctorDAO.add(test_db, name="Dr. Pages", specialization="Невролог", experience_years=4)
+    day = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=40)
+    for i in range(7):
+        patient = await PatientDAO.add(test_db, name=f"Pages {i}", email=f"pages{i}@example.com")
+        await AppointmentDAO.add(
+            test_db, doctor_id=doctor.id, patient_id=patient.id, start_time=day + timedelta(hours=i)
+        )
+
+    seen: list[dict[str, object]] = []
+    cursor = None
+    while True:
+        params: dict[str, object] = {"doctor_id": doctor.id, "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = await async_client.get("/api/appointments", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert len(page["items"]) <= 3
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert len({item["id"] for item in seen}) == 7
+    assert [item["start_time"] for item in seen] == sorted(item["start_time"] for item in seen)
+
+    # Окно по времени
+    response = await async_client.get(
+        "/api/appointments",
+        params={
+            "doctor_id": doctor.id,
+            "from": (day + timedelta(hours=2)).isoformat(),
+            "to": (day + timedelta(hours=4)).isoformat(),
+        },
+    )
+    assert len(response.json()["items"]) == 2
+
+    response = await async_client.get("/api/appointments", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_appointments_by_ids(
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+) -> None:
+    """Проверка выборки записей по списку ID: GET ?ids= и POST /by-ids, порядок запроса и missing."""
+    doctor = await DoctorDAO.add(test_db, name="Dr. Ids", specialization="Терапевт", experience_years=2)
+    day = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=45)
+    appointments = []
+    for i in range(2):
+        patient = await PatientDAO.add(test_db, name=f"Ids {i}", email=f"ids{i}@example.com")
+        appointments.append(
+            await AppointmentDAO.add(
+                test_db, doctor_id=doctor.id, patient_id=patient.id, start_time=day + timedelta(hours=i)
+            )
+        )
+    ids = [appointments[1].id, 999999, appointments[0].id]
+
+    response = await async_client.get("/api/appointments", params={"ids": ",".join(map(str, ids))})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [appointments[1].id, appointments[0].id]
+    assert data["items"][1]["doctor_id"] == doctor.id
+    assert data["missing"] == [999999]
+
+    response = await async_client.post("/api/appointments/by-ids", json=ids)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == data
+
+    response = await async_client.get("/api/appointments", params={"ids": "1,x"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = await async_client.get("/api/appointments", params={"ids": "1", "doctor_id": 1})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = await async_client.post("/api/appointments/by-ids", json=[])
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_doctor_calendar(
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+    sql_statements: list[str],
+) -> None:
+    """Календарь врача: приёмы по дням с именами пациентов и свободные промежутки, всегда один SQL-запрос."""
+    doctor = await DoctorDAO.add(test_db, name="Dr. Calendar", specialization="Терапевт", experience_years=3)
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=50)
+    params = {"from": day.isoformat(), "to": (day + timedelta(days=3)).isoformat()}
+
+    async def calendar() -> dict:
+        sql_statements.clear()
+        response = await async_client.get(f"/api/doctors/{doctor.id}/calendar", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(sql_statements) == 1
+        return response.json()
+
+    data = await calendar()
+    assert [d["day"] for d in data["days"]] == [(day + timedelta(days=n)).date().isoformat() for n in range(3)]
+    assert all([item["kind"] for item in d["items"]] == ["free"] for d in data["days"])
+
+    for i in range(6):
+        patient = await PatientDAO.add(test_db, name=f"Calendar {i}", email=f"calendar{i}@example.com")
+        await AppointmentDAO.add(
+            test_db, doctor_id=doctor.id, patient_id=patient.id, start_time=day + timedelta(days=i % 2, hours=9 + i)
+        )
+
+    data = await calendar()
+    first = data["days"][0]["items"]
+    assert [item["kind"] for item in first] == [
+        "free",
+        "appointment",
+        "free",
+        "appointment",
+        "free",
+        "appointment",
+        "free",
+    ]
+    assert first[1]["patient_name"] == "Calendar 0"
+    assert first[1]["start_time"].endswith("09:00") and first[1]["end_time"].endswith("10:00")
+    assert len([item for item in data["days"][1]["items"] if item["kind"] == "appointment"]) == 3
+    assert [item["kind"] for item in data["days"][2]["items"]] == ["free"]
+
+    response = await async_client.get("/api/doctors/999999/calendar")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_list_doctors_and_patients(
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+) -> None:
+    """Проверка списков врачей и пациентов."""
+    response = await async_client.get("/api/doctors", params={"limit": 2})
+    assert response.status_code == status.HTTP_200_OK
+    page = response.json()
+    assert len(page["items"]) == 2
+    assert page["next_cursor"] is not None
+
+    response = await async_client.get("/api/doctors", params={"limit": 2, "cursor": page["next_cursor"]})
+    assert response.json()["items"][0]["id"] > page["items"][-1]["id"]
+
+    response = await async_client.get("/api/patients", params={"limit": 1000})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_free_slots(
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+) -> None:
+    """Свободные слоты врача и поиск по специализации учитывают занятые часы."""
+    doctor: Doctor = await DoctorDAO.add(test_db, name="Dr. Free", specialization="Кардиолог-слоты", experience_years=3)
+    patient: Patient = await PatientDAO.add(test_db, name="Free Slots", email="free-slots@example.com")
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=90)
+    await AppointmentDAO.add(test_db, doctor_id=doctor.id, patient_id=patient.id, start_time=day.replace(hour=8))
+    window = {"from": day.isoformat(), "to": day.replace(hour=10).isoformat()}
+
+    response = await async_client.get(f"/api/doctors/{doctor.id}/free-slots", params=window)
+    assert response.status_code == status.HTTP_200_OK
+    assert [slot["start_time"][-5:] for slot in response.json()] == ["09:00", "09:15", "09:30", "09:45"]
+
+    response = await async_client.get(
+        "/api/free-slots", params={**window, "specialization": "Кардиолог-слоты", "limit": 1}
+    )
+    assert response.json() == [{"doctor_id": doctor.id, "start_time": day.replace(hour=9).strftime("%Y-%m-%d %H:%M")}]
+
+    response = await async_client.get("/api/doctors/999999/free-slots", params=window)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await async_client.get(
+        "/api/free-slots", params={"from": day.isoformat(), "to": (day + timedelta(days=60)).isoformat()}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_patient_history(
+    async_client: AsyncClient,
+    test_db: AsyncSession,
+    sql_statements: list[str],
+) -> None:
+    """История пациента: данные врача в каждой записи, обход по курсору, один SQL-запрос на страницу."""
+    patient = await PatientDAO.add(test_db, name="History", email="history@example.com")
+    day = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=60)
+    for i in range(5):
+        doctor = await DoctorDAO.add(test_db, name=f"Dr. History {i}", specialization=f"Spec {i}", experience_years=i)
+        await AppointmentDAO.add(
+            test_db, doctor_id=doctor.id, patient_id=patient.id, start_time=day + timedelta(days=i)
+        )
+
+    seen: list[dict[str, object]] = []
+    cursor = None
+    while True:
+        params: dict[str, object] = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        sql_statements.clear()
+        response = await async_client.get(f"/api/patients/{patient.id}/appointments", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(sql_statements) == 1
+        page = response.json()
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [item["doctor_name"] for item in seen] == [f"Dr. History {i}" for i in range(5)]
+    assert seen[3]["doctor_specialization"] == "Spec 3"
+
+    empty = await PatientDAO.add(test_db, name="History empty", email="history-empty@example.com")
+    response = await async_client.get(f"/api/patients/{empty.id}/appointments")
+    assert response.json() == {"items": [], "next_cursor": None}
+
+    response = await async_client.get("/api/patients/999999/appointments")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await async_client.get(f"/api/patients/{patient.id}/appointments", params={"cursor": "bad"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
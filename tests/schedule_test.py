@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from app.appointments.schedule import free_gaps, free_slots, merge_free_slots, slot_grid
+
+DAY = datetime(2030, 1, 7)
+
+
+def test_slot_grid_rounds_up_and_stays_in_working_hours() -> None:
+    """Сетка начинается с ближайшего 15-минутного слота и не выходит за 8:00–18:00."""
+    slots = list(slot_grid(DAY.replace(hour=7, minute=50), DAY + timedelta(days=1, hours=9, minutes=1)))
+    assert slots[0] == DAY.replace(hour=8)
+    assert DAY.replace(hour=17, minute=45) in slots
+    assert DAY.replace(hour=18) not in slots
+    assert slots[-1] == DAY + timedelta(days=1, hours=9)
+    assert len(slots) == 40 + 5
+
+    assert list(slot_grid(DAY.replace(hour=10, minute=1), DAY.replace(hour=10, minute=31))) == [
+        DAY.replace(hour=10, minute=15),
+        DAY.replace(hour=10, minute=30),
+    ]
+
+
+def test_free_slots_skip_overlapping_hours() -> None:
+    """Слот занят, если час от его начала пересекается с приёмом (в том числе не по сетке)."""
+    busy = [DAY.replace(hour=7, minute=30), DAY.replace(hour=9, minute=40)]
+    slots = list(free_slots(busy, DAY.replace(hour=8), DAY.replace(hour=11)))
+    assert slots == [DAY.replace(hour=8, minute=30), DAY.replace(hour=10, minute=45)]
+
+
+def test_merge_free_slots_orders_by_time_then_doctor() -> None:
+    """Слоты нескольких врачей сливаются по времени и обрезаются по limit."""
+    busy = {2: [], 1: [DAY.replace(hour=8)]}
+    slots = merge_free_slots(busy, DAY, DAY + timedelta(days=1), limit=3)
+    assert slots == [
+        (DAY.replace(hour=8), 2),
+        (DAY.replace(hour=8, minute=15), 2),
+        (DAY.replace(hour=8, minute=30), 2),
+    ]
+    assert merge_free_slots(busy, DAY, DAY + timedelta(days=1), limit=100)[-2:] == [
+        (DAY.replace(hour=17, minute=45), 1),
+        (DAY.replace(hour=17, minute=45), 2),
+    ]
+
+
+def test_free_gaps_between_appointments() -> None:
+    """Промежутки между приёмами в рабочих часах; пустой день свободен целиком."""
+    busy = [DAY.replace(hour=7, minute=30), DAY.replace(hour=10), DAY.replace(hour=10, minute=30)]
+    gaps = list(free_gaps(busy, DAY, DAY + timedelta(days=2)))
+    assert gaps == [
+        (DAY.replace(hour=8, minute=30), DAY.replace(hour=10)),
+        (DAY.replace(hour=11, minute=30), DAY.replace(hour=18)),
+        (DAY + timedelta(days=1, hours=8), DAY + timedelta(days=1, hours=18)),
+    ]
+    assert list(free_gaps([DAY.replace(hour=17, minute=30)], DAY.replace(hour=17), DAY.replace(hour=20))) == [
+        (DAY.replace(hour=17), DAY.replace(hour=17, minute=30))
+    ]
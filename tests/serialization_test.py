@@ -0,0 +1,26 @@
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+import orjson
+
+from app.appointments.models import Appointment
+from app.appointments.rb import RBAppointmentRead, appointment_row_dict, format_start_time
+
+AppointmentRow = namedtuple("AppointmentRow", "id patient_id doctor_id start_time")
+
+
+def test_format_start_time_matches_strftime() -> None:
+    """Быстрое форматирование совпадает с прежним strftime, смещение часового пояса отбрасывается."""
+    value = datetime(2025, 7, 1, 9, 5, 42, 123456)
+    assert format_start_time(value) == value.strftime("%Y-%m-%d %H:%M") == "2025-07-01 09:05"
+    aware = value.replace(tzinfo=timezone(timedelta(hours=3)))
+    assert format_start_time(aware) == aware.strftime("%Y-%m-%d %H:%M")
+
+
+def test_row_payload_matches_model() -> None:
+    """JSON из строки выборки побайтно совпадает с JSON модели RBAppointmentRead."""
+    start_time = datetime(2025, 7, 1, 10, 30)
+    row = AppointmentRow(id=7, patient_id=3, doctor_id=5, start_time=start_time)
+    model = RBAppointmentRead.model_validate(Appointment(id=7, patient_id=3, doctor_id=5, start_time=start_time))
+
+    assert orjson.dumps(appointment_row_dict(row)) == model.model_dump_json().encode()
@@ -0,0 +1,69 @@
+import asyncio
+import os
+from typing import Any, List
+
+import pytest
+from alembic.script import ScriptDirectory
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import startup
+from app.appointments.dao import DoctorDAO
+from app.appointments.models import Doctor
+from app.database import async_test_session, test_engine
+from app.startup import alembic_config, run_startup, seed_if_empty
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_alembic_config_independent_of_cwd(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Конфигурация Alembic находит миграции из любой директории и выбирает нужную БД."""
+    monkeypatch.chdir(os.path.dirname(__file__))
+    config = alembic_config("test")
+
+    assert config.cmd_opts is not None and config.cmd_opts.x == ["db=test"]
+    assert config.attributes["configure_logger"] is False
+    assert ScriptDirectory.from_config(config).get_current_head() is not None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_mode_none_does_nothing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """STARTUP_MODE=none не трогает БД: ни миграций, ни секций, ни соединения."""
+    calls: List[str] = []
+
+    async def record(*args: Any, **kwargs: Any) -> None:
+        calls.append("called")
+
+    monkeypatch.setattr(startup, "upgrade_database", record)
+    monkeypatch.setattr(startup, "maintain_partitions", record)
+    await run_startup("none", engine=None, session_maker=None)  # type: ignore[arg-type]
+    assert calls == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_seed_skips_non_empty_database(test_db: AsyncSession) -> None:
+    """Заполнение демо-данными ничего не добавляет, если врачи уже есть."""
+    await DoctorDAO.add(test_db, name="Dr. Startup", specialization="Терапевт", experience_years=1)
+    count = select(func.count()).select_from(Doctor)
+    before = (await test_db.execute(count)).scalar_one()
+
+    await seed_if_empty(async_test_session)
+    assert (await test_db.execute(count)).scalar_one() == before
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_startups_are_serialized(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Два одновременных запуска выполняют миграции по очереди под advisory-блокировкой."""
+    events: List[str] = []
+
+    async def upgrade(db: str = "main") -> None:
+        events.append("start")
+        await asyncio.sleep(0.2)
+        events.append("end")
+
+    async def partitions(*args: Any, **kwargs: Any) -> None:
+        pass
+
+    monkeypatch.setattr(startup, "upgrade_database", upgrade)
+    monkeypatch.setattr(startup, "maintain_partitions", partitions)
+    await asyncio.gather(*(run_startup("migrate", test_engine, async_test_session) for _ in range(2)))
+    assert events == ["start", "end", "start", "end"]